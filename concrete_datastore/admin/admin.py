@@ -3,25 +3,45 @@
 from django.apps import apps
 from django.conf import settings
 from django.contrib import admin
+from django.core.exceptions import FieldDoesNotExist
 from django.utils.translation import gettext_lazy as _
-from concrete_datastore.concrete.meta import list_of_meta
+from concrete_datastore.concrete.meta import get_model_metadata, list_of_meta
 from concrete_datastore.admin.admin_models import MetaUserAdmin, MetaAdmin
 from concrete_datastore.admin.admin_site import get_admin_site
+from concrete_datastore.admin.list_filters import get_filterable_fields
 from concrete_datastore.concrete.models import (
     ConcreteRole,
     AuthToken,
     ConcretePermission,
     EmailDevice,
+    WebhookEndpoint,
+    WebhookDelivery,
 )
 from concrete_datastore.concrete.models import (
     divider,
     divider_field_name,
     UNDIVIDED_MODEL,
 )
-from concrete_datastore.interfaces.csv import csv_streaming_response
 
 main_app = apps.get_app_config('concrete')
 
+
+def get_list_select_related(model, list_display):
+    """
+    Return the foreign keys of the list display, fetched with the rows of
+    the changelist
+    """
+    list_select_related = []
+    for field_name in list_display:
+        try:
+            field = model._meta.get_field(field_name)
+        except FieldDoesNotExist:
+            continue
+        if field.many_to_one:
+            list_select_related.append(field_name)
+    return list_select_related
+
+
 admin_site = get_admin_site()
 
 admin_site.site_header = settings.ADMIN_HEADER
@@ -31,14 +51,12 @@ for meta_model in list_of_meta:
     if model_name in ["EntityDividerModel", "UndividedModel"]:
         continue
 
-    models_fields = ('uid',)
-    m2m_fields = []
+    metadata = get_model_metadata(model_name)
+    models_fields = ('uid',) + tuple(metadata.field_names)
+    relation_fields = tuple(metadata.relation_fields)
     attrs = {}
 
-    for field_name, field in meta_model.get_fields():
-        models_fields += (field_name,)
-        if field.f_type == 'ManyToManyField':
-            m2m_fields.append(field_name)
+    search_fields = meta_model.get_property('m_search_fields') or []
 
     if model_name == 'User':
         list_display = (meta_model.get_property('m_list_display') or []) + [
@@ -60,6 +78,12 @@ for meta_model in list_of_meta:
             (_('User fields'), {'fields': user_custom_fields}),
         ) + meta_user_admin_cls.fieldsets
         ancestors = [meta_user_admin_cls]
+        autocomplete_fields = (
+            MetaUserAdmin.autocomplete_fields + relation_fields
+        )
+        #:  The users are selected by email in the autocomplete widgets
+        if 'email' not in search_fields:
+            search_fields = ['email'] + search_fields
 
     else:
         list_display = ['uid'] + (
@@ -69,43 +93,34 @@ for meta_model in list_of_meta:
         meta_fieldsets = MetaAdmin.fieldsets
         meta_model_fields = MetaAdmin.models_fields
         fieldsets = ((None, {'fields': models_fields}),) + meta_fieldsets
+        autocomplete_fields = MetaAdmin.autocomplete_fields + relation_fields
         if model_name != divider and model_name not in UNDIVIDED_MODEL:
             fieldsets += ((_('Scope'), {'fields': (divider_field_name,)}),)
-        attrs.update({'fieldsets': fieldsets, 'filter_horizontal': m2m_fields})
+            autocomplete_fields += (divider_field_name,)
+        attrs.update({'fieldsets': fieldsets})
 
     def make_list_filter(mm, mdl):
         def get_list_filter(self, request):
             initial_list_filter = mm.get_property('m_filter_fields') or []
             list_filter = ['creation_date', 'modification_date']
-            for field_name in initial_list_filter:
-                nb_objects = mdl.objects.values(field_name).distinct().count()
-                if nb_objects <= settings.LIMIT_DEACTIVATE_FILTER_IN_ADMIN:
-                    list_filter.append(field_name)
+            list_filter.extend(get_filterable_fields(mdl, initial_list_filter))
             return list_filter
 
         return get_list_filter
 
-    def export_csv(self, request, queryset):
-        fields = [f.name for f in queryset.model._meta.fields]
-        return csv_streaming_response(
-            request, queryset.values(*fields), fields
-        )
-
-    export_csv.short_description = 'Export CSV (UTF-8)'
-
-    def make_actions():
-        actions = ["export_csv"]
-        return actions
-
     model = main_app.models[meta_model.get_model_name().lower()]
 
     attrs.update(
         {
             'list_display': list_display,
-            'search_fields': meta_model.get_property('m_search_fields') or [],
+            'list_select_related': get_list_select_related(
+                model, list_display
+            ),
+            #:  The autocomplete widgets of the relations to this model
+            #:  need search fields
+            'search_fields': search_fields or ['uid'],
+            'autocomplete_fields': autocomplete_fields,
             'get_list_filter': make_list_filter(meta_model, model),
-            'actions': make_actions(),
-            'export_csv': export_csv,
         }
     )
     admin_site.register(
@@ -192,7 +207,7 @@ class ConcreteRoleAdmin(SaveModelMixin, admin.ModelAdmin):
         'modification_date',
         'created_by',
     ]
-    filter_horizontal = ['users']
+    autocomplete_fields = ['users']
 
 
 @admin.register(EmailDevice, site=admin_site)
@@ -230,3 +245,68 @@ class EmailDeviceAdmin(SaveModelMixin, admin.ModelAdmin):
         'modification_date',
     ]
     list_filter = ['mfa_mode', 'confirmed']
+
+
+@admin.register(WebhookEndpoint, site=admin_site)
+class WebhookEndpointAdmin(SaveModelMixin, admin.ModelAdmin):
+    list_display = [
+        'name',
+        'url',
+        'model_name',
+        'is_active',
+        'last_sequence',
+        'creation_date',
+    ]
+    search_fields = ['name', 'url', 'model_name']
+    readonly_fields = [
+        'uid',
+        'created_by',
+        'creation_date',
+        'modification_date',
+    ]
+    list_filter = ['is_active', 'model_name']
+    fields = [
+        'uid',
+        'name',
+        'url',
+        'model_name',
+        'operations',
+        'secret',
+        'is_active',
+        'batch_size',
+        'max_concurrency',
+        'last_transaction_id',
+        'last_sequence',
+        'creation_date',
+        'modification_date',
+        'created_by',
+    ]
+
+
+@admin.register(WebhookDelivery, site=admin_site)
+class WebhookDeliveryAdmin(admin.ModelAdmin):
+    list_display = [
+        'uid',
+        'endpoint',
+        'status',
+        'attempts',
+        'first_sequence',
+        'last_sequence',
+        'next_attempt_date',
+        'modification_date',
+    ]
+    list_filter = ['status']
+    search_fields = ['endpoint__name']
+    list_select_related = ['endpoint']
+    readonly_fields = [
+        'uid',
+        'endpoint',
+        'first_sequence',
+        'last_sequence',
+        'payload',
+        'attempts',
+        'last_error',
+        'creation_date',
+        'modification_date',
+    ]
+    date_hierarchy = 'creation_date'
@@ -1,6 +1,14 @@
 # coding: utf-8
+import os
+
 from django.conf import settings
 from django.contrib import admin
+from django.core.exceptions import PermissionDenied
+from django.db import transaction
+from django.http import FileResponse, HttpResponseRedirect
+from django.shortcuts import get_object_or_404
+from django.template.response import TemplateResponse
+from django.urls import path, reverse
 from django.utils.translation import gettext_lazy as _
 from django.contrib.auth.admin import UserAdmin
 
@@ -8,11 +16,123 @@ from concrete_datastore.admin.admin_form import (
     MyChangeUserForm,
     MyCreationUserForm,
 )
-from concrete_datastore.concrete.models import divider_field_name
+from concrete_datastore.concrete.models import (  # pylint:disable=E0611
+    ExportJob,
+    divider_field_name,
+)
+from concrete_datastore.concrete.exports import (
+    get_admin_export_fields,
+    get_export_query_string,
+    get_or_create_admin_export_job,
+)
+from concrete_datastore.interfaces.csv import csv_streaming_response
+from concrete_datastore.concrete.deletion import collect_deletions
+from concrete_datastore.admin.paginator import (
+    EstimatedCountPaginator,
+    is_large_table,
+)
 from django.contrib.gis.admin import OSMGeoAdmin
 
 
-class MetaUserAdmin(UserAdmin, OSMGeoAdmin):
+class LargeTableAdminMixin:
+    """
+    Above `ADMIN_LARGE_TABLE_ROWS_COUNT` rows, the changelist shows an
+    estimated count and no longer counts all the rows of the table
+    """
+
+    paginator = EstimatedCountPaginator
+
+    @property
+    def show_full_result_count(self):
+        return not is_large_table(self.model)
+
+
+class ExportJobAdminMixin:
+    """
+    Action exporting the selected instances to a gzipped CSV file written
+    by an export job, with a page following its progress. Without the
+    workers of the `exports` queue (setting `ASYNC_EXPORTS`), the file is
+    streamed in the response
+    """
+
+    actions = ['export_csv']
+
+    def export_csv(self, request, queryset):
+        from concrete_datastore.api.v1.views import schedule_export
+
+        if settings.ASYNC_EXPORTS is not True:
+            fields = get_admin_export_fields(self.model)
+            return csv_streaming_response(
+                request, queryset.values(*fields), fields, compress='gzip'
+            )
+        query_string = None
+        if request.POST.get('select_across') == '1':
+            #: All the rows of the changelist are selected: the job exports
+            #: the rows of its filters and search instead of their uids
+            query_string = get_export_query_string(request.GET)
+        job, created = get_or_create_admin_export_job(
+            queryset, request.user, query_string=query_string
+        )
+        if created:
+            transaction.on_commit(lambda: schedule_export(job.pk))
+        return HttpResponseRedirect(
+            reverse(
+                '{}:{}_{}_export_job'.format(
+                    self.admin_site.name,
+                    self.model._meta.app_label,
+                    self.model._meta.model_name,
+                ),
+                args=(job.pk,),
+            )
+        )
+
+    export_csv.short_description = 'Export CSV (UTF-8)'
+
+    def get_urls(self):
+        return [
+            path(
+                'export-job/<uuid:job_uid>/',
+                self.admin_site.admin_view(self.export_job_view),
+                name='{}_{}_export_job'.format(
+                    self.model._meta.app_label, self.model._meta.model_name
+                ),
+            )
+        ] + super().get_urls()
+
+    def export_job_view(self, request, job_uid):
+        if not self.has_view_permission(request):
+            raise PermissionDenied
+        job = get_object_or_404(
+            ExportJob,
+            pk=job_uid,
+            model_name=self.model.__name__,
+            created_by=request.user,
+        )
+        if (
+            request.GET.get('c_download') == 'true'
+            and job.status == ExportJob.STATUS_DONE
+        ):
+            return FileResponse(
+                job.file.open('rb'),
+                as_attachment=True,
+                filename=os.path.basename(job.file.name),
+                content_type='application/gzip',
+            )
+        context = {
+            **self.admin_site.each_context(request),
+            'opts': self.model._meta,
+            'title': _('Export of %(name)s')
+            % {'name': self.model._meta.verbose_name_plural},
+            'job': job,
+            'is_active': job.status in ExportJob.ACTIVE_STATUSES,
+            'is_done': job.status == ExportJob.STATUS_DONE,
+        }
+        return TemplateResponse(request, 'admin/export_job.html', context)
+
+
+class MetaUserAdmin(
+    LargeTableAdminMixin, ExportJobAdminMixin, UserAdmin, OSMGeoAdmin
+):
     display_wkt = True
     models_fields = ()
     readonly_fields = ['uid', 'creation_date', 'modification_date']
@@ -47,7 +167,7 @@ class MetaUserAdmin(UserAdmin, OSMGeoAdmin):
     )
     if settings.ADMIN_SHOW_USER_PERMISSIONS is True:
         fieldsets += ((_('Permissions'), {'fields': ('user_permissions',)}),)
-    filter_horizontal = (divider_field_name_plural, 'unsubscribe_to')
+    autocomplete_fields = (divider_field_name_plural, 'unsubscribe_to')
     ordering = ('email',)
 
     def save_model(self, request, obj, form, change):
@@ -69,7 +189,7 @@ class MetaUserAdmin(UserAdmin, OSMGeoAdmin):
         super(MetaUserAdmin, self).save_model(request, obj, form, change)
 
 
-class MetaAdmin(OSMGeoAdmin):
+class MetaAdmin(LargeTableAdminMixin, ExportJobAdminMixin, OSMGeoAdmin):
     display_wkt = True
     models_fields = ()
     date_fields = ('creation_date', 'modification_date')
@@ -90,7 +210,7 @@ class MetaAdmin(OSMGeoAdmin):
         (_('Dates'), {'fields': date_fields}),
         (_('Permissions'), {'fields': permissions}),
     )
-    filter_horizontal = (
+    autocomplete_fields = (
         'can_view_users',
         'can_view_groups',
         'can_admin_users',
@@ -111,3 +231,11 @@ class MetaAdmin(OSMGeoAdmin):
         if change is False:
             obj.created_by = request.user
         super(MetaAdmin, self).save_model(request, obj, form, change)
+
+    def delete_model(self, request, obj):
+        with transaction.atomic(), collect_deletions():
+            super(MetaAdmin, self).delete_model(request, obj)
+
+    def delete_queryset(self, request, queryset):
+        with transaction.atomic(), collect_deletions():
+            super(MetaAdmin, self).delete_queryset(request, queryset)
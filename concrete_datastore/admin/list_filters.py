@@ -0,0 +1,72 @@
+# coding: utf-8
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections, router
+
+CACHE_KEY = 'concrete-admin-list-filter:{}'
+
+
+def get_estimated_distinct_count(model, field_name):
+    """
+    Estimate of the number of distinct values of a column from the
+    statistics of PostgreSQL (`pg_stats.n_distinct`, a ratio of the number
+    of rows when negative). Return None if the table has not been analyzed
+    """
+    connection = connections[router.db_for_read(model)]
+    column = getattr(model._meta.get_field(field_name), 'column', None)
+    if connection.vendor != 'postgresql' or column is None:
+        return None
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT s.n_distinct, c.reltuples FROM pg_stats s '
+            'JOIN pg_namespace n ON n.nspname = s.schemaname '
+            'JOIN pg_class c ON c.relnamespace = n.oid '
+            'AND c.relname = s.tablename '
+            'WHERE s.schemaname = current_schema() '
+            'AND s.tablename = %s AND s.attname = %s',
+            [model._meta.db_table, column],
+        )
+        row = cursor.fetchone()
+    if row is None:
+        return None
+    n_distinct, reltuples = row
+    if n_distinct >= 0:
+        return n_distinct
+    return -n_distinct * max(reltuples, 0)
+
+
+def has_few_distinct_values(model, field_name, limit):
+    estimate = get_estimated_distinct_count(model, field_name)
+    if estimate is not None:
+        return estimate <= limit
+    #: Without statistics, the distinct values are only read up to the limit
+    distinct_values = model.objects.values_list(field_name).distinct()
+    return len(distinct_values[: limit + 1]) <= limit
+
+
+def get_filterable_fields(model, field_names):
+    """
+    Return the fields shown as filters in the admin: those with at most
+    `LIMIT_DEACTIVATE_FILTER_IN_ADMIN` distinct values. The result is cached
+    for `ADMIN_LIST_FILTER_CACHE_SECONDS`
+    """
+    cache_key = CACHE_KEY.format(model._meta.label_lower)
+    filterable_fields = cache.get(cache_key)
+    if filterable_fields is None:
+        filterable_fields = [
+            field_name
+            for field_name in field_names
+            if has_few_distinct_values(
+                model, field_name, settings.LIMIT_DEACTIVATE_FILTER_IN_ADMIN
+            )
+        ]
+        cache.set(
+            cache_key,
+            filterable_fields,
+            settings.ADMIN_LIST_FILTER_CACHE_SECONDS,
+        )
+    return [
+        field_name
+        for field_name in field_names
+        if field_name in filterable_fields
+    ]
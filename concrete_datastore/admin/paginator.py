@@ -0,0 +1,52 @@
+# coding: utf-8
+from django.conf import settings
+from django.core.paginator import Paginator
+from django.db import connections, router
+from django.utils.functional import cached_property
+
+
+def get_estimated_rows_count(model):
+    """
+    Estimate of the number of rows of the table of the model from the
+    statistics of PostgreSQL (`pg_class.reltuples`). Return None if the
+    table has not been analyzed
+    """
+    connection = connections[router.db_for_read(model)]
+    if connection.vendor != 'postgresql':
+        return None
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT reltuples FROM pg_class WHERE oid = %s::regclass',
+            [connection.ops.quote_name(model._meta.db_table)],
+        )
+        row = cursor.fetchone()
+    if row is None or row[0] < 0:
+        return None
+    return int(row[0])
+
+
+def is_large_table(model):
+    estimate = get_estimated_rows_count(model)
+    return (
+        estimate is not None
+        and estimate > settings.ADMIN_LARGE_TABLE_ROWS_COUNT
+    )
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator counting the unfiltered rows of the large tables from the
+    statistics of PostgreSQL instead of an exact `COUNT(*)`
+    """
+
+    @cached_property
+    def count(self):
+        query = getattr(self.object_list, 'query', None)
+        if query is not None and not query.where:
+            estimate = get_estimated_rows_count(self.object_list.model)
+            if (
+                estimate is not None
+                and estimate > settings.ADMIN_LARGE_TABLE_ROWS_COUNT
+            ):
+                return estimate
+        return super().count
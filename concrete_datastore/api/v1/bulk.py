@@ -0,0 +1,334 @@
+# coding: utf-8
+from functools import reduce
+from operator import or_
+
+from django.conf import settings
+from django.db import connections, router
+from django.db.models import Q
+from django.db.models.sql import InsertQuery
+from django.utils import timezone
+
+from concrete_datastore.concrete.changelog import record_changes
+from concrete_datastore.concrete.changelog import get_scope_uid
+from concrete_datastore.concrete.changelog import record_queryset_changes
+from concrete_datastore.concrete.models import (  # pylint:disable=E0611
+    ChangeLogEntry,
+)
+from concrete_datastore.api.v1.exceptions import UpsertConflictError
+
+
+def split_many_to_many(model, data):
+    """
+    Split validated data into the concrete fields values and the
+    many-to-many fields values
+    """
+    m2m_names = {field.name for field in model._meta.many_to_many}
+    values = {k: v for k, v in data.items() if k not in m2m_names}
+    m2m_values = {k: v for k, v in data.items() if k in m2m_names}
+    return values, m2m_values
+
+
+def set_many_to_many(model, instances_m2m_values):
+    """
+    Replace the many-to-many relations of several instances with one DELETE
+    and one INSERT per through table.
+    `instances_m2m_values` is a list of `(instance, {field_name: objects})`
+    """
+    by_field = {}
+    for instance, m2m_values in instances_m2m_values:
+        for field_name, related_objects in m2m_values.items():
+            by_field.setdefault(field_name, []).append(
+                (instance, related_objects or [])
+            )
+
+    for field_name, instances_related in by_field.items():
+        field = model._meta.get_field(field_name)
+        through = field.remote_field.through
+        source_name = field.m2m_field_name()
+        target_name = field.m2m_reverse_field_name()
+        through.objects.filter(
+            **{
+                '{}__in'.format(source_name): [
+                    instance.pk for instance, _ in instances_related
+                ]
+            }
+        ).delete()
+        through.objects.bulk_create(
+            [
+                through(
+                    **{
+                        '{}_id'.format(source_name): instance.pk,
+                        '{}_id'.format(target_name): related.pk,
+                    }
+                )
+                for instance, related_objects in instances_related
+                for related in related_objects
+            ],
+            batch_size=settings.API_BULK_BATCH_SIZE,
+            ignore_conflicts=True,
+        )
+
+
+def bulk_create_instances(model, items_data):
+    """
+    Create the instances from their validated data with one INSERT per
+    table, and log their creation
+    """
+    instances, instances_m2m_values = [], []
+    for data in items_data:
+        values, m2m_values = split_many_to_many(model, data)
+        instance = model(**values)
+        instances.append(instance)
+        instances_m2m_values.append((instance, m2m_values))
+
+    model.objects.bulk_create(
+        instances, batch_size=settings.API_BULK_BATCH_SIZE
+    )
+    set_many_to_many(model, instances_m2m_values)
+    record_changes(
+        model,
+        ((instance.pk, get_scope_uid(instance)) for instance in instances),
+        ChangeLogEntry.OPERATION_CREATE,
+    )
+    return instances
+
+
+def bulk_update_instances(model, instances_and_data):
+    """
+    Update the instances with their validated data with one UPDATE per batch
+    on the union of the modified fields, and log their update.
+    `instances_and_data` is a list of `(instance, data)`
+    """
+    now = timezone.now()
+    updated_fields = {'modification_date'}
+    instances, instances_m2m_values = [], []
+    for instance, data in instances_and_data:
+        values, m2m_values = split_many_to_many(model, data)
+        for field_name, value in values.items():
+            setattr(instance, field_name, value)
+        updated_fields.update(values.keys())
+        instance.modification_date = now
+        instances.append(instance)
+        instances_m2m_values.append((instance, m2m_values))
+
+    model.objects.bulk_update(
+        instances,
+        fields=sorted(updated_fields),
+        batch_size=settings.API_BULK_BATCH_SIZE,
+    )
+    set_many_to_many(model, instances_m2m_values)
+    record_changes(
+        model,
+        ((instance.pk, get_scope_uid(instance)) for instance in instances),
+        ChangeLogEntry.OPERATION_UPDATE,
+    )
+    return instances
+
+
+def share_instances(queryset, principals, remove=False):
+    """
+    Add (or remove) the principals to the permission fields of all the
+    instances of the queryset with one INSERT (or DELETE) per through table.
+    `principals` is a mapping of a permission field name (`can_view_users`,
+    `can_admin_groups`, ...) to the pks of the users or groups.
+    Return the number of instances.
+    """
+    model = queryset.model
+    instances_pks = list(queryset.values_list('pk', flat=True))
+    if not instances_pks:
+        return 0
+
+    for field_name, related_pks in principals.items():
+        if not related_pks:
+            continue
+        field = model._meta.get_field(field_name)
+        through = field.remote_field.through
+        source_name = field.m2m_field_name()
+        target_name = field.m2m_reverse_field_name()
+        if remove:
+            links = through.objects.filter(
+                **{
+                    '{}__in'.format(source_name): instances_pks,
+                    '{}__in'.format(target_name): related_pks,
+                }
+            )
+            #: The through tables have no delete receiver: the rows are
+            #: deleted with one query, without being fetched first
+            links.delete()
+        else:
+            through.objects.bulk_create(
+                [
+                    through(
+                        **{
+                            '{}_id'.format(source_name): instance_pk,
+                            '{}_id'.format(target_name): related_pk,
+                        }
+                    )
+                    for instance_pk in instances_pks
+                    for related_pk in related_pks
+                ],
+                batch_size=settings.API_BULK_BATCH_SIZE,
+                ignore_conflicts=True,
+            )
+
+    record_queryset_changes(
+        model.objects.filter(pk__in=instances_pks),
+        ChangeLogEntry.OPERATION_PERMISSIONS,
+    )
+    return len(instances_pks)
+
+
+def get_key(model, key_fields, values):
+    """
+    Return the values of the key fields, the related instances being
+    replaced by their pk. `values` is either validated data or an instance
+    """
+    if isinstance(values, model):
+        return tuple(
+            getattr(values, model._meta.get_field(name).attname)
+            for name in key_fields
+        )
+    return tuple(
+        getattr(values[name], 'pk', values[name]) for name in key_fields
+    )
+
+
+def lock_instances_by_key(model, key_fields, keys):
+    """
+    Fetch and lock the instances matching the given keys with one query.
+    Return a mapping of the key to the instance
+    """
+    if not keys:
+        return {}
+    keys_filter = reduce(
+        or_, (Q(**dict(zip(key_fields, key))) for key in keys)
+    )
+    return {
+        get_key(model, key_fields, instance): instance
+        for instance in model.objects.select_for_update().filter(keys_filter)
+    }
+
+
+def upsert_statement(model, key_fields, instances, updated_fields, using):
+    """
+    Return the `INSERT ... ON CONFLICT DO UPDATE` statement of the instances
+    and its params. Only the rows whose pk is given in the last param are
+    updated, the conflicting rows of the others are left untouched and not
+    returned
+    """
+    query = InsertQuery(model)
+    query.insert_values(model._meta.concrete_fields, instances)
+    compiler = query.get_compiler(using=using)
+    ((insert_sql, params),) = compiler.as_sql()
+
+    qn = compiler.connection.ops.quote_name
+    table = qn(model._meta.db_table)
+    pk_column = qn(model._meta.pk.column)
+    conflict_columns = ', '.join(
+        qn(model._meta.get_field(name).column) for name in key_fields
+    )
+    assignments = ', '.join(
+        '{0} = EXCLUDED.{0}'.format(qn(model._meta.get_field(name).column))
+        for name in sorted(updated_fields)
+    )
+    #: Only the SQL compiled by Django and quoted identifiers are formatted
+    #: in, the values are all passed as params
+    statement = (  # nosec B608
+        '{} ON CONFLICT ({}) DO UPDATE SET {} '
+        'WHERE {}.{} = ANY(%s::uuid[]) '
+        'RETURNING {}.{}, (xmax = 0)'
+    ).format(
+        insert_sql,
+        conflict_columns,
+        assignments,
+        table,
+        pk_column,
+        table,
+        pk_column,
+    )
+    return statement, params
+
+
+def upsert_instances(model, key_fields, items_data, creation_attrs, existing):
+    """
+    Create or update the instances identified by the key fields from their
+    validated data, and log the changes.
+    `existing` maps the index of the items to update to their locked
+    instance; `creation_attrs` are only set on the created instances.
+
+    With PostgreSQL, the items are written with one
+    `INSERT ... ON CONFLICT DO UPDATE` per batch and per set of given
+    fields, so that a row inserted concurrently with the same key makes the
+    request fail instead of raising an integrity error. Other databases
+    fall back on one INSERT and one UPDATE per batch.
+
+    Return the list of `(pk, created)` of the items
+    """
+    using = router.db_for_write(model)
+    if connections[using].vendor != 'postgresql':
+        creations = [
+            {**data, **creation_attrs}
+            for index, data in enumerate(items_data)
+            if index not in existing
+        ]
+        updates = [(existing[index], items_data[index]) for index in existing]
+        created = iter(bulk_create_instances(model, creations))
+        bulk_update_instances(model, updates)
+        return [
+            (existing[index].pk, False)
+            if index in existing
+            else (next(created).pk, True)
+            for index in range(len(items_data))
+        ]
+
+    updatable_pks = [instance.pk for instance in existing.values()]
+    m2m_names = {field.name for field in model._meta.many_to_many}
+    groups = {}
+    for index, data in enumerate(items_data):
+        given_fields = frozenset(data.keys()) - m2m_names
+        groups.setdefault(given_fields, []).append(index)
+
+    results = [None] * len(items_data)
+    instances_m2m_values = []
+    with connections[using].cursor() as cursor:
+        for given_fields, indexes in groups.items():
+            updated_fields = {'modification_date'}
+            updated_fields.update(given_fields - set(key_fields))
+            for start in range(0, len(indexes), settings.API_BULK_BATCH_SIZE):
+                batch = indexes[start : start + settings.API_BULK_BATCH_SIZE]
+                instances = []
+                for index in batch:
+                    values, m2m_values = split_many_to_many(
+                        model, items_data[index]
+                    )
+                    instance = model(**{**values, **creation_attrs})
+                    instances.append(instance)
+                    instances_m2m_values.append((instance, m2m_values))
+                statement, params = upsert_statement(
+                    model, key_fields, instances, updated_fields, using
+                )
+                cursor.execute(statement, params + (updatable_pks,))
+                rows = cursor.fetchall()
+                if len(rows) != len(batch):
+                    raise UpsertConflictError(
+                        'Some instances were created concurrently with the '
+                        'same keys'
+                    )
+                for index, instance, (pk, created) in zip(
+                    batch, instances, rows
+                ):
+                    instance.pk = pk
+                    results[index] = (pk, created)
+
+    set_many_to_many(model, instances_m2m_values)
+    for created, operation in (
+        (True, ChangeLogEntry.OPERATION_CREATE),
+        (False, ChangeLogEntry.OPERATION_UPDATE),
+    ):
+        record_queryset_changes(
+            model.objects.filter(
+                pk__in=[pk for pk, c in results if c is created]
+            ),
+            operation,
+        )
+    return results
@@ -0,0 +1,139 @@
+# coding: utf-8
+import hashlib
+import re
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from django.conf import settings
+from django.contrib.postgres.aggregates import StringAgg
+from django.db.models import BigIntegerField, Count, Func, TextField, Value
+from django.db.models.functions import MD5, Cast, Concat, Replace, Substr
+
+HEX_DIGITS = '0123456789abcdef'
+
+DIGEST_PREFIX_REGEX = re.compile(r'^[0-9a-f]{0,31}$')
+
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+def to_microseconds(date_time):
+    """
+    Convert a datetime to an integer number of microseconds since epoch
+    (exact, no floating point rounding)
+    """
+    return (date_time - EPOCH) // timedelta(microseconds=1)
+
+
+def get_entry_line(uid, modification_date):
+    """
+    Line hashed for each instance: `<uid hex>:<modification microseconds>`
+    """
+    return '{}:{}\n'.format(uid.hex, to_microseconds(modification_date))
+
+
+def get_uid_range(prefix):
+    """
+    Return the (lowest, highest) UUIDs starting with the hex prefix
+    """
+    return (
+        uuid.UUID(prefix.ljust(32, '0')),
+        uuid.UUID(prefix.ljust(32, 'f')),
+    )
+
+
+def is_valid_prefix(prefix):
+    return DIGEST_PREFIX_REGEX.match(prefix) is not None
+
+
+class EpochMicroseconds(Func):
+    """
+    Integer number of microseconds since epoch of a datetime column, computed
+    on integers so that it is exact
+    """
+
+    template = (
+        "(extract(epoch from date_trunc('second', %(expressions)s))::bigint"
+        " * 1000000 + mod(extract(microseconds from %(expressions)s)::bigint,"
+        " 1000000))"
+    )
+    output_field = BigIntegerField()
+
+
+def get_hex_uid():
+    """
+    Uid of the rows as hex without dashes
+    """
+    return Replace(Cast('uid', TextField()), Value('-'), Value(''))
+
+
+def get_lines_digest():
+    """
+    md5 of the concatenation of the entry lines of the rows (the same as
+    `get_entry_line`), sorted by uid
+    """
+    line = Concat(
+        get_hex_uid(),
+        Value(':'),
+        Cast(EpochMicroseconds('modification_date'), TextField()),
+        Value('\n'),
+        output_field=TextField(),
+    )
+    return MD5(StringAgg(line, delimiter='', ordering='uid'))
+
+
+def compute_digest(queryset, prefix=''):
+    """
+    Compute the digest of the node `prefix` of the uid prefix tree.
+
+    The digest of a node is the md5 of the entry lines of its instances,
+    sorted by uid. Each node is split into 16 buckets by the next hex digit
+    of the uid, the digest of a bucket being the digest of the node with the
+    bucket as prefix, so a client can drill down only into the buckets that
+    differ. When the node holds few enough instances, the entries themselves
+    are returned instead of the buckets.
+
+    The digests of the buckets are computed by the database, which only
+    returns one row per bucket.
+    """
+    if prefix:
+        queryset = queryset.filter(uid__range=get_uid_range(prefix))
+    queryset = queryset.order_by()
+    objects_count = queryset.count()
+
+    if objects_count <= settings.API_DIGEST_MAX_LEAF_SIZE or len(prefix) == 31:
+        node_hash = hashlib.md5(usedforsecurity=False)
+        objects = {}
+        for uid, modification_date in queryset.order_by('uid').values_list(
+            'uid', 'modification_date'
+        ):
+            node_hash.update(
+                get_entry_line(uid, modification_date).encode('utf-8')
+            )
+            objects[str(uid)] = to_microseconds(modification_date)
+        return {
+            'prefix': prefix,
+            'digest': node_hash.hexdigest(),
+            'objects_count': objects_count,
+            'objects': objects,
+        }
+
+    node_digest = queryset.aggregate(digest=get_lines_digest())['digest']
+    rows = (
+        queryset.annotate(bucket=Substr(get_hex_uid(), len(prefix) + 1, 1))
+        .values('bucket')
+        .annotate(objects_count=Count('pk'), digest=get_lines_digest())
+        .order_by('bucket')
+    )
+    return {
+        'prefix': prefix,
+        'digest': node_digest,
+        'objects_count': objects_count,
+        'buckets': {
+            prefix
+            + row['bucket']: {
+                'digest': row['digest'],
+                'objects_count': row['objects_count'],
+            }
+            for row in rows
+        },
+    }
@@ -12,3 +12,7 @@ class PasswordInsecureValidationError(ValidationError, ConcreteBaseError):
 
 class WrongEntityUIDError(ConcreteBaseError):
     detail = 'WRONG_ENTITY_UID'
+
+
+class UpsertConflictError(ConcreteBaseError):
+    detail = 'UPSERT_CONFLICT'
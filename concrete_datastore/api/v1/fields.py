@@ -0,0 +1,127 @@
+# coding: utf-8
+from django.core.exceptions import ValidationError as DjangoValidationError
+from rest_framework import serializers
+
+#: Key of the serializer context holding the related instances already
+#: resolved, shared by the serializers of a same request
+RELATED_INSTANCES_CACHE_KEY = 'related_instances_cache'
+
+
+class BatchedManyRelatedField(serializers.ManyRelatedField):
+    """
+    Many-relation field resolving all the given pks with a single query
+    instead of one query per pk
+    """
+
+    def to_internal_value(self, data):
+        if isinstance(data, str) or not hasattr(data, '__iter__'):
+            self.fail('not_a_list', input_type=type(data).__name__)
+        if not self.allow_empty and len(data) == 0:
+            self.fail('empty')
+        return self.child_relation.resolve_many(data)
+
+
+class BatchedPrimaryKeyRelatedField(serializers.PrimaryKeyRelatedField):
+    """
+    Primary key related field looking up the instances in the related
+    instances cache of the serializer context before querying the database.
+    With `many=True`, all the pks are resolved with one `pk__in` query and
+    the missing ones are reported together.
+    """
+
+    @classmethod
+    def many_init(cls, *args, **kwargs):
+        list_kwargs = {'child_relation': cls(*args, **kwargs)}
+        for key in kwargs:
+            if key in serializers.MANY_RELATION_KWARGS:
+                list_kwargs[key] = kwargs[key]
+        return BatchedManyRelatedField(**list_kwargs)
+
+    def get_cache(self):
+        context = self.context
+        if RELATED_INSTANCES_CACHE_KEY not in context:
+            #: Serializers without a shared cache still batch the pks of a
+            #: same field, but do not keep the instances between calls
+            return {}
+        label = self.get_queryset().model._meta.label
+        return context[RELATED_INSTANCES_CACHE_KEY].setdefault(label, {})
+
+    def to_pk(self, value):
+        if self.pk_field is not None:
+            value = self.pk_field.to_internal_value(value)
+        if isinstance(value, (bool, list, dict)):
+            self.fail('incorrect_type', data_type=type(value).__name__)
+        try:
+            return self.get_queryset().model._meta.pk.to_python(value)
+        except (TypeError, ValueError, DjangoValidationError):
+            self.fail('does_not_exist', pk_value=value)
+
+    def fetch(self, pks, cache):
+        """
+        Load the instances of the given pks that are not in the cache yet
+        """
+        missing_pks = {pk for pk in pks if pk not in cache}
+        if missing_pks:
+            cache.update(self.get_queryset().in_bulk(list(missing_pks)))
+
+    def prefetch(self, values):
+        """
+        Load in the cache the instances of all the valid pks of `values`,
+        with a single query
+        """
+        pks = []
+        for value in values:
+            try:
+                pks.append(self.to_pk(value))
+            except serializers.ValidationError:
+                continue
+        self.fetch(pks, self.get_cache())
+
+    def resolve_many(self, values):
+        errors, pks = [], []
+        for value in values:
+            try:
+                pks.append(self.to_pk(value))
+            except serializers.ValidationError as e:
+                errors.extend(e.detail)
+
+        cache = self.get_cache()
+        self.fetch(pks, cache)
+        for pk in pks:
+            if pk not in cache:
+                errors.append(
+                    self.error_messages['does_not_exist'].format(pk_value=pk)
+                )
+        if errors:
+            raise serializers.ValidationError(errors)
+        return [cache[pk] for pk in pks]
+
+    def to_internal_value(self, data):
+        return self.resolve_many([data])[0]
+
+
+def prefetch_related_instances(serializer, items):
+    """
+    Load with one query per relation the instances referenced by the
+    `<field>_uid` values of all the items, in the related instances cache
+    of the serializer context
+    """
+    for field_name, field in serializer.fields.items():
+        if field.read_only:
+            continue
+        many = isinstance(field, BatchedManyRelatedField)
+        relation = field.child_relation if many else field
+        if not isinstance(relation, BatchedPrimaryKeyRelatedField):
+            continue
+        values = []
+        for item in items:
+            if not isinstance(item, dict) or item.get(field_name) is None:
+                continue
+            value = item[field_name]
+            if many:
+                if isinstance(value, str) or not hasattr(value, '__iter__'):
+                    continue
+                values.extend(value)
+            else:
+                values.append(value)
+        relation.prefetch(values)
@@ -1,7 +1,7 @@
 # coding: utf-8
 from importlib import import_module
 
-from django.db.models import Q
+from django.db.models import Exists, OuterRef, Q
 from django.conf import settings
 from django.contrib.auth import get_user_model
 
@@ -18,6 +18,10 @@ DIVIDER_MODELs = "{}s".format(DIVIDER_MODEL)
 DIVIDER_MODELs_LOWER = DIVIDER_MODELs.lower()
 DIVIDER_MODEL_LOWER = DIVIDER_MODEL.lower()
 
+#: Annotation set on the instances fetched for an update or a deletion,
+#: telling whether the user is allowed to modify them
+WRITE_PERMISSION_ANNOTATION = 'user_can_write'
+
 minimum_level_method_map = {
     'authenticated': lambda x: x.is_authenticated is True,
     'manager': lambda x: x.is_at_least_staff is True,
@@ -279,6 +283,10 @@ class UserAccessPermission(permissions.BasePermission):
             else:
                 return False
         else:
+            can_write = getattr(obj, WRITE_PERMISSION_ANNOTATION, None)
+            if can_write is not None:
+                #: Evaluated with the instance by `annotate_write_permission`
+                return authenticated and can_write
             return authenticated and (
                 (user.is_at_least_admin)
                 or (
@@ -297,6 +305,62 @@ class UserAccessPermission(permissions.BasePermission):
             )
 
 
+def filter_queryset_by_object_permissions(queryset, user):
+    """
+    Keep the instances of the queryset that the user is allowed to update or
+    delete, with the same rules as `UserAccessPermission`
+    `has_object_permission` for the non-user models, in a single query
+    """
+    if queryset.model == get_user_model():
+        raise ValueError(
+            "Queryset of model User cannot be filtered by permissions"
+        )
+    if user.is_authenticated is not True:
+        return queryset.none()
+    if user.is_at_least_admin:
+        return queryset
+
+    user_groups_pks = user.concrete_groups.values('pk')
+    conditions = (
+        Q(created_by__pk=user.pk)
+        | Q(can_admin_users__pk=user.pk)
+        | Q(can_admin_groups__pk__in=user_groups_pks)
+    )
+    if user.is_at_least_staff:
+        model_name = queryset.model.__name__
+        user_scopes_pks = getattr(user, DIVIDER_MODELs_LOWER).values('pk')
+        if model_name in UNDIVIDED_MODEL:
+            return queryset
+        elif model_name == DIVIDER_MODEL:
+            conditions |= Q(pk__in=user_scopes_pks)
+        else:
+            conditions |= Q(
+                **{'{}__isnull'.format(DIVIDER_MODEL_LOWER): True}
+            ) | Q(
+                **{'{}__pk__in'.format(DIVIDER_MODEL_LOWER): user_scopes_pks}
+            )
+    return queryset.filter(
+        pk__in=queryset.model.objects.filter(conditions).values('pk')
+    )
+
+
+def annotate_write_permission(queryset, user):
+    """
+    Annotate the instances with `WRITE_PERMISSION_ANNOTATION`, evaluated in
+    the query fetching them, so that `has_object_permission` does not query
+    their ACL afterwards
+    """
+    if user.is_authenticated is not True or user.is_at_least_admin:
+        #: The permission does not depend on the instance
+        return queryset
+    allowed_queryset = filter_queryset_by_object_permissions(
+        queryset.model.objects.filter(pk=OuterRef('pk')), user
+    )
+    return queryset.annotate(
+        **{WRITE_PERMISSION_ANNOTATION: Exists(allowed_queryset)}
+    )
+
+
 def get_available_scope_pks_for(user):
     all_divider_pk = list(
         set(getattr(user, DIVIDER_MODELs_LOWER).values_list('pk', flat=True))
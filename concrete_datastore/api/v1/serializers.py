@@ -5,9 +5,11 @@ from importlib import import_module
 from django.contrib.auth import get_user_model
 from django.conf import settings
 from django.apps import apps
+from django.db.models.signals import pre_save
 
 from rest_framework.reverse import reverse
 from rest_framework import serializers
+from rest_framework.utils import model_meta
 from drf_extra_fields.geo_fields import PointField
 
 from concrete_datastore.concrete.models import LIST_USER_LEVEL
@@ -32,6 +34,7 @@ from concrete_datastore.api.v1.exceptions import (
     PasswordInsecureValidationError,
 )
 from concrete_datastore.api.v1.signals import build_absolute_uri
+from concrete_datastore.api.v1.fields import BatchedPrimaryKeyRelatedField
 
 concrete = apps.get_app_config('concrete')
 
@@ -425,6 +428,9 @@ def make_serializer_class(
             )
 
     attrs.update(custom_fields_attrs)
+    detail_url_name = "{}:{}-detail".format(
+        api_namespace, meta_model.get_dashed_case_class_name()
+    )
 
     class _ModelSerializer(serializers.ModelSerializer):
         url = serializers.SerializerMethodField()
@@ -438,12 +444,7 @@ def make_serializer_class(
             return None
 
         def get_url(self, obj):
-            uri = reverse(
-                "{}:{}-detail".format(
-                    api_namespace, meta_model.get_dashed_case_class_name()
-                ),
-                args=(obj.pk,),
-            )
+            uri = reverse(detail_url_name, args=(obj.pk,))
             if hasattr(self, '_context'):
                 if 'request' in self._context:
                     request = self._context['request']
@@ -456,6 +457,33 @@ def make_serializer_class(
             except Exception:
                 return ''
 
+        def update(self, instance, validated_data):
+            #: A partial update only writes the given columns, unless a
+            #: pre_save receiver may change other fields of the instance
+            if (
+                not self.partial
+                or isinstance(instance, get_user_model())
+                or pre_save.has_listeners(type(instance))
+            ):
+                return super().update(instance, validated_data)
+
+            serializers.raise_errors_on_nested_writes(
+                'update', self, validated_data
+            )
+            info = model_meta.get_field_info(instance)
+            m2m_fields = []
+            update_fields = {'modification_date'}
+            for attr, value in validated_data.items():
+                if attr in info.relations and info.relations[attr].to_many:
+                    m2m_fields.append((attr, value))
+                else:
+                    setattr(instance, attr, value)
+                    update_fields.add(attr)
+            instance.save(update_fields=sorted(update_fields))
+            for attr, value in m2m_fields:
+                getattr(instance, attr).set(value)
+            return instance
+
     for name, field in enum_fields:
         attrs.update({f'validate_{name}': get_field_validator(field=field)})
         if field.type.startswith("rel_i"):
@@ -464,7 +492,7 @@ def make_serializer_class(
             required = not field.f_args.get("blank", False)
             attrs.update(
                 {
-                    '{}_uid'.format(name): serializers.PrimaryKeyRelatedField(
+                    '{}_uid'.format(name): BatchedPrimaryKeyRelatedField(
                         source=name,
                         many=True,
                         allow_null=True,
@@ -483,7 +511,7 @@ def make_serializer_class(
             null = field.f_args.get("null", False)
             attrs.update(
                 {
-                    '{}_uid'.format(name): serializers.PrimaryKeyRelatedField(
+                    '{}_uid'.format(name): BatchedPrimaryKeyRelatedField(
                         many=False,
                         source=name,
                         allow_null=null,
@@ -4,8 +4,10 @@ import logging
 import decimal
 import uuid
 import sys
+import threading
 import re
 import os
+from contextlib import nullcontext
 from urllib.parse import urljoin, unquote, urlparse, urlunparse
 from importlib import import_module
 from itertools import chain
@@ -13,6 +15,7 @@ from datetime import date
 
 from django_filters.rest_framework import DjangoFilterBackend
 from django.contrib.auth.models import AnonymousUser
+from django.db import IntegrityError, transaction
 from django.db.models.deletion import ProtectedError
 from django.core.exceptions import (
     PermissionDenied,
@@ -20,6 +23,7 @@ from django.core.exceptions import (
     SuspiciousOperation,
 )
 from django.contrib.auth import authenticate, get_user_model
+from django.http import FileResponse
 from django.http.request import QueryDict
 from django.utils import timezone
 from django.apps import apps
@@ -33,20 +37,29 @@ from rest_framework.status import (
     HTTP_400_BAD_REQUEST,
     HTTP_429_TOO_MANY_REQUESTS,
     HTTP_201_CREATED,
+    HTTP_202_ACCEPTED,
     HTTP_403_FORBIDDEN,
+    HTTP_404_NOT_FOUND,
     HTTP_401_UNAUTHORIZED,
     HTTP_200_OK,
+    HTTP_409_CONFLICT,
     HTTP_412_PRECONDITION_FAILED,
     HTTP_204_NO_CONTENT,
+    HTTP_503_SERVICE_UNAVAILABLE,
 )
+from rest_framework.validators import UniqueTogetherValidator
 from rest_framework import authentication, permissions, generics, viewsets
 
 from concrete_datastore.authentication.mfa import is_mfa_enabled
 from concrete_datastore.concrete.models import (  # pylint:disable=E0611
     AuthToken,
+    ChangeLogEntry,
     DeletedModel,
     DIVIDER_MODEL,
     UNDIVIDED_MODEL,
+    ExportJob,
+    ImportJob,
+    IngestionBatch,
     PasswordChangeToken,
     Email,
     SecureConnectToken,
@@ -61,9 +74,17 @@ from concrete_datastore.api.v1.permissions import (
     UserAccessPermission,
     filter_queryset_by_permissions,
     filter_queryset_by_divider,
+    filter_queryset_by_object_permissions,
+    annotate_write_permission,
+    check_minimum_level,
+    check_roles,
 )
 from concrete_datastore.api.v1.responses import ConcreteBadResponse
 from concrete_datastore.api.v1.pagination import ExtendedPagination
+from concrete_datastore.api.v1.digest import (
+    compute_digest,
+    is_valid_prefix as is_valid_digest_prefix,
+)
 from concrete_datastore.api.v1.serializers import (
     AuthLoginSerializer,
     UserSerializer,
@@ -101,13 +122,67 @@ from concrete_datastore.api.v1.authentication import (
 from concrete_datastore.concrete.automation.signals import user_logged_in
 from concrete_datastore.concrete.constants import MFA_OTP
 from concrete_datastore.concrete.meta import list_of_meta
-from concrete_datastore.concrete.meta import meta_models, meta_registered
+from concrete_datastore.concrete.changelog import (
+    format_cursor,
+    get_entries_after,
+    get_scope_field_name,
+    parse_cursor,
+)
+from concrete_datastore.concrete.changelog import PERMISSION_FIELDS
+from concrete_datastore.concrete.deletion import collect_deletions
+from concrete_datastore.concrete.scope_reassignment import reassign_scope
+from concrete_datastore.concrete.user_tracked_fields import (
+    remove_user_from_tracked_fields,
+)
+from concrete_datastore.concrete.automation.tasks import (
+    async_process_ingestion_batches,
+    async_run_export_job,
+    async_run_import_job,
+    async_remove_user_from_tracked_fields,
+)
+from concrete_datastore.concrete.ingestion import (
+    get_pending_items_count,
+    get_unknown_fields,
+    is_ingestion_enabled,
+    serialize_ingestion_batch,
+)
+from concrete_datastore.concrete.exports import (
+    get_or_create_export_job,
+    serialize_export_job,
+)
+from concrete_datastore.concrete.imports import (
+    ImportFileError,
+    get_import_format,
+    serialize_import_job,
+)
+from concrete_datastore.api.v1.fields import (
+    RELATED_INSTANCES_CACHE_KEY,
+    prefetch_related_instances,
+)
+from concrete_datastore.api.v1.bulk import (
+    bulk_create_instances,
+    bulk_update_instances,
+    share_instances,
+    get_key,
+    lock_instances_by_key,
+    upsert_instances,
+)
+from concrete_datastore.concrete.meta import get_model_metadata, meta_models
 from concrete_datastore.api.v1 import DEFAULT_API_NAMESPACE
 from concrete_datastore.api.v1.exceptions import (
     PasswordInsecureValidationError,
+    UpsertConflictError,
     WrongEntityUIDError,
 )
-from concrete_datastore.interfaces.csv import csv_streaming_response
+from concrete_datastore.interfaces.csv import (
+    COMPRESSIONS,
+    csv_streaming_response,
+)
+from concrete_datastore.interfaces.columnar import (
+    COLUMNAR_FORMATS,
+    columnar_streaming_response,
+    is_columnar_export_available,
+)
 
 UserModel = get_user_model()
 
@@ -162,35 +237,92 @@ def parse_to_float(query_param):
 
 
 def remove_instances_user_tracked_fields(instance, removed_dividers_pks=None):
+    """
+    Remove the user from the `can_view_users` and `can_admin_users` of the
+    instances of the removed scopes, in a Celery task once the transaction
+    is committed if `ASYNC_USER_TRACKED_FIELDS_CLEANUP` is set
+    """
     if not removed_dividers_pks:
         return
-
-    divider_related_models = [
-        'EntityDividerModel',
-        'UndividedModel',
-        'DefaultDivider',
-        'User',
-        DIVIDER_MODEL,
+    removed_dividers_pks = [
+        getattr(divider, 'pk', divider) for divider in removed_dividers_pks
     ]
-    models_names = []
-    for model in meta_models:
-        model_name = model.get_model_name()
-        if (
-            model_name not in divider_related_models
-            and model_name not in UNDIVIDED_MODEL
-        ):
-            models_names.append(model_name)
 
-    _filter = {'{}__in'.format(DIVIDER_MODEL.lower()): removed_dividers_pks}
-    for model in models_names:
-        c_model = apps.get_model('concrete.{}'.format(model))
-        instances = c_model.objects.filter(**_filter)
-        can_view_instances = instances.filter(can_view_users__pk=instance.pk)
-        can_admin_instances = instances.filter(can_admin_users__pk=instance.pk)
-        for i in can_view_instances:
-            i.can_view_users.remove(instance.pk)
-        for i in can_admin_instances:
-            i.can_admin_users.remove(instance.pk)
+    if settings.ASYNC_USER_TRACKED_FIELDS_CLEANUP is True:
+        kwargs = {
+            'user_pk': str(instance.pk),
+            'removed_dividers_pks': [str(pk) for pk in removed_dividers_pks],
+        }
+        transaction.on_commit(
+            lambda: async_remove_user_from_tracked_fields.apply_async(
+                queue='users_cleanup', kwargs=kwargs
+            )
+        )
+    else:
+        remove_user_from_tracked_fields(instance.pk, removed_dividers_pks)
+
+
+def schedule_ingestion(model_name):
+    """
+    Hand the pending ingestion batches of the model to the `ingestion`
+    queue if `ASYNC_INGESTION` is set, otherwise leave them to the periodic
+    task `process_pending_ingestion_batches`: they are never processed
+    within the request
+    """
+    if settings.ASYNC_INGESTION is True:
+        async_process_ingestion_batches.apply_async(
+            queue='ingestion', kwargs={'model_name': model_name}
+        )
+
+
+def schedule_export(job_pk):
+    """
+    Write the file of the export job in a task of the `exports` queue: the
+    exports are never written within the request
+    """
+    async_run_export_job.apply_async(
+        queue='exports', kwargs={'job_pk': str(job_pk)}
+    )
+
+
+def schedule_import(job_pk):
+    """
+    Import the file of the import job in a task of the `imports` queue: the
+    imports are never run within the request
+    """
+    async_run_import_job.apply_async(
+        queue='imports', kwargs={'job_pk': str(job_pk)}
+    )
+
+
+def get_reassigned_scopes(data):
+    """
+    Return the source and target dividers of the scope reassignment
+    request, and the error response if they are invalid
+    """
+    divider_model = apps.get_model('concrete.{}'.format(DIVIDER_MODEL))
+    dividers = []
+    for key in ('source_scope_uid', 'target_scope_uid'):
+        uid = data.get(key) if isinstance(data, dict) else None
+        try:
+            dividers.append(divider_model.objects.get(pk=uuid.UUID(str(uid))))
+        except (ValueError, divider_model.DoesNotExist):
+            return (
+                None,
+                None,
+                ConcreteBadResponse(
+                    message='{} should be the uid of a scope'.format(key)
+                ),
+            )
+    if dividers[0].pk == dividers[1].pk:
+        return (
+            None,
+            None,
+            ConcreteBadResponse(
+                message='The source and target scopes should be different'
+            ),
+        )
+    return dividers[0], dividers[1], None
 
 
 def validate_request_permissions(request):
@@ -1290,10 +1422,7 @@ class RegisterApiView(SecurityRulesMixin, generics.GenericAPIView):
             )
 
         #:  Add the fields in request.POST
-        user_meta_model = meta_registered[settings.AUTH_USER_MODEL]
-        user_model_field_names = [
-            field[0] for field in user_meta_model.get_fields()
-        ]
+        user_model_field_names = get_model_metadata('User').field_names
         data_to_post = {
             key: value
             for key, value in request.data.items()
@@ -1615,15 +1744,139 @@ class PaginatedViewSet(object):
             return Response(status=HTTP_204_NO_CONTENT)
         export_fields = self.export_fields
 
+        compress = request.query_params.get('c_compress')
+        if compress is not None and compress not in COMPRESSIONS:
+            return ConcreteBadResponse(
+                message='c_compress should be one of {}'.format(
+                    ', '.join(COMPRESSIONS)
+                )
+            )
+        export_format = request.query_params.get('c_format', 'csv')
+        if export_format != 'csv':
+            error_message = None
+            if export_format not in COLUMNAR_FORMATS:
+                error_message = 'c_format should be one of csv, {}'.format(
+                    ', '.join(COLUMNAR_FORMATS)
+                )
+            elif not is_columnar_export_available():
+                error_message = 'The {} format is not available'.format(
+                    export_format
+                )
+            elif compress is not None:
+                error_message = 'c_compress is only supported by csv'
+            if error_message is not None:
+                return ConcreteBadResponse(message=error_message)
+
+        if request.query_params.get('c_async', 'false').lower() == 'true':
+            return self.get_async_export(request)
+
         queryset = self.filter_queryset(self.get_queryset())
         export_queryset = queryset.values(*export_fields)
 
+        if export_format in COLUMNAR_FORMATS:
+            return columnar_streaming_response(
+                request, export_queryset, export_fields, export_format
+            )
         response = csv_streaming_response(
-            request, export_queryset, export_fields
+            request, export_queryset, export_fields, compress=compress
         )
 
         return response
 
+    def get_async_export(self, request):
+        """
+        Queue the export in a background job, or return the job of an
+        identical request if it is still running or its file has not expired
+        """
+        if not request.user.is_authenticated:
+            return Response(
+                data={
+                    'message': 'Background exports require authentication',
+                    '_errors': ['NOT_AUTHENTICATED'],
+                },
+                status=HTTP_401_UNAUTHORIZED,
+            )
+        if settings.ASYNC_EXPORTS is not True:
+            return Response(
+                data={
+                    'message': 'Background exports are not enabled',
+                    '_errors': ['ASYNC_EXPORTS_DISABLED'],
+                },
+                status=HTTP_503_SERVICE_UNAVAILABLE,
+            )
+        job, created = get_or_create_export_job(
+            model_name=self.model_class.__name__,
+            user=request.user,
+            scope_uid=self.get_entity_uid(request),
+            query_params=request.query_params,
+        )
+        if created:
+            transaction.on_commit(lambda: schedule_export(job.pk))
+        return Response(
+            data=self.serialize_export_job(request, job),
+            status=(
+                HTTP_200_OK
+                if job.status == ExportJob.STATUS_DONE
+                else HTTP_202_ACCEPTED
+            ),
+        )
+
+    def serialize_export_job(self, request, job):
+        data = serialize_export_job(job)
+        if job.status == ExportJob.STATUS_DONE:
+            #: Relative to the `export/` and `export-job/` urls
+            data['download_url'] = request.build_absolute_uri(
+                '../export-job/?uid={}&c_download=true'.format(job.pk)
+            )
+        return data
+
+    @action(detail=False, url_path='export-job', url_name='export-job')
+    def get_export_job(self, request):
+        """
+        Return the state of the export job given by the `uid` query param,
+        or its file with `c_download=true` once it is done
+        """
+        try:
+            job_uid = uuid.UUID(request.query_params.get('uid', ''))
+        except ValueError:
+            return ConcreteBadResponse(
+                message='A valid uid of export job is required'
+            )
+        job = ExportJob.objects.filter(
+            pk=job_uid,
+            model_name=self.model_class.__name__,
+            created_by=(
+                request.user if request.user.is_authenticated else None
+            ),
+        ).first()
+        if job is None or (
+            job.expiry_date is not None and job.expiry_date <= timezone.now()
+        ):
+            return Response(
+                data={
+                    'message': 'Export job not found',
+                    '_errors': ['NOT_FOUND'],
+                },
+                status=HTTP_404_NOT_FOUND,
+            )
+
+        if request.query_params.get('c_download', 'false').lower() != 'true':
+            return Response(data=self.serialize_export_job(request, job))
+        if job.status != ExportJob.STATUS_DONE:
+            return ConcreteBadResponse(message='The export is not ready')
+        if job.export_format in COLUMNAR_FORMATS:
+            content_type = COLUMNAR_FORMATS[job.export_format]['content_type']
+        elif job.compress == 'gzip':
+            content_type = 'application/gzip'
+        else:
+            content_type = 'text/csv'
+        return FileResponse(
+            job.file.open('rb'),
+            as_attachment=True,
+            filename=os.path.basename(job.file.name),
+            content_type=content_type,
+        )
+
     @action(
         detail=False,
         url_path='stats{}'.format(URL_TIMESTAMP),
@@ -2148,6 +2401,166 @@ class ApiModelViewSet(PaginatedViewSet, viewsets.ModelViewSet):
         else:
             return queryset
 
+    def get_object(self):
+        """
+        Fetch the instance targeted by the request only once, the update and
+        destroy paths calling this method several times
+        """
+        if getattr(self, '_instance', None) is None:
+            if self.request.method in ('PUT', 'PATCH', 'DELETE'):
+                self._instance = self.get_object_for_write()
+            else:
+                self._instance = super().get_object()
+        return self._instance
+
+    def get_object_for_write(self):
+        """
+        Fetch the instance to update or delete with the permission of the
+        user on it, and lock its row if `API_LOCK_OBJECTS_ON_WRITE` is set
+        """
+        queryset = self.filter_queryset(self.get_queryset())
+        if settings.API_LOCK_OBJECTS_ON_WRITE:
+            #: FOR UPDATE is not allowed with DISTINCT
+            queryset = self.model_class.objects.filter(
+                pk__in=queryset.values('pk')
+            ).select_for_update(of=('self',))
+        if self.model_class is not UserModel:
+            queryset = annotate_write_permission(queryset, self.request.user)
+
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        instance = generics.get_object_or_404(
+            queryset, **{self.lookup_field: self.kwargs[lookup_url_kwarg]}
+        )
+        self.check_object_permissions(self.request, instance)
+        return instance
+
+    def get_write_transaction(self):
+        if settings.API_LOCK_OBJECTS_ON_WRITE:
+            #: The lock is held until the end of the transaction
+            return transaction.atomic()
+        return nullcontext()
+
+    @action(detail=False, url_path='digest', url_name='digest')
+    def get_digest(self, request):
+        if request.parser_context["view"].model_class.__name__ == "User":
+            validate_request_permissions(request=request)
+
+        prefix = request.GET.get('c_digest_prefix', '').lower()
+        if not is_valid_digest_prefix(prefix):
+            return Response(
+                data={
+                    'message': (
+                        'wrong argument: c_digest_prefix has to be an '
+                        'hexadecimal string of at most 31 characters'
+                    ),
+                    '_errors': ['INVALID_QUERY'],
+                },
+                status=HTTP_400_BAD_REQUEST,
+            )
+
+        queryset = self.filter_queryset(self.get_queryset())
+        #: Select the instances again by pk to get rid of the duplicates
+        #: and joins introduced by the permission filters
+        model_class = self.model_class or queryset.model
+        digest_queryset = model_class.objects.filter(
+            pk__in=queryset.values('pk')
+        )
+
+        data = compute_digest(digest_queryset, prefix=prefix)
+        data['model_name'] = model_class.__name__
+        return Response(data)
+
+    @action(detail=False, url_path='changes', url_name='changes')
+    def get_changes(self, request):
+        if request.parser_context["view"].model_class.__name__ == "User":
+            validate_request_permissions(request=request)
+
+        since_cursor = request.GET.get('c_since_cursor', '')
+        try:
+            since_transaction_id, since_sequence = parse_cursor(since_cursor)
+        except ValueError:
+            return Response(
+                data={
+                    'message': (
+                        'wrong argument: c_since_cursor has to be a cursor '
+                        'returned by this endpoint'
+                    ),
+                    '_errors': ['INVALID_QUERY'],
+                },
+                status=HTTP_400_BAD_REQUEST,
+            )
+
+        queryset = self.filter_queryset(self.get_queryset())
+        model_class = self.model_class or queryset.model
+        scope_field_name = get_scope_field_name(model_class)
+
+        entries = get_entries_after(
+            ChangeLogEntry.objects.filter(model_name=model_class.__name__),
+            since_transaction_id,
+            since_sequence,
+        )
+        divider = self.get_divider()
+        if divider is not None and scope_field_name:
+            entries = entries.filter(scope_uid=divider.pk)
+        page_size = settings.API_CHANGE_LOG_PAGE_SIZE
+        entries = list(
+            entries.values_list(
+                'transaction_id', 'sequence', 'uid', 'scope_uid', 'operation'
+            )[: page_size + 1]
+        )
+        has_more = len(entries) > page_size
+        entries = entries[:page_size]
+
+        #: Instances changed but not visible anymore with the current
+        #: permissions and filters are reported as deleted, only if they
+        #: belong to a scope of the user: the uids of the instances of the
+        #: other scopes are not disclosed
+        visible_uids = set(
+            queryset.filter(
+                pk__in={
+                    entry[2]
+                    for entry in entries
+                    if entry[4] != ChangeLogEntry.OPERATION_DELETE
+                }
+            ).values_list('pk', flat=True)
+        )
+        user = request.user
+        at_least_admin = False if user.is_anonymous else user.is_at_least_admin
+        user_scopes = set()
+        if not at_least_admin and not user.is_anonymous and scope_field_name:
+            user_scopes = set(
+                getattr(user, '{}s'.format(DIVIDER_MODEL.lower())).values_list(
+                    'pk', flat=True
+                )
+            )
+        #: Only the last change of each instance is returned
+        last_changes = {}
+        for _, sequence, uid, scope_uid, operation in entries:
+            if uid not in visible_uids:
+                if not at_least_admin and scope_uid not in user_scopes:
+                    continue
+                operation = ChangeLogEntry.OPERATION_DELETE
+            last_changes.pop(uid, None)
+            last_changes[uid] = {
+                'sequence': sequence,
+                'uid': uid,
+                'operation': operation,
+            }
+
+        return Response(
+            {
+                'model_name': model_class.__name__,
+                'since_cursor': since_cursor,
+                'last_cursor': (
+                    format_cursor(*entries[-1][:2])
+                    if entries
+                    else since_cursor
+                ),
+                'has_more': has_more,
+                'changes': list(last_changes.values()),
+            }
+        )
+
     def get_list_display(self):
         if self.list_display is None:
             raise ValueError(
@@ -2185,7 +2598,7 @@ class ApiModelViewSet(PaginatedViewSet, viewsets.ModelViewSet):
     def get_nested_serializer_class(self):
         return self.serializer_class_nested
 
-    def perform_create(self, serializer):
+    def get_creation_attrs(self):
         attrs = {}
         if self.request.user.is_authenticated:
             attrs.update({'created_by': self.request.user})
@@ -2197,6 +2610,10 @@ class ApiModelViewSet(PaginatedViewSet, viewsets.ModelViewSet):
 
         if divider is not None:
             attrs.update({DIVIDER_MODEL.lower(): divider})
+        return attrs
+
+    def perform_create(self, serializer):
+        attrs = self.get_creation_attrs()
 
         for name in self.file_fields:
             file_data = self.request.data.get(name, None)
@@ -2208,6 +2625,761 @@ class ApiModelViewSet(PaginatedViewSet, viewsets.ModelViewSet):
     def create(self, *args, **kwargs):
         return super(ApiModelViewSet, self).create(*args, **kwargs)
 
+    def check_bulk_method_permission(self, method):
+        user = self.request.user
+        allowed = check_minimum_level(method, user, self.model_class)
+        if allowed and settings.USE_CONCRETE_ROLES:
+            allowed = check_roles(method, user, self.model_class)
+        return allowed
+
+    @action(
+        detail=False,
+        methods=['post'],
+        url_path='bulk',
+        url_name='bulk',
+    )
+    def bulk(self, request):
+        model_class = self.model_class
+        if model_class is UserModel:
+            return Response(
+                data={
+                    'message': 'Bulk operations are not allowed on users',
+                    '_errors': ['INVALID_QUERY'],
+                },
+                status=HTTP_400_BAD_REQUEST,
+            )
+
+        data = request.data
+        items = (
+            {
+                operation: data.get(operation, [])
+                for operation in ('create', 'update', 'delete')
+            }
+            if isinstance(data, dict)
+            else None
+        )
+        if items is None or not all(
+            isinstance(operation_items, list)
+            for operation_items in items.values()
+        ):
+            return ConcreteBadResponse(
+                message=(
+                    'Expected an object with lists of items in the keys '
+                    '"create", "update" and "delete"'
+                )
+            )
+        total_items = sum(len(v) for v in items.values())
+        if total_items > settings.API_BULK_MAX_ITEMS:
+            return ConcreteBadResponse(
+                message='At most {} items can be sent at once'.format(
+                    settings.API_BULK_MAX_ITEMS
+                )
+            )
+
+        for operation, method in (('update', 'PATCH'), ('delete', 'DELETE')):
+            if items[operation] and not self.check_bulk_method_permission(
+                method
+            ):
+                return Response(
+                    data={
+                        'message': 'User not allowed to {} instances'.format(
+                            operation
+                        ),
+                        '_errors': ['PERMISSION_DENIED'],
+                    },
+                    status=HTTP_403_FORBIDDEN,
+                )
+
+        errors = []
+
+        def add_error(operation, index, uid, item_errors, error_code):
+            errors.append(
+                {
+                    'operation': operation,
+                    'index': index,
+                    'uid': uid,
+                    'errors': item_errors,
+                    '_errors': [error_code],
+                }
+            )
+
+        #: Resolve all the targeted instances and the permissions on them
+        #: with one query each
+        target_uids = {}
+        for operation in ('update', 'delete'):
+            for index, item in enumerate(items[operation]):
+                if operation == 'update':
+                    uid = item.get('uid') if isinstance(item, dict) else None
+                else:
+                    uid = item
+                try:
+                    target_uids[(operation, index)] = uuid.UUID(str(uid))
+                except ValueError:
+                    add_error(
+                        operation,
+                        index,
+                        uid,
+                        {'uid': ['A valid uid is required']},
+                        'INVALID_DATA',
+                    )
+        visible_queryset = model_class.objects.filter(
+            pk__in=self.get_queryset()
+            .filter(pk__in=set(target_uids.values()))
+            .values('pk')
+        )
+        visible_uids = set(visible_queryset.values_list('pk', flat=True))
+        allowed_uids = set(
+            filter_queryset_by_object_permissions(
+                visible_queryset, request.user
+            ).values_list('pk', flat=True)
+        )
+        for (operation, index), uid in target_uids.items():
+            if uid not in visible_uids:
+                add_error(
+                    operation, index, uid, {'uid': ['Not found']}, 'NOT_FOUND'
+                )
+            elif uid not in allowed_uids:
+                add_error(
+                    operation,
+                    index,
+                    uid,
+                    {'uid': ['Permission denied']},
+                    'PERMISSION_DENIED',
+                )
+
+        with transaction.atomic():
+            instances_to_update = (
+                model_class.objects.select_for_update().in_bulk(
+                    [
+                        target_uids[('update', index)]
+                        for index in range(len(items['update']))
+                        if target_uids.get(('update', index)) in allowed_uids
+                    ]
+                )
+            )
+
+            #: The related instances referenced by all the items are loaded
+            #: with one query per relation and shared by the serializers
+            serializer_class = self.get_flat_serializer_class()
+            context = self.get_serializer_context()
+            context[RELATED_INSTANCES_CACHE_KEY] = {}
+            prefetch_related_instances(
+                serializer_class(context=context),
+                items['create'] + items['update'],
+            )
+
+            creation_attrs = self.get_creation_attrs()
+            creations = []
+            for index, item in enumerate(items['create']):
+                serializer = serializer_class(data=item, context=context)
+                if serializer.is_valid():
+                    creations.append(
+                        {**serializer.validated_data, **creation_attrs}
+                    )
+                else:
+                    add_error(
+                        'create',
+                        index,
+                        None,
+                        serializer.errors,
+                        'INVALID_DATA',
+                    )
+
+            updates = []
+            for index, item in enumerate(items['update']):
+                instance = instances_to_update.get(
+                    target_uids.get(('update', index))
+                )
+                if instance is None:
+                    continue
+                serializer = serializer_class(
+                    instance, data=item, partial=True, context=context
+                )
+                if serializer.is_valid():
+                    updates.append((instance, serializer.validated_data))
+                else:
+                    add_error(
+                        'update',
+                        index,
+                        instance.pk,
+                        serializer.errors,
+                        'INVALID_DATA',
+                    )
+
+            if errors:
+                return Response(
+                    data={
+                        'message': 'No item has been saved',
+                        '_errors': ['INVALID_DATA'],
+                        'errors': sorted(
+                            errors,
+                            key=lambda e: (e['operation'], e['index']),
+                        ),
+                    },
+                    status=HTTP_400_BAD_REQUEST,
+                )
+
+            deleted_uids = [
+                target_uids[('delete', index)]
+                for index in range(len(items['delete']))
+            ]
+            try:
+                with transaction.atomic():
+                    created = bulk_create_instances(model_class, creations)
+                    updated = bulk_update_instances(model_class, updates)
+                    with collect_deletions():
+                        model_class.objects.filter(
+                            pk__in=deleted_uids
+                        ).delete()
+            except ProtectedError as e:
+                protected_objects_list = [
+                    f'{o._meta.model_name} - {str(o.uid)}'
+                    for o in e.protected_objects
+                ]
+                return Response(
+                    status=HTTP_412_PRECONDITION_FAILED,
+                    data={
+                        'message': (
+                            'Attempting to delete protected related '
+                            f'instances: related to {protected_objects_list}'
+                        ),
+                        '_errors': ["PROTECTED_RELATION"],
+                    },
+                )
+            except IntegrityError as e:
+                return ConcreteBadResponse(
+                    message='No item has been saved: {}'.format(e)
+                )
+
+        return Response(
+            data={
+                'created': [instance.pk for instance in created],
+                'updated': [instance.pk for instance in updated],
+                'deleted': deleted_uids,
+            },
+            status=HTTP_200_OK,
+        )
+
+    @action(
+        detail=False,
+        methods=['get', 'post'],
+        url_path='ingest',
+        url_name='ingest',
+    )
+    def ingest(self, request):
+        """
+        Acknowledge items whose creation is deferred to the ingestion
+        consumer (POST), or return the state of the batch given by the
+        `uid` query param (GET)
+        """
+        model_name = self.model_class.__name__
+        if not self.ingestion_enabled:
+            return ConcreteBadResponse(
+                message='Ingestion is not enabled for model {}'.format(
+                    model_name
+                )
+            )
+
+        if request.method == 'GET':
+            #: The anonymous batches can not be told apart
+            if not request.user.is_authenticated:
+                return Response(
+                    data={
+                        'message': 'Polling a batch requires authentication',
+                        '_errors': ['NOT_AUTHENTICATED'],
+                    },
+                    status=HTTP_401_UNAUTHORIZED,
+                )
+            try:
+                batch_uid = uuid.UUID(request.query_params.get('uid', ''))
+            except ValueError:
+                return ConcreteBadResponse(
+                    message='A valid uid of batch is required'
+                )
+            batch = IngestionBatch.objects.filter(
+                pk=batch_uid, model_name=model_name, created_by=request.user
+            ).first()
+            if batch is None:
+                return Response(
+                    data={
+                        'message': 'Batch not found',
+                        '_errors': ['NOT_FOUND'],
+                    },
+                    status=HTTP_404_NOT_FOUND,
+                )
+            return Response(data=serialize_ingestion_batch(batch))
+
+        data = request.data
+        items = data if isinstance(data, list) else [data]
+        if not all(isinstance(item, dict) for item in items):
+            return ConcreteBadResponse(
+                message='Expected an object or a list of objects'
+            )
+        if len(items) > settings.API_BULK_MAX_ITEMS:
+            return ConcreteBadResponse(
+                message='At most {} items can be sent at once'.format(
+                    settings.API_BULK_MAX_ITEMS
+                )
+            )
+        unknown_fields = get_unknown_fields(model_name, items)
+        if unknown_fields:
+            return ConcreteBadResponse(
+                message='Unknown fields: {}'.format(', '.join(unknown_fields))
+            )
+
+        #: Backpressure: the clients are asked to slow down until the
+        #: consumers catch up
+        pending_items_count = get_pending_items_count(model_name)
+        if (
+            pending_items_count + len(items)
+            > settings.INGESTION_MAX_PENDING_ITEMS
+        ):
+            return Response(
+                data={
+                    'message': 'Too many items waiting to be processed',
+                    '_errors': ['TOO_MANY_PENDING_ITEMS'],
+                },
+                status=HTTP_429_TOO_MANY_REQUESTS,
+                headers={
+                    'Retry-After': str(settings.INGESTION_RETRY_AFTER_SECONDS)
+                },
+            )
+
+        creation_attrs = self.get_creation_attrs()
+        divider = creation_attrs.get(DIVIDER_MODEL.lower())
+        with transaction.atomic():
+            batch = IngestionBatch.objects.create(
+                model_name=model_name,
+                items=[dict(item) for item in items],
+                items_count=len(items),
+                created_by=creation_attrs.get('created_by'),
+                scope_uid=None if divider is None else divider.pk,
+            )
+            transaction.on_commit(lambda: schedule_ingestion(model_name))
+        return Response(
+            data=serialize_ingestion_batch(batch), status=HTTP_202_ACCEPTED
+        )
+
+    @action(
+        detail=False,
+        methods=['get', 'post'],
+        url_path='import',
+        url_name='import',
+    )
+    def import_file(self, request):
+        """
+        Queue the import of the CSV or NDJSON `file` (POST), or return the
+        state of the import job given by the `uid` query param (GET), or its
+        rejected rows with `c_download=true`
+        """
+        model_name = self.model_class.__name__
+        if not request.user.is_authenticated or (
+            not request.user.is_at_least_admin
+        ):
+            return Response(
+                data={
+                    'message': 'Only admins can import instances',
+                    '_errors': ['PERMISSION_DENIED'],
+                },
+                status=HTTP_403_FORBIDDEN,
+            )
+
+        if request.method == 'GET':
+            try:
+                job_uid = uuid.UUID(request.query_params.get('uid', ''))
+            except ValueError:
+                return ConcreteBadResponse(
+                    message='A valid uid of import job is required'
+                )
+            job = ImportJob.objects.filter(
+                pk=job_uid, model_name=model_name, created_by=request.user
+            ).first()
+            if job is None:
+                return Response(
+                    data={
+                        'message': 'Import job not found',
+                        '_errors': ['NOT_FOUND'],
+                    },
+                    status=HTTP_404_NOT_FOUND,
+                )
+            if request.query_params.get('c_download', 'false') != 'true':
+                return Response(data=serialize_import_job(job))
+            if not job.rejected_file:
+                return ConcreteBadResponse(message='No rejected rows')
+            return FileResponse(
+                job.rejected_file.open('rb'),
+                as_attachment=True,
+                filename=os.path.basename(job.rejected_file.name),
+                content_type='application/x-ndjson',
+            )
+
+        if model_name == 'User':
+            return ConcreteBadResponse(
+                message='The users are created with users-provisioning/'
+            )
+        if settings.ASYNC_IMPORTS is not True:
+            return Response(
+                data={
+                    'message': 'Imports are not enabled',
+                    '_errors': ['ASYNC_IMPORTS_DISABLED'],
+                },
+                status=HTTP_503_SERVICE_UNAVAILABLE,
+            )
+        uploaded_file = request.data.get('file')
+        if uploaded_file is None or isinstance(uploaded_file, str):
+            return ConcreteBadResponse(message='A file is required')
+        try:
+            file_format = get_import_format(
+                uploaded_file.name, request.data.get('format') or None
+            )
+        except ImportFileError as e:
+            return ConcreteBadResponse(message=str(e))
+
+        creation_attrs = self.get_creation_attrs()
+        divider = creation_attrs.get(DIVIDER_MODEL.lower())
+        with transaction.atomic():
+            job = ImportJob.objects.create(
+                model_name=model_name,
+                file=uploaded_file,
+                file_format=file_format,
+                scope_uid=None if divider is None else divider.pk,
+                created_by=request.user,
+            )
+            transaction.on_commit(lambda: schedule_import(job.pk))
+        return Response(
+            data=serialize_import_job(job), status=HTTP_202_ACCEPTED
+        )
+
+    def get_upsert_key_fields(self):
+        """
+        Return the fields identifying the instances to upsert: the set of
+        fields unique together given by the `key` query param (comma
+        separated), or the first one declared on the model
+        """
+        unique_together = self.model_class._meta.unique_together
+        key_param = self.request.query_params.get('key')
+        if key_param is None:
+            return unique_together[0] if unique_together else None
+        key_fields = tuple(key_param.split(','))
+        for fields in unique_together:
+            if set(fields) == set(key_fields):
+                return fields
+        return None
+
+    @action(
+        detail=False,
+        methods=['post'],
+        url_path='upsert',
+        url_name='upsert',
+    )
+    def upsert(self, request):
+        """
+        Create the given instance (or list of instances), or update the
+        existing instance with the same values of fields unique together
+        """
+        model_class = self.model_class
+        key_fields = self.get_upsert_key_fields()
+        if model_class is UserModel or key_fields is None:
+            return ConcreteBadResponse(
+                message='The key should be a set of fields unique together'
+            )
+
+        data = request.data
+        many = isinstance(data, list)
+        items = data if many else [data]
+        if not all(isinstance(item, dict) for item in items):
+            return ConcreteBadResponse(
+                message='Expected an object or a list of objects'
+            )
+        if len(items) > settings.API_BULK_MAX_ITEMS:
+            return ConcreteBadResponse(
+                message='At most {} items can be sent at once'.format(
+                    settings.API_BULK_MAX_ITEMS
+                )
+            )
+
+        errors = []
+
+        def add_error(index, item_errors, error_code):
+            errors.append(
+                {
+                    'index': index,
+                    'errors': item_errors,
+                    '_errors': [error_code],
+                }
+            )
+
+        serializer_class = self.get_flat_serializer_class()
+        context = self.get_serializer_context()
+        context[RELATED_INSTANCES_CACHE_KEY] = {}
+        prefetch_related_instances(serializer_class(context=context), items)
+
+        items_data, indexes_by_key = [], {}
+        for index, item in enumerate(items):
+            serializer = serializer_class(data=item, context=context)
+            #: The instances with the same key are updated instead
+            serializer.validators = [
+                validator
+                for validator in serializer.validators
+                if not isinstance(validator, UniqueTogetherValidator)
+            ]
+            if not serializer.is_valid():
+                add_error(index, serializer.errors, 'INVALID_DATA')
+                items_data.append(None)
+                continue
+            validated_data = serializer.validated_data
+            missing_fields = [
+                name for name in key_fields if name not in validated_data
+            ]
+            if missing_fields:
+                add_error(
+                    index,
+                    {
+                        name: ['This field is required']
+                        for name in missing_fields
+                    },
+                    'INVALID_DATA',
+                )
+            else:
+                key = get_key(model_class, key_fields, validated_data)
+                if key in indexes_by_key:
+                    add_error(
+                        index,
+                        {
+                            name: ['Duplicated key in the request']
+                            for name in key_fields
+                        },
+                        'INVALID_DATA',
+                    )
+                indexes_by_key[key] = index
+            items_data.append(validated_data)
+
+        try:
+            with transaction.atomic():
+                instances_by_key = lock_instances_by_key(
+                    model_class, key_fields, list(indexes_by_key)
+                )
+                existing = {
+                    indexes_by_key[key]: instance
+                    for key, instance in instances_by_key.items()
+                }
+                if existing and not self.check_bulk_method_permission('PATCH'):
+                    return Response(
+                        data={
+                            'message': 'User not allowed to update instances',
+                            '_errors': ['PERMISSION_DENIED'],
+                        },
+                        status=HTTP_403_FORBIDDEN,
+                    )
+                allowed_uids = set(
+                    filter_queryset_by_object_permissions(
+                        model_class.objects.filter(
+                            pk__in=self.get_queryset()
+                            .filter(pk__in=[i.pk for i in existing.values()])
+                            .values('pk')
+                        ),
+                        request.user,
+                    ).values_list('pk', flat=True)
+                )
+                for index, instance in existing.items():
+                    if instance.pk not in allowed_uids:
+                        add_error(
+                            index,
+                            {'uid': ['Permission denied']},
+                            'PERMISSION_DENIED',
+                        )
+
+                if errors:
+                    return Response(
+                        data={
+                            'message': 'No item has been saved',
+                            '_errors': ['INVALID_DATA'],
+                            'errors': sorted(errors, key=lambda e: e['index']),
+                        },
+                        status=HTTP_400_BAD_REQUEST,
+                    )
+
+                results = upsert_instances(
+                    model_class,
+                    key_fields,
+                    items_data,
+                    self.get_creation_attrs(),
+                    existing,
+                )
+        except UpsertConflictError as e:
+            return Response(
+                data={'message': str(e), '_errors': [e.detail]},
+                status=HTTP_409_CONFLICT,
+            )
+        except IntegrityError as e:
+            return ConcreteBadResponse(
+                message='No item has been saved: {}'.format(e)
+            )
+
+        if not many:
+            pk, created = results[0]
+            serializer = self.get_flat_serializer(
+                model_class.objects.get(pk=pk)
+            )
+            return Response(
+                data=serializer.data,
+                status=HTTP_201_CREATED if created else HTTP_200_OK,
+            )
+        return Response(
+            data={
+                'created': [pk for pk, created in results if created],
+                'updated': [pk for pk, created in results if not created],
+            },
+            status=HTTP_200_OK,
+        )
+
+    @action(
+        detail=False,
+        methods=['post'],
+        url_path='share',
+        url_name='share',
+    )
+    def share(self, request):
+        """
+        Add or remove users and groups to the permissions of all the
+        instances matching the filters of the query params
+        """
+        model_class = self.model_class
+        if model_class is UserModel:
+            return Response(
+                data={
+                    'message': 'Users cannot be shared',
+                    '_errors': ['INVALID_QUERY'],
+                },
+                status=HTTP_400_BAD_REQUEST,
+            )
+
+        data = request.data if isinstance(request.data, dict) else {}
+        operation = data.get('operation')
+        principals_uids = {
+            field_name: data.get(field_name, [])
+            for field_name in PERMISSION_FIELDS
+        }
+        if operation not in ('add', 'remove') or not all(
+            isinstance(uids, list) for uids in principals_uids.values()
+        ):
+            return ConcreteBadResponse(
+                message=(
+                    'Expected an "operation" ("add" or "remove") and lists '
+                    'of uids in the keys {}'.format(
+                        ', '.join(
+                            '"{}"'.format(name) for name in PERMISSION_FIELDS
+                        )
+                    )
+                )
+            )
+        if not self.check_bulk_method_permission('PATCH'):
+            return Response(
+                data={
+                    'message': 'User not allowed to update instances',
+                    '_errors': ['PERMISSION_DENIED'],
+                },
+                status=HTTP_403_FORBIDDEN,
+            )
+
+        #: Resolve the users and groups with one query per field
+        principals = {}
+        for field_name, uids in principals_uids.items():
+            try:
+                uids = {uuid.UUID(str(uid)) for uid in uids}
+            except ValueError:
+                return ConcreteBadResponse(
+                    message='Invalid uid in {}'.format(field_name)
+                )
+            related_model = model_class._meta.get_field(
+                field_name
+            ).related_model
+            principals[field_name] = list(
+                related_model.objects.filter(pk__in=uids).values_list(
+                    'pk', flat=True
+                )
+            )
+            if len(principals[field_name]) != len(uids):
+                return Response(
+                    data={
+                        'message': 'Unknown uid in {}'.format(field_name),
+                        '_errors': ['NOT_FOUND'],
+                    },
+                    status=HTTP_400_BAD_REQUEST,
+                )
+
+        queryset = self.filter_queryset(self.get_queryset())
+        matched_queryset = model_class.objects.filter(
+            pk__in=queryset.values('pk')
+        )
+        #: The permission is evaluated for all the instances at once
+        denied_count = matched_queryset.exclude(
+            pk__in=filter_queryset_by_object_permissions(
+                matched_queryset, request.user
+            ).values('pk')
+        ).count()
+        if denied_count:
+            return Response(
+                data={
+                    'message': (
+                        'User not allowed to share {} of the instances'.format(
+                            denied_count
+                        )
+                    ),
+                    '_errors': ['PERMISSION_DENIED'],
+                },
+                status=HTTP_403_FORBIDDEN,
+            )
+
+        with transaction.atomic():
+            shared_count = share_instances(
+                matched_queryset.select_for_update(),
+                principals,
+                remove=(operation == 'remove'),
+            )
+        return Response(
+            data={'operation': operation, 'objects_count': shared_count}
+        )
+
+    @action(
+        detail=False,
+        methods=['post'],
+        url_path='reassign-scope',
+        url_name='reassign-scope',
+    )
+    def reassign_queryset_scope(self, request):
+        """
+        Move the instances matching the filters of the query params from a
+        scope to another
+        """
+        if not request.user.is_at_least_admin:
+            return Response(
+                data={
+                    'message': 'Only admins can reassign the scopes',
+                    '_errors': ['PERMISSION_DENIED'],
+                },
+                status=HTTP_403_FORBIDDEN,
+            )
+        model_class = self.model_class
+        if get_scope_field_name(model_class) is None:
+            return ConcreteBadResponse(
+                message='Model {} is not divided'.format(model_class.__name__)
+            )
+        source_divider, target_divider, error_response = get_reassigned_scopes(
+            request.data
+        )
+        if error_response is not None:
+            return error_response
+
+        queryset = self.filter_queryset(self.get_queryset())
+        moved_count = reassign_scope(queryset, source_divider, target_divider)
+        return Response(
+            data={
+                'model_name': model_class.__name__,
+                'objects_count': moved_count,
+            }
+        )
+
     def handle_divider_update(self, request, request_user, instance):
         divider_model_name = "{}s".format(DIVIDER_MODEL.lower())
         # The request is either a simple dict or a QueryDict
@@ -2233,14 +3405,18 @@ class ApiModelViewSet(PaginatedViewSet, viewsets.ModelViewSet):
             )
             if instance_dividers:
                 instance_dividers_all = {
-                    str(p.uid) for p in instance_dividers.all()
+                    str(uid)
+                    for uid in instance_dividers.values_list('uid', flat=True)
                 }
             else:
                 instance_dividers_all = set()
 
             if request_user_dividers is not None:
                 request_user_dividers_all = {
-                    str(p.uid) for p in request_user_dividers.all()
+                    str(uid)
+                    for uid in request_user_dividers.values_list(
+                        'uid', flat=True
+                    )
                 }
             else:
                 request_user_dividers_all = set()
@@ -2272,21 +3448,24 @@ class ApiModelViewSet(PaginatedViewSet, viewsets.ModelViewSet):
                 request.data[divider_model_name] = list(union_dividers)
 
     def update(self, request, *args, **kwargs):
-        instance = self.get_object()
-        if isinstance(instance, UserModel):
-            request_user = request.user
-            at_least_admin = request_user.is_at_least_admin
-            if not at_least_admin:
-                res = self.handle_divider_update(
-                    request, request_user, instance
-                )
-                if res:
-                    return res
-        return super(ApiModelViewSet, self).update(request, *args, **kwargs)
+        with self.get_write_transaction():
+            instance = self.get_object()
+            if isinstance(instance, UserModel):
+                request_user = request.user
+                at_least_admin = request_user.is_at_least_admin
+                if not at_least_admin:
+                    res = self.handle_divider_update(
+                        request, request_user, instance
+                    )
+                    if res:
+                        return res
+            return super(ApiModelViewSet, self).update(
+                request, *args, **kwargs
+            )
 
     def perform_update(self, serializer):
         attrs = {}
-        instance = self.get_object()
+        instance = serializer.instance
         divider_model_name = "{}s".format(DIVIDER_MODEL.lower())
         data = dict(self.request.data)
         # If it is an User and the divider is in the data
@@ -2297,7 +3476,10 @@ class ApiModelViewSet(PaginatedViewSet, viewsets.ModelViewSet):
             old_divider_qs = getattr(instance, divider_model_name, None)
 
             if old_divider_qs:
-                old_divider_set = {str(p.uid) for p in old_divider_qs.all()}
+                old_divider_set = {
+                    str(uid)
+                    for uid in old_divider_qs.values_list('uid', flat=True)
+                }
             else:
                 old_divider_set = set()
             new_dividers_list = data.get(divider_model_name)
@@ -2328,6 +3510,16 @@ class ApiModelViewSet(PaginatedViewSet, viewsets.ModelViewSet):
         return Response(status=HTTP_200_OK)
 
     def destroy(self, request, *args, **kwargs):
+        with self.get_write_transaction():
+            return self.perform_destroy_request(request, *args, **kwargs)
+
+    def perform_destroy(self, instance):
+        #: The tombstones of the instance and of its cascades are written
+        #: with one query
+        with transaction.atomic(), collect_deletions():
+            instance.delete()
+
+    def perform_destroy_request(self, request, *args, **kwargs):
         instance = self.get_object()
         if not isinstance(instance, UserModel):
             try:
@@ -2361,6 +3553,28 @@ def unauthorized(*args, **kwargs):
     return Response(status=HTTP_403_FORBIDDEN)
 
 
+class LazySerializerClass:
+    """
+    Serializer class of a model viewset, built on its first use instead of
+    when the viewsets are created at startup
+    """
+
+    def __init__(self, make_serializer_class_fct, **kwargs):
+        self.make_serializer_class_fct = make_serializer_class_fct
+        self.kwargs = kwargs
+        self.serializer_class = None
+        self.lock = threading.Lock()
+
+    def __get__(self, instance, owner=None):
+        if self.serializer_class is None:
+            with self.lock:
+                if self.serializer_class is None:
+                    self.serializer_class = self.make_serializer_class_fct(
+                        **self.kwargs
+                    )
+        return self.serializer_class
+
+
 def make_api_viewset_generic_attributes_class(
     meta_model,
     api_namespace,
@@ -2377,6 +3591,7 @@ def make_api_viewset_generic_attributes_class(
     not_user = meta_model.get_model_name().lower() != 'user'
     if is_divided and not_divider and not_user:
         model_filterset_fields += ('{}'.format(DIVIDER_MODEL.lower()),)
+    metadata = get_model_metadata(meta_model.get_model_name())
 
     class GenericAttributesViewsetClass:
         permission_classes = model_permission_classes
@@ -2395,29 +3610,28 @@ def make_api_viewset_generic_attributes_class(
         )
 
         export_fields = tuple(meta_model.get_property('m_export_fields', []))
-        fields = [f for f, _ in meta_model.get_fields()] + ['uid']
-        serializer_class = make_serializer_class_fct(
-            meta_model=meta_model, nested=False, api_namespace=api_namespace
-        )
-        serializer_class_nested = make_serializer_class_fct(
-            meta_model=meta_model, nested=True, api_namespace=api_namespace
-        )
-        basename = meta_model.get_dashed_case_class_name()
-        file_fields = [
-            name
-            for name, field in meta_model.get_fields()
-            if field.f_type == 'FileField'
-        ]
-        rel_single_fields = [
-            f
-            for f, fspec in meta_model.get_fields()
-            if fspec.type == 'rel_single'
-        ]
-        rel_iterable_fields = [
-            f
-            for f, fspec in meta_model.get_fields()
-            if fspec.type == 'rel_iterable'
-        ]
+        ingestion_enabled = is_ingestion_enabled(meta_model)
+        fields = metadata.field_names + ['uid']
+        serializer_class = LazySerializerClass(
+            make_serializer_class_fct,
+            meta_model=meta_model,
+            nested=False,
+            api_namespace=api_namespace,
+        )
+        serializer_class_nested = LazySerializerClass(
+            make_serializer_class_fct,
+            meta_model=meta_model,
+            nested=True,
+            api_namespace=api_namespace,
+        )
+        basename = metadata.dashed_name
+        file_fields = metadata.file_fields
+        rel_single_fields = metadata.fk_fields
+        rel_iterable_fields = metadata.m2m_fields
+        list_filter_types = {
+            field_name: metadata.get_field_type(field_name)
+            for field_name in filterset_fields
+        }
 
     return GenericAttributesViewsetClass
 
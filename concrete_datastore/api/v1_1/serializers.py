@@ -16,6 +16,7 @@ from concrete_datastore.api.v1 import DEFAULT_API_NAMESPACE
 from concrete_datastore.api.v1.serializers import make_serializer_class
 from concrete_datastore.api.v1.signals import build_absolute_uri
 from concrete_datastore.concrete.meta import get_meta_definition_by_model_name
+from concrete_datastore.concrete.constants import LIST_USER_LEVEL
 
 concrete = apps.get_app_config('concrete')
 
@@ -223,3 +224,40 @@ class TwoFactorLoginSerializer(serializers.Serializer):
 
 class BlockedUserUpdateSerializer(serializers.Serializer):
     user_uids = serializers.ListField(child=serializers.UUIDField())
+
+
+class UsersLevelUpdateSerializer(serializers.Serializer):
+    user_uids = serializers.ListField(child=serializers.UUIDField())
+    level = serializers.ChoiceField(choices=LIST_USER_LEVEL)
+
+
+class UsersProvisioningSerializer(serializers.Serializer):
+    users = serializers.ListField(
+        child=serializers.DictField(), required=False
+    )
+    #: CSV or JSON file of users, instead of `users`
+    file = serializers.FileField(required=False)
+    scope_uid = serializers.UUIDField(required=False)
+    url_format = serializers.CharField(required=False)
+    email_format = serializers.CharField(required=False)
+
+    def validate_url_format(self, value):
+        if '{token}' not in value or '{email}' not in value:
+            raise serializers.ValidationError(
+                'url_format is not a valid format_string'
+            )
+        return value
+
+    def validate_email_format(self, value):
+        if '{link}' not in value:
+            raise serializers.ValidationError(
+                'email_format is not a valid format_string'
+            )
+        return value
+
+    def validate(self, attrs):
+        if ('users' in attrs) == ('file' in attrs):
+            raise serializers.ValidationError(
+                'Either users or file should be given'
+            )
+        return attrs
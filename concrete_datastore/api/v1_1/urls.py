@@ -23,6 +23,9 @@ from concrete_datastore.api.v1_1.views import (  # pylint:disable=E0611
     LDAPLoginApiView,
     TwoFactorLoginView,
     UnBlockUsersApiViewset,
+    UsersLevelApiViewset,
+    ScopeReassignmentApiView,
+    UsersProvisioningApiView,
     BlockedUsersApiViewset,
     AccountMeApiView,
     ProcessRegisterApiView,
@@ -136,6 +139,21 @@ specific_urlpatterns = [
         UnBlockUsersApiViewset.as_view(),
         name='unblock-users',
     ),
+    re_path(
+        r'^users-level',
+        UsersLevelApiViewset.as_view(),
+        name='users-level',
+    ),
+    re_path(
+        r'^reassign-scope',
+        ScopeReassignmentApiView.as_view(),
+        name='reassign-scope',
+    ),
+    re_path(
+        r'^users-provisioning',
+        UsersProvisioningApiView.as_view(),
+        name='users-provisioning',
+    ),
 ]
 if settings.USE_AUTH_LDAP:
     specific_urlpatterns += [
@@ -6,11 +6,12 @@ import pendulum
 import warnings
 from copy import deepcopy
 
+from django.apps import apps
 from django.conf import settings
 from django.utils import timezone
-from django.shortcuts import get_object_or_404
 from django.contrib.auth import get_user_model, authenticate
 from django.core.exceptions import ObjectDoesNotExist
+from django.http import Http404
 from django.http.response import HttpResponseNotAllowed
 
 from rest_framework import mixins, authentication, generics, viewsets, status
@@ -46,6 +47,8 @@ from concrete_datastore.api.v1_1.serializers import (
     EmailDeviceSerializer,
     TwoFactorLoginSerializer,
     BlockedUserUpdateSerializer,
+    UsersLevelUpdateSerializer,
+    UsersProvisioningSerializer,
 )
 from concrete_datastore.api.v1.authentication import (
     TokenExpiryAuthentication,
@@ -53,6 +56,7 @@ from concrete_datastore.api.v1.authentication import (
     URLTokenExpiryAuthentication,
 )
 from concrete_datastore.api.v1.filters import get_filter_field_type
+from concrete_datastore.api.v1.responses import ConcreteBadResponse
 from concrete_datastore.api.v1.views import (
     validate_request_permissions,
     make_api_viewset,
@@ -61,6 +65,7 @@ from concrete_datastore.api.v1.views import (
     AccountMeApiView as ApiV1AccountMeApiView,
     ApiModelViewSet as ApiV1ModelViewSet,
     PaginatedViewSet,
+    get_reassigned_scopes,
 )
 from concrete_datastore.api.v1.permissions import (
     get_permissions_classes_by_meta_model,
@@ -69,13 +74,21 @@ from concrete_datastore.api.v1 import DEFAULT_API_NAMESPACE
 from concrete_datastore.api.v1_1 import API_NAMESPACE
 
 from concrete_datastore.concrete.models import (
-    get_fields_and_types_of_model,
+    DIVIDER_MODEL,
     ConcreteRole,
     ConcretePermission,
     EmailDevice,
     AuthToken,
 )
 from concrete_datastore.concrete.automation.signals import user_logged_in
+from concrete_datastore.concrete.constants import LIST_USER_LEVEL
+from concrete_datastore.concrete.levels import bulk_set_level
+from concrete_datastore.concrete.provisioning import (
+    parse_users_file,
+    provision_users,
+)
+from concrete_datastore.concrete.scope_reassignment import reassign_scopes
+from concrete_datastore.concrete.user_tracked_fields import get_divided_models
 
 UserModel = get_user_model()
 
@@ -283,12 +296,7 @@ class ApiModelViewSet(ApiV1ModelViewSet):
         return Response(data)
 
     def get_list_filters_field(self, queryset):
-        fields_and_types = get_fields_and_types_of_model(queryset.model)
-
-        return {
-            field_name: fields_and_types[field_name]
-            for field_name in self.filterset_fields
-        }
+        return dict(self.list_filter_types)
 
     def get_extra_informations(self, queryset):
         _model_class = self.model_class or queryset.model
@@ -659,16 +667,183 @@ class UnBlockUsersApiViewset(generics.GenericAPIView):
         return Response(data, status=status.HTTP_200_OK)
 
     def unblock_users(self, user_uids):
+        users = UserModel.objects.in_bulk(user_uids)
         #:  if one or more uids is not found or is not in queryset, raise 404
-        for user_uid in user_uids:
-            user = get_object_or_404(UserModel, pk=user_uid)
-
+        if any(uuid.UUID(user_uid) not in users for user_uid in user_uids):
+            raise Http404
+
+        blocked_users_pks = [
+            user.pk for user in users.values() if not user.is_active
+        ]
+        bulk_set_level(
+            UserModel.objects.filter(pk__in=blocked_users_pks), 'simpleuser'
+        )
         data = {}
         for user_uid in user_uids:
-            user = UserModel.objects.get(pk=user_uid)
-            if user.is_active:
+            if users[uuid.UUID(user_uid)].is_active:
                 data[user_uid] = 'User is already active'
-                continue
-            user.set_level('simpleuser', commit=True)
-            data[user_uid] = 'User successfully unblocked'
+            else:
+                data[user_uid] = 'User successfully unblocked'
         return data
+
+
+class UsersLevelApiViewset(generics.GenericAPIView):
+    serializer_class = UsersLevelUpdateSerializer
+    authentication_classes = (
+        authentication.SessionAuthentication,
+        TokenExpiryAuthentication,
+        URLTokenExpiryAuthentication,
+    )
+    permission_classes = (BlockedUsersPermission,)
+    model_class = UserModel
+
+    def get_serializer_class(self):
+        return self.serializer_class
+
+    def post(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = self.set_users_level(
+            serializer.data['user_uids'], serializer.data['level']
+        )
+        return Response(data, status=status.HTTP_200_OK)
+
+    def can_set_level(self, user, level):
+        request_user = self.request.user
+        if user.pk == request_user.pk:
+            return False
+        if request_user.is_superuser:
+            return True
+        #: Same rules as the `level` field of the user serializer
+        request_user_index = LIST_USER_LEVEL.index(request_user.level)
+        return (
+            LIST_USER_LEVEL.index(user.level) < request_user_index
+            and LIST_USER_LEVEL.index(level) < request_user_index
+        )
+
+    def set_users_level(self, user_uids, level):
+        users = UserModel.objects.in_bulk(user_uids)
+        data, allowed_users_pks = {}, []
+        for user_uid in user_uids:
+            user = users.get(uuid.UUID(user_uid))
+            if user is None:
+                data[user_uid] = 'User not found'
+            elif not self.can_set_level(user, level):
+                data[user_uid] = 'Permission denied'
+            else:
+                allowed_users_pks.append(user.pk)
+
+        changed_pks = set(
+            bulk_set_level(
+                UserModel.objects.filter(pk__in=allowed_users_pks), level
+            )
+        )
+        for user_pk in allowed_users_pks:
+            if user_pk in changed_pks:
+                data[str(user_pk)] = 'Level successfully changed'
+            else:
+                data[str(user_pk)] = 'User already has this level'
+        return data
+
+
+class UsersProvisioningApiView(generics.GenericAPIView):
+    serializer_class = UsersProvisioningSerializer
+    authentication_classes = (
+        authentication.SessionAuthentication,
+        TokenExpiryAuthentication,
+        URLTokenExpiryAuthentication,
+    )
+    #: Restricted to the admins
+    permission_classes = (BlockedUsersPermission,)
+    model_class = UserModel
+
+    def get_serializer_class(self):
+        return self.serializer_class
+
+    def post(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+
+        users_data = data.get('users')
+        if users_data is None:
+            try:
+                users_data = parse_users_file(data['file'].read())
+            except ValueError:
+                users_data = None
+            if not isinstance(users_data, list):
+                return ConcreteBadResponse(
+                    message='The file should be a CSV or a JSON list of users'
+                )
+        if len(users_data) > settings.PROVISIONING_MAX_USERS:
+            return ConcreteBadResponse(
+                message='At most {} users can be provisioned at once'.format(
+                    settings.PROVISIONING_MAX_USERS
+                )
+            )
+
+        divider = None
+        if 'scope_uid' in data:
+            divider_model = apps.get_model('concrete.{}'.format(DIVIDER_MODEL))
+            try:
+                divider = divider_model.objects.get(pk=data['scope_uid'])
+            except divider_model.DoesNotExist:
+                return ConcreteBadResponse(
+                    message='scope_uid should be the uid of a scope'
+                )
+
+        result = provision_users(
+            users_data,
+            divider=divider,
+            url_format=data.get('url_format'),
+            email_format=data.get('email_format'),
+            referer=request.headers.get('Referer'),
+        )
+        return Response(result, status=HTTP_200_OK)
+
+
+class ScopeReassignmentApiView(generics.GenericAPIView):
+    authentication_classes = (
+        authentication.SessionAuthentication,
+        TokenExpiryAuthentication,
+        URLTokenExpiryAuthentication,
+    )
+    #: Restricted to the admins
+    permission_classes = (BlockedUsersPermission,)
+    model_class = UserModel
+
+    def post(self, request, *args, **kwargs):
+        source_divider, target_divider, error_response = get_reassigned_scopes(
+            request.data
+        )
+        if error_response is not None:
+            return error_response
+
+        divided_models = {
+            model.__name__: model for model in get_divided_models()
+        }
+        model_names = request.data.get('models')
+        if model_names is None:
+            models = list(divided_models.values())
+        elif isinstance(model_names, list) and all(
+            name in divided_models for name in model_names
+        ):
+            models = [divided_models[name] for name in model_names]
+        else:
+            return ConcreteBadResponse(
+                message='models should be a list of divided models among {}'.format(
+                    ', '.join(sorted(divided_models))
+                )
+            )
+
+        moved_counts = reassign_scopes(
+            source_divider, target_divider, models=models
+        )
+        return Response(
+            data={
+                'source_scope_uid': source_divider.pk,
+                'target_scope_uid': target_divider.pk,
+                'objects_count': moved_counts,
+            },
+            status=status.HTTP_200_OK,
+        )
@@ -1,73 +1,114 @@
 # coding: utf-8
-import os
 import logging
+from django.apps import apps
 from django.conf import settings
 from django.dispatch import receiver
-from django.db.models.signals import pre_delete, post_save
+from django.db.models.signals import (
+    pre_delete,
+    post_delete,
+    post_save,
+    m2m_changed,
+)
 from django.contrib.auth import get_user_model
 
 import concrete_datastore.concrete.models
-from concrete_datastore.concrete.models import DIVIDER_MODEL
-from concrete_datastore.api.v1.views import (
-    remove_instances_user_tracked_fields,
+from concrete_datastore.concrete.meta import meta_registered
+from concrete_datastore.concrete.models import (  # pylint:disable=E0611
+    ChangeLogEntry,
+)
+from concrete_datastore.concrete.deletion import (
+    add_deletion_change,
+    add_files_to_remove,
+    add_tombstone,
+)
+from concrete_datastore.concrete.changelog import (
+    get_permission_through_models,
+    make_change_entry,
+    record_change,
+    record_queryset_changes,
 )
+from concrete_datastore.concrete.levels import schedule_blocked_users_cleanup
 
 logger = logging.getLogger(__name__)
 
 
-@receiver(pre_delete)
 def on_pre_delete(sender, instance, **kwargs):
-    model_name = instance.__class__.__name__
-    if (
-        hasattr(concrete_datastore.concrete.models, model_name)
-        and instance.__class__.__name__
-        not in settings.IGNORED_MODELS_ON_DELETE
-    ):
-        # pylint: disable=no-member
-        concrete_datastore.concrete.models.DeletedModel.objects.create(
-            model_name=model_name, uid=instance.uid
-        )
-
-        # Remove files of a deleted instance, if this instance has a FileField
-        file_fields = [
-            field.name
-            for field in instance._meta.fields
-            if field.get_internal_type() in ['FileField', 'ImageField']
-        ]
-        for field_name in file_fields:
-            field_value = getattr(instance, field_name)
-
-            if not field_value:
-                continue
-            try:
-                file_path = field_value.path
-            except Exception as e:
-                logger.exception(
-                    f'Cannot retrieve the file path for {field_value} '
-                    f'(field {field_name} of instance '
-                    f'<{model_name}:{instance.uid}>). The error is {e}'
-                )
-                continue
-            if os.path.exists(file_path) is False:
-                continue
-            try:
-                os.remove(file_path)
-            except Exception:
-                logger.exception(
-                    f'Error while attempting to delete file {file_path} '
-                    f'(field {field_name} of instance '
-                    f'<{model_name}:{instance.uid}>'
-                )
-                continue
+    add_tombstone(model_name=instance.__class__.__name__, uid=instance.uid)
+    # Remove files of a deleted instance, if this instance has a FileField
+    add_files_to_remove(instance)
 
 
 @receiver(post_save, sender=get_user_model())
 def on_post_save(sender, instance, **kwargs):
-    if instance.level == 'blocked':
-        divider_manager = getattr(
-            instance, '{}s'.format(DIVIDER_MODEL.lower())
-        )
-        user_dividers = divider_manager.values_list('uid', flat=True)
-        remove_instances_user_tracked_fields(instance, user_dividers)
-        divider_manager.clear()
-        instance.concrete_groups.clear()
+    #: The user is inactive as soon as they are blocked, the cleanup of
+    #: their permissions only runs when they become blocked
+    previous_level = getattr(instance, '_loaded_level', None)
+    instance._loaded_level = instance.level
+    if instance.level == 'blocked' and previous_level != 'blocked':
+        schedule_blocked_users_cleanup([instance.pk])
+
+
+def on_post_save_record_change(sender, instance, created, **kwargs):
+    record_change(
+        instance,
+        ChangeLogEntry.OPERATION_CREATE
+        if created
+        else ChangeLogEntry.OPERATION_UPDATE,
+    )
+
+
+def on_post_delete_record_change(sender, instance, **kwargs):
+    entry = make_change_entry(instance, ChangeLogEntry.OPERATION_DELETE)
+    if entry is not None:
+        add_deletion_change(entry)
+
+
+def on_m2m_changed_record_change(
+    sender, instance, action, reverse, model, pk_set, **kwargs
+):
+    if action not in ('post_add', 'post_remove', 'pre_clear', 'post_clear'):
+        return
+    if action in ('post_add', 'post_remove') and not pk_set:
+        return
+    permission_model, field_name = get_permission_through_models().get(
+        sender, (None, None)
+    )
+    if permission_model is None:
+        return
+
+    if reverse is False:
+        #: `instance` is the instance whose permissions changed
+        if action != 'pre_clear':
+            record_change(instance, ChangeLogEntry.OPERATION_PERMISSIONS)
+        return
+
+    #: `instance` is the user or group, the instances whose permissions
+    #: changed are in `pk_set`, or have to be fetched before a clear
+    if action == 'post_clear':
+        return
+    if action == 'pre_clear':
+        field = permission_model._meta.get_field(field_name)
+        pk_set = sender.objects.filter(
+            **{field.m2m_reverse_field_name(): instance.pk}
+        ).values(field.m2m_field_name())
+    record_queryset_changes(
+        permission_model.objects.filter(pk__in=pk_set),
+        ChangeLogEntry.OPERATION_PERMISSIONS,
+    )
+
+
+#: The receivers are connected to the models they handle only: Django
+#: deletes the rows of the other models, such as the many-to-many through
+#: tables, without fetching them first when they have no delete receiver
+for model in apps.get_app_config('concrete').get_models():
+    if (
+        hasattr(concrete_datastore.concrete.models, model.__name__)
+        and model.__name__ not in settings.IGNORED_MODELS_ON_DELETE
+    ):
+        pre_delete.connect(on_pre_delete, sender=model)
+for model_label in meta_registered:
+    model = apps.get_model(model_label)
+    post_save.connect(on_post_save_record_change, sender=model)
+    post_delete.connect(on_post_delete_record_change, sender=model)
+for through_model in get_permission_through_models():
+    m2m_changed.connect(on_m2m_changed_record_change, sender=through_model)
@@ -1,5 +1,6 @@
 # coding: utf-8
 import logging
+import os
 from importlib import import_module
 from tenacity import (
     Retrying,
@@ -13,7 +14,30 @@ from django.conf import settings
 from concrete_datastore.settings.celery import app
 from concrete_mailer.preparers import prepare_email
 
-from concrete_datastore.concrete.models import Email  # pylint:disable=E0611
+from concrete_datastore.concrete.models import (  # pylint:disable=E0611
+    Email,
+    IngestionBatch,
+    WebhookDelivery,
+    WebhookEndpoint,
+)
+from concrete_datastore.concrete.ingestion import process_ingestion_batches
+from concrete_datastore.concrete.changelog import (
+    remove_expired_change_log_entries,
+)
+from concrete_datastore.concrete.exports import (
+    remove_expired_export_jobs,
+    run_export_job,
+)
+from concrete_datastore.concrete.imports import run_import_job
+from concrete_datastore.concrete.user_tracked_fields import (
+    cleanup_blocked_user,
+    remove_user_from_tracked_fields,
+)
+from concrete_datastore.concrete.automation.webhooks import (
+    claim_deliveries,
+    collect_endpoint_events,
+    send_delivery,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -35,6 +59,24 @@ def send_async_mails(email_pk):
     perform_send_email(instance=email, is_async=True)
 
 
+def send_mails_batch(emails_pks, enable_retrying=True):
+    """
+    Send the emails created without their signals (see `provision_users`)
+    """
+    emails = Email.objects.filter(
+        pk__in=emails_pks, resource_status='to-send'
+    ).select_related('receiver', 'created_by')
+    for email in emails:
+        perform_send_email(
+            instance=email, enable_retrying=enable_retrying, is_async=True
+        )
+
+
+@app.task
+def async_send_mails_batch(emails_pks):
+    send_mails_batch(emails_pks)
+
+
 def save_instance_if_async(instance, is_async):
     #: If this method is callled from an async process, save the instance
     #: Otherwise, this method is called directly from the pre_save
@@ -95,3 +137,94 @@ def perform_send_email(instance, enable_retrying=True, is_async=False):
         instance.resource_status = 'send-error'
         instance.resource_message = 'Unable to send email'
         save_instance_if_async(instance=instance, is_async=is_async)
+
+
+@app.task
+def dispatch_webhooks():
+    for endpoint in WebhookEndpoint.objects.filter(is_active=True):
+        collect_endpoint_events(endpoint.pk)
+        for delivery_pk in claim_deliveries(endpoint):
+            send_webhook_delivery.apply_async(
+                queue='webhooks', kwargs={'delivery_pk': delivery_pk}
+            )
+
+
+@app.task
+def send_webhook_delivery(delivery_pk):
+    delivery = WebhookDelivery.objects.select_related('endpoint').get(
+        pk=delivery_pk
+    )
+    send_delivery(delivery)
+
+
+@app.task
+def async_remove_user_from_tracked_fields(user_pk, removed_dividers_pks):
+    remove_user_from_tracked_fields(user_pk, removed_dividers_pks)
+
+
+@app.task
+def async_cleanup_blocked_user(user_pk):
+    cleanup_blocked_user(user_pk)
+
+
+def remove_files(paths):
+    for file_path in paths:
+        try:
+            os.remove(file_path)
+        except FileNotFoundError:
+            continue
+        except Exception:
+            logger.exception(
+                f'Error while attempting to delete file {file_path}'
+            )
+
+
+@app.task
+def async_remove_files(paths):
+    remove_files(paths)
+
+
+@app.task
+def async_process_ingestion_batches(model_name):
+    process_ingestion_batches(model_name)
+
+
+@app.task
+def process_pending_ingestion_batches():
+    """
+    Hand the models having pending ingestion batches to the `ingestion`
+    queue if `ASYNC_INGESTION` is set (in case the task scheduled by the
+    request has been lost), otherwise process them in this task
+    """
+    models_names = (
+        IngestionBatch.objects.filter(status=IngestionBatch.STATUS_PENDING)
+        .values_list('model_name', flat=True)
+        .distinct()
+    )
+    for model_name in models_names:
+        if settings.ASYNC_INGESTION is True:
+            async_process_ingestion_batches.apply_async(
+                queue='ingestion', kwargs={'model_name': model_name}
+            )
+        else:
+            process_ingestion_batches(model_name)
+
+
+@app.task
+def async_run_export_job(job_pk):
+    run_export_job(job_pk)
+
+
+@app.task
+def cleanup_expired_export_jobs():
+    remove_expired_export_jobs()
+
+
+@app.task
+def cleanup_expired_change_log_entries():
+    remove_expired_change_log_entries()
+
+
+@app.task
+def async_run_import_job(job_pk):
+    run_import_job(job_pk)
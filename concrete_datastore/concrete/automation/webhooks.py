@@ -0,0 +1,195 @@
+# coding: utf-8
+import hashlib
+import hmac
+import json
+import logging
+from datetime import timedelta
+
+import requests
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.utils import timezone
+
+from concrete_datastore.concrete.models import (  # pylint:disable=E0611
+    ChangeLogEntry,
+    WebhookDelivery,
+    WebhookEndpoint,
+)
+from concrete_datastore.concrete.changelog import get_entries_after
+
+logger = logging.getLogger(__name__)
+
+
+def collect_endpoint_events(endpoint_pk):
+    """
+    Coalesce the change log entries not yet sent to the endpoint into
+    deliveries of at most `batch_size` events (one event per instance and
+    per delivery, the last change winning). Return the number of deliveries
+    created.
+    """
+    created_deliveries = 0
+    with transaction.atomic():
+        endpoint = (
+            WebhookEndpoint.objects.select_for_update(skip_locked=True)
+            .filter(pk=endpoint_pk, is_active=True)
+            .first()
+        )
+        if endpoint is None:
+            #: Inactive, or already being collected by another worker
+            return created_deliveries
+
+        entries = ChangeLogEntry.objects.filter(model_name=endpoint.model_name)
+        if endpoint.operations:
+            entries = entries.filter(operation__in=endpoint.operations)
+
+        for _ in range(settings.WEBHOOKS_MAX_DELIVERIES_PER_COLLECT):
+            #: The entries are read in the order of their transactions, so
+            #: that an entry committed late is not skipped
+            batch = list(
+                get_entries_after(
+                    entries,
+                    endpoint.last_transaction_id,
+                    endpoint.last_sequence,
+                ).values(
+                    'transaction_id',
+                    'sequence',
+                    'uid',
+                    'scope_uid',
+                    'operation',
+                )[
+                    : endpoint.batch_size
+                ]
+            )
+            if not batch:
+                break
+            events = {}
+            for entry in batch:
+                uid = str(entry['uid'])
+                events.pop(uid, None)
+                events[uid] = {
+                    'sequence': entry['sequence'],
+                    'uid': uid,
+                    'scope_uid': (
+                        None
+                        if entry['scope_uid'] is None
+                        else str(entry['scope_uid'])
+                    ),
+                    'operation': entry['operation'],
+                }
+            WebhookDelivery.objects.create(
+                endpoint=endpoint,
+                first_sequence=batch[0]['sequence'],
+                last_sequence=batch[-1]['sequence'],
+                payload={
+                    'model_name': endpoint.model_name,
+                    'events': list(events.values()),
+                },
+            )
+            endpoint.last_transaction_id = batch[-1]['transaction_id']
+            endpoint.last_sequence = batch[-1]['sequence']
+            created_deliveries += 1
+
+        if created_deliveries:
+            endpoint.save(
+                update_fields=['last_transaction_id', 'last_sequence']
+            )
+    return created_deliveries
+
+
+def claim_deliveries(endpoint):
+    """
+    Mark as `sending` the deliveries that are due, without exceeding the
+    concurrency limit of the endpoint, and return their pks
+    """
+    now = timezone.now()
+    stale_date = now - timedelta(
+        seconds=settings.WEBHOOKS_SENDING_TIMEOUT_SECONDS
+    )
+    with transaction.atomic():
+        #: Deliveries `sending` for too long belong to a lost worker
+        WebhookDelivery.objects.filter(
+            endpoint=endpoint,
+            status=WebhookDelivery.STATUS_SENDING,
+            modification_date__lt=stale_date,
+        ).update(status=WebhookDelivery.STATUS_PENDING)
+
+        in_flight = WebhookDelivery.objects.filter(
+            endpoint=endpoint, status=WebhookDelivery.STATUS_SENDING
+        ).count()
+        available_slots = endpoint.max_concurrency - in_flight
+        if available_slots <= 0:
+            return []
+
+        delivery_pks = list(
+            WebhookDelivery.objects.select_for_update(skip_locked=True)
+            .filter(
+                endpoint=endpoint,
+                status=WebhookDelivery.STATUS_PENDING,
+                next_attempt_date__lte=now,
+            )
+            .order_by('creation_date')
+            .values_list('pk', flat=True)[:available_slots]
+        )
+        WebhookDelivery.objects.filter(pk__in=delivery_pks).update(
+            status=WebhookDelivery.STATUS_SENDING, modification_date=now
+        )
+    return delivery_pks
+
+
+def get_retry_delay(attempts):
+    return timedelta(
+        seconds=settings.WEBHOOKS_RETRY_BASE_DELAY_SECONDS
+        * 2 ** (attempts - 1)
+    )
+
+
+def send_delivery(delivery):
+    """
+    POST the batch of events to the endpoint. On failure the delivery is
+    rescheduled with an exponential backoff, until it is abandoned (`dead`)
+    after `WEBHOOKS_MAX_ATTEMPTS` attempts.
+    """
+    endpoint = delivery.endpoint
+    body = json.dumps(
+        {
+            'delivery_uid': delivery.uid,
+            'first_sequence': delivery.first_sequence,
+            'last_sequence': delivery.last_sequence,
+            **delivery.payload,
+        },
+        cls=DjangoJSONEncoder,
+    ).encode('utf-8')
+    headers = {'Content-Type': 'application/json'}
+    if endpoint.secret:
+        headers['X-Concrete-Signature'] = hmac.new(
+            endpoint.secret.encode('utf-8'), body, hashlib.sha256
+        ).hexdigest()
+
+    delivery.attempts += 1
+    try:
+        response = requests.post(
+            endpoint.url,
+            data=body,
+            headers=headers,
+            timeout=settings.WEBHOOKS_TIMEOUT_SECONDS,
+        )
+        response.raise_for_status()
+    except Exception as e:
+        logger.info(
+            f'ERROR : Unable to send webhook delivery {delivery.pk} '
+            f'to {endpoint.url} (attempt {delivery.attempts}), {str(e)}'
+        )
+        delivery.last_error = str(e)
+        if delivery.attempts >= settings.WEBHOOKS_MAX_ATTEMPTS:
+            delivery.status = WebhookDelivery.STATUS_DEAD
+        else:
+            delivery.status = WebhookDelivery.STATUS_PENDING
+            delivery.next_attempt_date = timezone.now() + get_retry_delay(
+                delivery.attempts
+            )
+    else:
+        delivery.status = WebhookDelivery.STATUS_SENT
+        delivery.last_error = ''
+    delivery.save()
+    return delivery.status
@@ -0,0 +1,201 @@
+# coding: utf-8
+from datetime import timedelta
+from functools import lru_cache
+
+from django.apps import apps
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+from django.utils import timezone
+
+from concrete_datastore.concrete.meta import meta_registered
+from concrete_datastore.concrete.models import (  # pylint:disable=E0611
+    ChangeLogEntry,
+    DIVIDER_MODEL,
+    UNDIVIDED_MODEL,
+)
+
+#: Many-to-many fields whose changes are logged as permission changes
+PERMISSION_FIELDS = (
+    'can_admin_users',
+    'can_view_users',
+    'can_admin_groups',
+    'can_view_groups',
+)
+
+#: Id of the current transaction, assigned if it has none yet
+CURRENT_TRANSACTION_ID = RawSQL('txid_current()', [])
+#: Oldest transaction still running: all the transactions with a lower id
+#: are committed or rolled back
+OLDEST_RUNNING_TRANSACTION_ID = RawSQL(
+    'txid_snapshot_xmin(txid_current_snapshot())', []
+)
+
+
+def is_change_logged(model):
+    """
+    Changes are logged for the models of the datamodel only
+    """
+    return (
+        settings.ENABLE_CHANGE_LOG is True
+        and model._meta.label in meta_registered
+    )
+
+
+def get_scope_field_name(model):
+    model_name = model.__name__
+    if model_name in UNDIVIDED_MODEL or model_name in ('User', DIVIDER_MODEL):
+        return None
+    return '{}_id'.format(DIVIDER_MODEL.lower())
+
+
+def get_scope_uid(instance):
+    scope_field_name = get_scope_field_name(instance.__class__)
+    if scope_field_name is None:
+        return None
+    return getattr(instance, scope_field_name, None)
+
+
+def make_change_entry(instance, operation):
+    """
+    Return the unsaved change log entry of the operation on the instance,
+    or None if the changes of this model are not logged
+    """
+    if not is_change_logged(instance.__class__):
+        return None
+    return ChangeLogEntry(
+        model_name=instance.__class__.__name__,
+        uid=instance.pk,
+        scope_uid=get_scope_uid(instance),
+        operation=operation,
+        transaction_id=CURRENT_TRANSACTION_ID,
+    )
+
+
+def record_change(instance, operation):
+    entry = make_change_entry(instance, operation)
+    if entry is not None:
+        entry.save()
+
+
+def record_changes(model, uids_and_scopes, operation):
+    """
+    Log the same operation on many instances of a model with a single
+    query. `uids_and_scopes` is an iterable of `(uid, scope_uid)`
+    """
+    if not is_change_logged(model):
+        return []
+    return ChangeLogEntry.objects.bulk_create(
+        [
+            ChangeLogEntry(
+                model_name=model.__name__,
+                uid=uid,
+                scope_uid=scope_uid,
+                operation=operation,
+                transaction_id=CURRENT_TRANSACTION_ID,
+            )
+            for uid, scope_uid in uids_and_scopes
+        ]
+    )
+
+
+def record_queryset_changes(queryset, operation):
+    """
+    Log the same operation on all the instances of a queryset, fetching
+    only their uid and scope
+    """
+    model = queryset.model
+    if not is_change_logged(model):
+        return []
+    scope_field_name = get_scope_field_name(model)
+    if scope_field_name is None:
+        uids_and_scopes = (
+            (uid, None) for uid in queryset.values_list('pk', flat=True)
+        )
+    else:
+        uids_and_scopes = queryset.values_list('pk', scope_field_name)
+    return record_changes(model, uids_and_scopes, operation)
+
+
+def parse_cursor(cursor):
+    """
+    Return the `(transaction_id, sequence)` of a cursor `<transaction
+    id>.<sequence>`, `(0, 0)` for an empty cursor. Raise a `ValueError` if
+    the cursor is invalid
+    """
+    if not cursor:
+        return 0, 0
+    transaction_id, sequence = map(int, cursor.split('.'))
+    if transaction_id < 0 or sequence < 0:
+        raise ValueError('Invalid cursor {}'.format(cursor))
+    return transaction_id, sequence
+
+
+def format_cursor(transaction_id, sequence):
+    return '{}.{}'.format(transaction_id, sequence)
+
+
+def get_entries_after(entries, transaction_id, sequence):
+    """
+    Filter the entries after `(transaction_id, sequence)`, ordered by
+    `(transaction_id, sequence)`, that can no longer be preceded by another
+    entry: those of the transactions older than all the running
+    transactions, and those of the current transaction.
+    """
+    return (
+        entries.filter(
+            Q(transaction_id__lt=OLDEST_RUNNING_TRANSACTION_ID)
+            | Q(transaction_id=RawSQL('txid_current_if_assigned()', []))
+        )
+        .filter(
+            Q(transaction_id__gt=transaction_id)
+            | Q(transaction_id=transaction_id, sequence__gt=sequence)
+        )
+        .order_by('transaction_id', 'sequence')
+    )
+
+
+def remove_expired_change_log_entries():
+    """
+    Delete the entries older than `CHANGE_LOG_RETENTION_DAYS` days, by
+    batches of `CHANGE_LOG_PURGE_BATCH_SIZE` entries so that the table is
+    not locked for long. Return the number of deleted entries
+    """
+    if not settings.CHANGE_LOG_RETENTION_DAYS:
+        return 0
+    expired_entries = ChangeLogEntry.objects.filter(
+        creation_date__lt=timezone.now()
+        - timedelta(days=settings.CHANGE_LOG_RETENTION_DAYS)
+    ).order_by('sequence')
+    deleted_count = 0
+    while True:
+        sequences = list(
+            expired_entries.values_list('sequence', flat=True)[
+                : settings.CHANGE_LOG_PURGE_BATCH_SIZE
+            ]
+        )
+        if not sequences:
+            return deleted_count
+        count, _ = ChangeLogEntry.objects.filter(
+            sequence__in=sequences
+        ).delete()
+        deleted_count += count
+
+
+@lru_cache(maxsize=None)
+def get_permission_through_models():
+    """
+    Mapping of the through models of the permission fields to their
+    `(model, field name)`
+    """
+    through_models = {}
+    for model_label in meta_registered:
+        model = apps.get_model(model_label)
+        for field_name in PERMISSION_FIELDS:
+            try:
+                field = model._meta.get_field(field_name)
+            except FieldDoesNotExist:
+                continue
+            through_models[field.remote_field.through] = (model, field_name)
+    return through_models
@@ -0,0 +1,125 @@
+# coding: utf-8
+import logging
+import threading
+from contextlib import contextmanager
+from functools import lru_cache
+
+from django.conf import settings
+from django.db import transaction
+
+from concrete_datastore.concrete.models import (  # pylint:disable=E0611
+    ChangeLogEntry,
+    DeletedModel,
+)
+from concrete_datastore.concrete.automation.tasks import (
+    async_remove_files,
+    remove_files,
+)
+
+logger = logging.getLogger(__name__)
+
+_local = threading.local()
+
+
+def get_deletion_buffer():
+    """
+    Return the buffer of the current `collect_deletions` context, or None
+    """
+    return getattr(_local, 'buffer', None)
+
+
+@contextmanager
+def collect_deletions():
+    """
+    Within this context, the tombstones and the change log entries of the
+    deleted instances (cascades included) are buffered by the delete signal
+    receivers, and written with one `bulk_create` per table when the
+    context exits without error. The files of the deleted instances are
+    removed once the transaction is committed.
+    """
+    if get_deletion_buffer() is not None:
+        #: Nested context, the outermost one writes the buffer
+        yield get_deletion_buffer()
+        return
+
+    buffer = {'tombstones': [], 'change_log': [], 'files': []}
+    _local.buffer = buffer
+    try:
+        yield buffer
+    finally:
+        _local.buffer = None
+    DeletedModel.objects.bulk_create(buffer['tombstones'])
+    ChangeLogEntry.objects.bulk_create(buffer['change_log'])
+    schedule_files_removal(buffer['files'])
+
+
+def add_tombstone(model_name, uid):
+    tombstone = DeletedModel(model_name=model_name, uid=uid)
+    buffer = get_deletion_buffer()
+    if buffer is None:
+        tombstone.save()
+    else:
+        buffer['tombstones'].append(tombstone)
+
+
+def add_deletion_change(entry):
+    buffer = get_deletion_buffer()
+    if buffer is None:
+        entry.save()
+    else:
+        buffer['change_log'].append(entry)
+
+
+@lru_cache(maxsize=None)
+def get_file_fields_names(model):
+    return tuple(
+        field.name
+        for field in model._meta.fields
+        if field.get_internal_type() in ['FileField', 'ImageField']
+    )
+
+
+def get_instance_files_paths(instance):
+    paths = []
+    for field_name in get_file_fields_names(instance.__class__):
+        field_value = getattr(instance, field_name)
+        if not field_value:
+            continue
+        try:
+            paths.append(field_value.path)
+        except Exception as e:
+            logger.exception(
+                f'Cannot retrieve the file path for {field_value} '
+                f'(field {field_name} of instance '
+                f'<{instance.__class__.__name__}:{instance.uid}>). '
+                f'The error is {e}'
+            )
+    return paths
+
+
+def schedule_files_removal(paths):
+    """
+    Remove the files once the current transaction is committed (they are
+    kept if it is rolled back), in a task of the `files_cleanup` queue if
+    `ASYNC_FILES_REMOVAL` is set
+    """
+    if not paths:
+        return
+    paths = list(paths)
+    if settings.ASYNC_FILES_REMOVAL is True:
+        transaction.on_commit(
+            lambda: async_remove_files.apply_async(
+                queue='files_cleanup', kwargs={'paths': paths}
+            )
+        )
+    else:
+        transaction.on_commit(lambda: remove_files(paths))
+
+
+def add_files_to_remove(instance):
+    paths = get_instance_files_paths(instance)
+    buffer = get_deletion_buffer()
+    if buffer is None:
+        schedule_files_removal(paths)
+    else:
+        buffer['files'].extend(paths)
@@ -0,0 +1,434 @@
+# coding: utf-8
+import gzip
+import json
+import multiprocessing
+import os
+import uuid
+
+import django
+from django.apps import apps
+from django.contrib.auth import get_user_model
+from django.db import connection, connections, transaction
+from django.utils import timezone
+from psycopg2 import sql
+
+import concrete_datastore
+from concrete_datastore.concrete.meta import list_of_meta
+from concrete_datastore.concrete.models import (  # pylint:disable=E0611
+    DIVIDER_MODEL,
+)
+from concrete_datastore.concrete.changelog import get_scope_field_name
+
+MANIFEST_FILENAME = 'manifest.json'
+MANIFEST_VERSION = 1
+
+
+def get_dumped_models():
+    """
+    Models of the datamodel, sorted so that the targets of the foreign keys
+    of a model come before it. The cycles are left in the order of the
+    datamodel, the constraints being checked at the end of the restore
+    """
+    models = [
+        apps.get_model('concrete.{}'.format(meta_model.get_model_name()))
+        for meta_model in list_of_meta
+        if meta_model.get_model_name()
+        not in ('EntityDividerModel', 'UndividedModel')
+    ]
+    dependencies = {
+        model: {
+            field.related_model
+            for field in model._meta.concrete_fields
+            if field.is_relation
+            and field.related_model in models
+            and field.related_model is not model
+        }
+        for model in models
+    }
+    sorted_models = []
+    while dependencies:
+        ready = [
+            model
+            for model, targets in dependencies.items()
+            if not targets - set(sorted_models)
+        ] or list(dependencies)[:1]
+        for model in ready:
+            sorted_models.append(model)
+            del dependencies[model]
+    return sorted_models
+
+
+def get_scope_filter(model):
+    """
+    SQL condition on the rows of the model belonging to the scope: the
+    instances of the scope, the scope itself and its users. The uid of the
+    scope is the `scope_uid` parameter of the query. The undivided models are
+    dumped entirely
+    """
+    scope_value = sql.SQL('{}::uuid').format(sql.Placeholder('scope_uid'))
+    if model.__name__ == DIVIDER_MODEL:
+        return sql.SQL('{} = {}').format(
+            sql.Identifier(model._meta.pk.column), scope_value
+        )
+    if model is get_user_model():
+        field = model._meta.get_field('{}s'.format(DIVIDER_MODEL.lower()))
+        through = field.remote_field.through
+        return sql.SQL('{} IN (SELECT {} FROM {} WHERE {} = {})').format(
+            sql.Identifier(model._meta.pk.column),
+            sql.Identifier(field.m2m_column_name()),
+            sql.Identifier(through._meta.db_table),
+            sql.Identifier(field.m2m_reverse_name()),
+            scope_value,
+        )
+    scope_field_name = get_scope_field_name(model)
+    if scope_field_name is None:
+        return None
+    return sql.SQL('{} = {}').format(
+        sql.Identifier(model._meta.get_field(DIVIDER_MODEL.lower()).column),
+        scope_value,
+    )
+
+
+def get_in_scope_condition(column, model, condition):
+    """
+    SQL condition on a column referencing the model: the referenced row is
+    dumped with the scope
+    """
+    return sql.SQL('{} IN (SELECT {} FROM {} WHERE {})').format(
+        sql.Identifier(column),
+        sql.Identifier(model._meta.pk.column),
+        sql.Identifier(model._meta.db_table),
+        condition,
+    )
+
+
+def get_rows_condition(model, models, conditions):
+    """
+    SQL condition on the rows of the model dumped with the scope. The rows
+    whose non-nullable foreign keys reference rows left out of the dump
+    (such as the emails sent to the users of other scopes) are skipped.
+    `conditions` holds the conditions of the models already handled, the
+    other targets (within a cycle) being checked against their scope filter
+    """
+    parts = []
+    scope_filter = get_scope_filter(model)
+    if scope_filter is not None:
+        parts.append(scope_filter)
+    for field in model._meta.concrete_fields:
+        if (
+            not field.is_relation
+            or field.null
+            or field.related_model not in models
+        ):
+            continue
+        if field.related_model in conditions:
+            target_condition = conditions[field.related_model]
+        else:
+            target_condition = get_scope_filter(field.related_model)
+        if target_condition is not None:
+            parts.append(
+                get_in_scope_condition(
+                    field.column, field.related_model, target_condition
+                )
+            )
+    if not parts:
+        return None
+    return sql.SQL(' AND ').join(parts)
+
+
+def get_dumped_column(field, conditions):
+    """
+    SQL expression of the column of a field. With a scope, the nullable
+    foreign keys to rows left out of the dump (the users of other scopes in
+    `created_by`, the instances of other scopes…) are nulled out, so that the
+    dump can be restored on its own. The rows whose non-nullable foreign
+    keys point out of the dump are skipped by `get_rows_condition`
+    """
+    condition = None
+    if field.is_relation and field.null:
+        condition = conditions.get(field.related_model)
+    if condition is None:
+        return sql.Identifier(field.column)
+    return sql.SQL('CASE WHEN {} THEN {} END AS {}').format(
+        get_in_scope_condition(field.column, field.related_model, condition),
+        sql.Identifier(field.column),
+        sql.Identifier(field.column),
+    )
+
+
+def get_dumped_tables(scope_uid=None):
+    """
+    Return the tables to dump in dependency order: the tables of the models
+    then the many-to-many tables between them, with the query of their rows
+    and its parameters. With a scope, the rows of the many-to-many tables are
+    dumped when both of their sides are
+    """
+    models = get_dumped_models()
+    conditions = {}
+    params = {}
+    if scope_uid is not None:
+        for model in models:
+            conditions[model] = get_rows_condition(model, models, conditions)
+        params = {'scope_uid': str(uuid.UUID(str(scope_uid)))}
+    tables, through_tables = [], []
+    for model in models:
+        fields = model._meta.concrete_fields
+        tables.append(
+            {
+                'model': model.__name__,
+                'table': model._meta.db_table,
+                'columns': [field.column for field in fields],
+                'expressions': [
+                    get_dumped_column(field, conditions) for field in fields
+                ],
+                'condition': conditions.get(model),
+                'params': params,
+            }
+        )
+        for field in model._meta.many_to_many:
+            through = field.remote_field.through
+            if (
+                not through._meta.auto_created
+                or field.related_model not in models
+            ):
+                continue
+            sides = []
+            for column, side_model in (
+                (field.m2m_column_name(), model),
+                (field.m2m_reverse_name(), field.related_model),
+            ):
+                if conditions.get(side_model) is not None:
+                    sides.append(
+                        get_in_scope_condition(
+                            column, side_model, conditions[side_model]
+                        )
+                    )
+            columns = [
+                field.column
+                for field in through._meta.concrete_fields
+                if not field.primary_key
+            ]
+            through_tables.append(
+                {
+                    'model': through.__name__,
+                    'table': through._meta.db_table,
+                    'columns': columns,
+                    'expressions': [
+                        sql.Identifier(column) for column in columns
+                    ],
+                    'condition': sql.SQL(' AND ').join(sides)
+                    if sides
+                    else None,
+                    'params': params,
+                }
+            )
+    return tables + through_tables
+
+
+def get_copy_to_statement(table):
+    query = sql.SQL('SELECT {} FROM {}').format(
+        sql.SQL(', ').join(table['expressions']),
+        sql.Identifier(table['table']),
+    )
+    if table['condition'] is not None:
+        query = sql.SQL('{} WHERE {}').format(query, table['condition'])
+    return sql.SQL('COPY ({}) TO STDOUT WITH (FORMAT csv, HEADER)').format(
+        query
+    )
+
+
+def write_table(cursor, table, directory):
+    """
+    Write the rows of the table to a gzipped CSV file with `COPY`. Return
+    the number of rows
+    """
+    path = os.path.join(directory, '{}.csv.gz'.format(table['table']))
+    #: `COPY` takes no bound parameters: they are adapted on the client side
+    statement = cursor.mogrify(
+        get_copy_to_statement(table), table['params'] or None
+    )
+    with gzip.open(path, 'wb') as table_file:
+        cursor.copy_expert(statement.decode(), table_file)
+    return cursor.rowcount
+
+
+def init_dump_worker():
+    django.setup()
+
+
+def dump_table_in_snapshot(table, snapshot_id, directory):
+    """
+    Dump a table from a worker process, in the snapshot exported by the
+    main process so that all the tables are consistent
+    """
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'SET TRANSACTION ISOLATION LEVEL REPEATABLE READ, READ ONLY'
+            )
+            cursor.execute('SET TRANSACTION SNAPSHOT %s', [snapshot_id])
+            rows_count = write_table(cursor, table, directory)
+    connections.close_all()
+    return table['table'], rows_count
+
+
+def dump_datastore(directory, scope_uid=None, jobs=1, on_table_dumped=None):
+    """
+    Dump the tables of the datamodel (or the rows of a scope) to gzipped CSV
+    files in `directory`, with a manifest listing them in dependency order.
+    All the tables are read under a single repeatable read snapshot, by
+    `jobs` processes. Return the manifest
+    """
+    os.makedirs(directory, exist_ok=True)
+    tables = get_dumped_tables(scope_uid=scope_uid)
+    rows_counts = {}
+
+    #: The isolation level can only be set at the start of a transaction
+    outermost = not connection.in_atomic_block
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            if outermost:
+                cursor.execute(
+                    'SET TRANSACTION ISOLATION LEVEL REPEATABLE READ, '
+                    'READ ONLY'
+                )
+            if jobs > 1:
+                #: The snapshot is kept as long as this transaction is open
+                cursor.execute('SELECT pg_export_snapshot()')
+                (snapshot_id,) = cursor.fetchone()
+                context = multiprocessing.get_context('spawn')
+                with context.Pool(
+                    processes=min(jobs, len(tables)),
+                    initializer=init_dump_worker,
+                ) as pool:
+                    results = [
+                        pool.apply_async(
+                            dump_table_in_snapshot,
+                            (table, snapshot_id, directory),
+                        )
+                        for table in tables
+                    ]
+                    for result in results:
+                        table_name, rows_count = result.get()
+                        rows_counts[table_name] = rows_count
+                        if on_table_dumped is not None:
+                            on_table_dumped(table_name, rows_count)
+            else:
+                for table in tables:
+                    rows_count = write_table(cursor, table, directory)
+                    rows_counts[table['table']] = rows_count
+                    if on_table_dumped is not None:
+                        on_table_dumped(table['table'], rows_count)
+
+    manifest = {
+        'version': MANIFEST_VERSION,
+        'datastore_version': concrete_datastore.__version__,
+        'date': timezone.now().isoformat(),
+        'scope_uid': None if scope_uid is None else str(scope_uid),
+        'tables': [
+            {
+                'model': table['model'],
+                'table': table['table'],
+                'file': '{}.csv.gz'.format(table['table']),
+                'columns': table['columns'],
+                'rows_count': rows_counts[table['table']],
+            }
+            for table in tables
+        ],
+    }
+    with open(os.path.join(directory, MANIFEST_FILENAME), 'w') as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+
+def read_manifest(directory):
+    with open(os.path.join(directory, MANIFEST_FILENAME)) as f:
+        manifest = json.load(f)
+    if manifest.get('version') != MANIFEST_VERSION:
+        raise ValueError(
+            'Unsupported manifest version {}'.format(manifest.get('version'))
+        )
+    return manifest
+
+
+def restore_table(cursor, table, directory):
+    """
+    Load the file of the table in a staging table with `COPY`, then insert
+    its rows with a single `INSERT ... SELECT`, the rows already present
+    being skipped. Return the number of inserted rows
+    """
+    columns = sql.SQL(', ').join(
+        sql.Identifier(column) for column in table['columns']
+    )
+    staging_table = sql.Identifier('restore_staging_{}'.format(table['table']))
+    cursor.execute(
+        sql.SQL(
+            'CREATE TEMPORARY TABLE {} (LIKE {} INCLUDING DEFAULTS)'
+        ).format(staging_table, sql.Identifier(table['table']))
+    )
+    with gzip.open(os.path.join(directory, table['file']), 'rb') as f:
+        cursor.copy_expert(
+            sql.SQL(
+                'COPY {} ({}) FROM STDIN WITH (FORMAT csv, HEADER)'
+            ).format(staging_table, columns),
+            f,
+        )
+    cursor.execute(
+        sql.SQL(
+            'INSERT INTO {0} ({1}) SELECT {1} FROM {2} ON CONFLICT DO NOTHING'
+        ).format(sql.Identifier(table['table']), columns, staging_table)
+    )
+    inserted_count = cursor.rowcount
+    cursor.execute(sql.SQL('DROP TABLE {}').format(staging_table))
+    return inserted_count
+
+
+def check_manifest_columns(manifest):
+    """
+    Return the errors of the tables of the manifest missing in the
+    database, or whose columns differ from the database ones
+    """
+    errors = []
+    with connection.cursor() as cursor:
+        existing_tables = set(connection.introspection.table_names(cursor))
+        for table in manifest['tables']:
+            if table['table'] not in existing_tables:
+                errors.append('Unknown table {}'.format(table['table']))
+                continue
+            columns = {
+                column.name
+                for column in connection.introspection.get_table_description(
+                    cursor, table['table']
+                )
+            }
+            missing_columns = set(table['columns']) - columns
+            if missing_columns:
+                errors.append(
+                    'Unknown columns of {}: {}'.format(
+                        table['table'], ', '.join(sorted(missing_columns))
+                    )
+                )
+    return errors
+
+
+def restore_datastore(directory, on_table_restored=None):
+    """
+    Load a dump in dependency order, in a single transaction whose
+    constraints are checked at the end only. Return the number of inserted
+    rows per table
+    """
+    manifest = read_manifest(directory)
+    errors = check_manifest_columns(manifest)
+    if errors:
+        raise ValueError('; '.join(errors))
+
+    inserted_counts = {}
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            cursor.execute('SET CONSTRAINTS ALL DEFERRED')
+            for table in manifest['tables']:
+                inserted_count = restore_table(cursor, table, directory)
+                inserted_counts[table['table']] = inserted_count
+                if on_table_restored is not None:
+                    on_table_restored(table['table'], inserted_count)
+    return inserted_counts
@@ -0,0 +1,298 @@
+# coding: utf-8
+import hashlib
+import logging
+import tempfile
+from datetime import timedelta
+from urllib.parse import urlencode
+
+from django.apps import apps
+from django.contrib.auth import get_user_model
+from django.core.files import File
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from django.conf import settings
+from django.http import HttpRequest, QueryDict
+from django.utils import timezone
+from rest_framework.request import Request
+
+from concrete_datastore.concrete.models import (  # pylint:disable=E0611
+    ExportJob,
+)
+from concrete_datastore.interfaces.csv import (
+    csv_content_generator,
+    get_export_filename,
+)
+from concrete_datastore.interfaces.columnar import (
+    COLUMNAR_FORMATS,
+    columnar_data_generator,
+    get_fields_types,
+)
+
+logger = logging.getLogger(__name__)
+
+#: Query params of the export request that do not change its result
+IGNORED_QUERY_PARAMS = ('c_async',)
+
+
+def get_export_query_string(query_params):
+    """
+    Return the query params of the export request sorted, so that identical
+    requests have the same query string
+    """
+    return urlencode(
+        sorted(
+            (key, value)
+            for key, values in query_params.lists()
+            if key not in IGNORED_QUERY_PARAMS
+            for value in values
+        )
+    )
+
+
+def get_export_fingerprint(model_name, user, scope_uid, query_string):
+    #: The permissions depend on the user and the scope
+    return hashlib.sha256(
+        '\n'.join(
+            (model_name, str(user.pk), str(scope_uid or ''), query_string)
+        ).encode('utf-8')
+    ).hexdigest()
+
+
+def get_reusable_export_job(fingerprint):
+    """
+    Return the job of an identical request being computed, or whose artifact
+    has not expired yet
+    """
+    return (
+        ExportJob.objects.filter(fingerprint=fingerprint)
+        .filter(
+            Q(status__in=ExportJob.ACTIVE_STATUSES)
+            | Q(status=ExportJob.STATUS_DONE, expiry_date__gt=timezone.now())
+        )
+        .order_by('-creation_date')
+        .first()
+    )
+
+
+def get_or_create_export_job(model_name, user, scope_uid, query_params):
+    """
+    Return the export job of the request and whether it has been created.
+    The unique constraint on the fingerprint of the active jobs prevents two
+    identical requests from creating two jobs
+    """
+    query_string = get_export_query_string(query_params)
+    return get_or_create_job_by_fingerprint(
+        fingerprint=get_export_fingerprint(
+            model_name, user, scope_uid, query_string
+        ),
+        model_name=model_name,
+        query_string=query_string,
+        scope_uid=scope_uid,
+        compress=query_params.get('c_compress') or '',
+        export_format=query_params.get('c_format') or 'csv',
+        created_by=user,
+    )
+
+
+def get_admin_export_fields(model):
+    return [field.name for field in model._meta.fields]
+
+
+def get_or_create_admin_export_job(queryset, user, query_string=None):
+    """
+    Return the job exporting all the fields of the instances selected in
+    the admin to a gzipped CSV file, and whether it has been created. With
+    the `query_string` of the changelist (all its rows being selected), the
+    job exports the rows of its filters and search instead of the ticked
+    rows
+    """
+    if query_string is not None:
+        selection = {'admin_query_string': query_string}
+        selection_key = 'admin?{}'.format(query_string)
+    else:
+        admin_pks = sorted(
+            str(pk) for pk in queryset.values_list('pk', flat=True)
+        )
+        selection = {'admin_pks': admin_pks}
+        selection_key = hashlib.sha256(
+            ','.join(admin_pks).encode('utf-8')
+        ).hexdigest()
+    return get_or_create_job_by_fingerprint(
+        fingerprint=get_export_fingerprint(
+            queryset.model.__name__, user, None, selection_key
+        ),
+        model_name=queryset.model.__name__,
+        compress='gzip',
+        created_by=user,
+        **selection,
+    )
+
+
+def get_or_create_job_by_fingerprint(fingerprint, **job_attrs):
+    while True:
+        job = get_reusable_export_job(fingerprint)
+        if job is not None:
+            return job, False
+        try:
+            with transaction.atomic():
+                job = ExportJob.objects.create(
+                    fingerprint=fingerprint, **job_attrs
+                )
+        except IntegrityError:
+            #: An identical job has been created concurrently
+            continue
+        return job, True
+
+
+def serialize_export_job(job):
+    return {
+        'uid': job.pk,
+        'model_name': job.model_name,
+        'status': job.status,
+        'total_count': job.total_count,
+        'exported_count': job.exported_count,
+        'error': job.error,
+        'creation_date': job.creation_date,
+        'expiry_date': job.expiry_date,
+    }
+
+
+def get_admin_changelist_queryset(job, model):
+    """
+    Return the rows of the admin changelist of the query string of the job,
+    filtered and searched as in the page of the user
+    """
+    from concrete_datastore.admin.admin import admin_site
+
+    request = HttpRequest()
+    request.method = 'GET'
+    request.GET = QueryDict(job.admin_query_string)
+    request.user = get_user_model().objects.get(pk=job.created_by_id)
+    model_admin = admin_site._registry[model]
+    changelist = model_admin.get_changelist_instance(request)
+    return changelist.get_queryset(request)
+
+
+def get_export_queryset(job):
+    """
+    Return the rows to export, filtered with the query params of the request
+    and the permissions of the user by the viewset of the model, or selected
+    in the admin
+    """
+    if job.admin_pks is not None or job.admin_query_string is not None:
+        model = apps.get_model('concrete.{}'.format(job.model_name))
+        if job.admin_pks is not None:
+            queryset = model.objects.filter(pk__in=job.admin_pks)
+        else:
+            queryset = get_admin_changelist_queryset(job, model)
+        fields = get_admin_export_fields(model)
+        return queryset.values(*fields), fields
+
+    from concrete_datastore.api.v1_1 import views
+
+    viewset_class = getattr(views, '{}ModelViewSet'.format(job.model_name))
+
+    http_request = HttpRequest()
+    http_request.method = 'GET'
+    http_request.GET = QueryDict(job.query_string)
+    if job.scope_uid is not None:
+        http_request.META['HTTP_X_ENTITY_UID'] = str(job.scope_uid)
+    request = Request(http_request)
+    request.user = get_user_model().objects.get(pk=job.created_by_id)
+
+    view = viewset_class(
+        request=request,
+        args=(),
+        kwargs={},
+        format_kwarg=None,
+        action='get_export',
+    )
+    queryset = view.filter_queryset(view.get_queryset())
+    return queryset.values(*view.export_fields), view.export_fields
+
+
+def track_progress(job, rows):
+    for count, row in enumerate(rows, 1):
+        yield row
+        if count % settings.EXPORT_ROWS_CHUNK_SIZE == 0:
+            ExportJob.objects.filter(pk=job.pk).update(exported_count=count)
+            job.exported_count = count
+
+
+def run_export_job(job_pk):
+    """
+    Write the CSV file of a pending export job to the storage. The job is
+    claimed with a conditional UPDATE, so that a task delivered twice only
+    runs once
+    """
+    claimed = ExportJob.objects.filter(
+        pk=job_pk, status=ExportJob.STATUS_PENDING
+    ).update(status=ExportJob.STATUS_RUNNING, modification_date=timezone.now())
+    if not claimed:
+        return
+    job = ExportJob.objects.get(pk=job_pk)
+
+    try:
+        queryset, fields = get_export_queryset(job)
+        job.total_count = queryset.count()
+        job.save(update_fields=['total_count', 'modification_date'])
+        rows = track_progress(
+            job,
+            queryset.iterator(chunk_size=settings.EXPORT_ROWS_CHUNK_SIZE),
+        )
+        if job.export_format in COLUMNAR_FORMATS:
+            chunks = columnar_data_generator(
+                rows,
+                fields,
+                get_fields_types(queryset.model, fields),
+                job.export_format,
+            )
+            filename = get_export_filename(
+                job.model_name,
+                extension=COLUMNAR_FORMATS[job.export_format]['extension'],
+            )
+        else:
+            chunks = csv_content_generator(
+                rows, fields, compress=job.compress or None
+            )
+            filename = get_export_filename(
+                job.model_name, job.compress or None
+            )
+        with tempfile.TemporaryFile() as content:
+            for chunk in chunks:
+                content.write(chunk)
+            job.file.save(filename, File(content), save=False)
+    except Exception as e:
+        logger.exception('Export job {} failed'.format(job.pk))
+        job.status = ExportJob.STATUS_FAILED
+        job.error = str(e)
+        job.save(update_fields=['status', 'error', 'modification_date'])
+        return
+
+    job.status = ExportJob.STATUS_DONE
+    job.exported_count = job.total_count
+    job.expiry_date = timezone.now() + timedelta(
+        seconds=settings.EXPORT_JOBS_TTL_SECONDS
+    )
+    job.save()
+
+
+def remove_expired_export_jobs():
+    """
+    Delete the jobs whose artifact has expired, or that have not succeeded
+    within `EXPORT_JOBS_TTL_SECONDS`, with their files. Return the number
+    of deleted jobs
+    """
+    now = timezone.now()
+    expired_jobs = ExportJob.objects.filter(
+        Q(expiry_date__lte=now)
+        | Q(
+            creation_date__lte=now
+            - timedelta(seconds=settings.EXPORT_JOBS_TTL_SECONDS),
+            status__in=ExportJob.ACTIVE_STATUSES + (ExportJob.STATUS_FAILED,),
+        )
+    )
+    for job in expired_jobs.exclude(file='').exclude(file__isnull=True):
+        job.file.delete(save=False)
+    deleted_count, _ = expired_jobs.delete()
+    return deleted_count
@@ -0,0 +1,438 @@
+# coding: utf-8
+import csv
+import io
+import json
+import logging
+import tempfile
+from itertools import islice
+
+from django.apps import apps
+from django.conf import settings
+from django.core.files import File
+from django.db import (
+    DataError,
+    IntegrityError,
+    connections,
+    router,
+    transaction,
+)
+from django.utils import timezone
+from psycopg2 import sql
+from rest_framework.validators import UniqueTogetherValidator
+
+from concrete_datastore.concrete.meta import meta_registered
+from concrete_datastore.concrete.models import (  # pylint:disable=E0611
+    ChangeLogEntry,
+    ImportJob,
+)
+from concrete_datastore.concrete.changelog import get_scope_uid, record_changes
+from concrete_datastore.concrete.ingestion import (
+    get_creation_attrs,
+    get_ingestion_serializer_class,
+)
+from concrete_datastore.api.v1.bulk import bulk_create_instances
+from concrete_datastore.api.v1.fields import (
+    RELATED_INSTANCES_CACHE_KEY,
+    prefetch_related_instances,
+)
+from concrete_datastore.interfaces.columnar import get_fields_types
+
+logger = logging.getLogger(__name__)
+
+IMPORT_FORMATS = ('csv', 'ndjson')
+
+#: Types of fields whose empty CSV values are kept as empty strings
+TEXT_TYPES = ('char', 'txt', 'url')
+
+
+class ImportFileError(ValueError):
+    pass
+
+
+def get_import_format(filename, file_format=None):
+    if file_format is None:
+        extension = filename.rsplit('.', 1)[-1].lower()
+        file_format = 'ndjson' if extension in ('ndjson', 'jsonl') else 'csv'
+    if file_format not in IMPORT_FORMATS:
+        raise ImportFileError(
+            'The format should be one of {}'.format(', '.join(IMPORT_FORMATS))
+        )
+    return file_format
+
+
+def get_importable_fields_types(model):
+    """
+    Types of the columns that can be imported: the `export_fields` of the
+    model, except the many-to-many relations
+    """
+    meta_model = meta_registered['concrete.{}'.format(model.__name__)]
+    export_fields = meta_model.get_property('m_export_fields', []) or []
+    return {
+        name: field_type
+        for name, field_type in get_fields_types(model, export_fields).items()
+        if field_type != 'm2m'
+    }
+
+
+def read_rows(binary_file, file_format, columns):
+    """
+    Yield the line number and the values of each row of a CSV file (with
+    the format of the exports) or of a NDJSON file. Raise an
+    `ImportFileError` if the header of the CSV file has unknown columns
+    """
+    text_file = io.TextIOWrapper(binary_file, encoding='utf-8-sig', newline='')
+    if file_format == 'csv':
+        reader = csv.DictReader(text_file, delimiter=';')
+        unknown_columns = set(reader.fieldnames or []) - set(columns)
+        if unknown_columns:
+            raise ImportFileError(
+                'Unknown columns: {}'.format(
+                    ', '.join(sorted(unknown_columns))
+                )
+            )
+        for row in reader:
+            yield reader.line_num, row
+        return
+    for line_number, line in enumerate(text_file, 1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError:
+            row = None
+        yield line_number, row
+
+
+def prepare_item(row, fields_types, file_format):
+    """
+    Return the data of the row given to the serializer: the relations are
+    given by uid, and the empty CSV values of the non-text fields are left
+    to their default
+    """
+    item = {}
+    for name, value in row.items():
+        field_type = fields_types[name]
+        if file_format == 'csv' and field_type not in TEXT_TYPES:
+            if value == '':
+                continue
+            if field_type == 'json':
+                try:
+                    value = json.loads(value)
+                except ValueError:
+                    pass
+        if field_type == 'fk':
+            name = '{}_uid'.format(name)
+        item[name] = value
+    return item
+
+
+def validate_rows(model_name, rows, fields_types, file_format):
+    """
+    Validate a batch of rows, the related instances of all the rows being
+    fetched together. Return the validated data with the line numbers of
+    the valid rows, and the rejected rows
+    """
+    serializer_class = get_ingestion_serializer_class(model_name)
+    context = {RELATED_INSTANCES_CACHE_KEY: {}}
+    valid_rows, rejected_rows, items = [], [], []
+    for line_number, row in rows:
+        if not isinstance(row, dict):
+            rejected_rows.append(
+                (line_number, row, {'non_field_errors': ['Invalid row']})
+            )
+            continue
+        unknown_fields = sorted(
+            str(name) for name in set(row) - set(fields_types)
+        )
+        if unknown_fields:
+            rejected_rows.append(
+                (
+                    line_number,
+                    row,
+                    {name: ['Unknown field'] for name in unknown_fields},
+                )
+            )
+            continue
+        items.append(
+            (line_number, row, prepare_item(row, fields_types, file_format))
+        )
+
+    prefetch_related_instances(
+        serializer_class(context=context), [item for _, _, item in items]
+    )
+    for line_number, row, item in items:
+        serializer = serializer_class(data=item, context=context)
+        #: The conflicts are reported by the insertion of the batch
+        serializer.validators = [
+            validator
+            for validator in serializer.validators
+            if not isinstance(validator, UniqueTogetherValidator)
+        ]
+        if serializer.is_valid():
+            valid_rows.append((line_number, row, serializer.validated_data))
+        else:
+            rejected_rows.append((line_number, row, serializer.errors))
+    return valid_rows, rejected_rows
+
+
+def get_copy_value(field, instance, connection):
+    value = field.pre_save(instance, add=True)
+    if value is None:
+        return ''
+    if getattr(field, 'geom_type', None) is not None:
+        value = value.ewkt
+    else:
+        value = field.get_db_prep_save(value, connection)
+    #: The quoted values are never read as NULL
+    return '"{}"'.format(str(value).replace('"', '""'))
+
+
+def copy_instances(model, instances, using):
+    """
+    Load the instances in a staging table with `COPY`, then insert them in
+    the table of the model with a single `INSERT ... SELECT`. The rows
+    conflicting with existing ones are skipped. Return the pks of the
+    inserted rows
+    """
+    connection = connections[using]
+    fields = model._meta.concrete_fields
+    columns = sql.SQL(', ').join(
+        sql.Identifier(field.column) for field in fields
+    )
+    table = sql.Identifier(model._meta.db_table)
+    staging_table = sql.Identifier(
+        'import_staging_{}'.format(model._meta.db_table)
+    )
+
+    content = io.StringIO()
+    for instance in instances:
+        content.write(
+            ','.join(
+                get_copy_value(field, instance, connection) for field in fields
+            )
+        )
+        content.write('\n')
+    content.seek(0)
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            sql.SQL(
+                'CREATE TEMPORARY TABLE {} (LIKE {} INCLUDING DEFAULTS)'
+            ).format(staging_table, table)
+        )
+        #: The errors of COPY are raised as the Django database errors
+        with connection.wrap_database_errors:
+            cursor.copy_expert(
+                sql.SQL('COPY {} ({}) FROM STDIN WITH (FORMAT csv)').format(
+                    staging_table, columns
+                ),
+                content,
+            )
+        cursor.execute(
+            sql.SQL(
+                'INSERT INTO {0} ({1}) SELECT {1} FROM {2} '
+                'ON CONFLICT DO NOTHING RETURNING {3}'
+            ).format(
+                table,
+                columns,
+                staging_table,
+                sql.Identifier(model._meta.pk.column),
+            )
+        )
+        created_pks = {row[0] for row in cursor.fetchall()}
+        cursor.execute(sql.SQL('DROP TABLE {}').format(staging_table))
+    return created_pks
+
+
+def create_instances_one_by_one(model, items_data, creation_attrs, using):
+    """
+    Create the instances one by one, so that only the faulty ones are
+    rejected. Return the indexes of the rows that were not created, with
+    their error
+    """
+    errors = {}
+    for index, data in enumerate(items_data):
+        try:
+            with transaction.atomic(using=using):
+                bulk_create_instances(model, [{**data, **creation_attrs}])
+        except (DataError, IntegrityError) as e:
+            errors[index] = {'non_field_errors': [str(e)]}
+    return errors
+
+
+def create_instances(model, items_data, creation_attrs):
+    """
+    Create the instances of the valid rows. With PostgreSQL (unless
+    `IMPORT_USE_COPY` is disabled), they are loaded with `COPY` and merged
+    with one statement, otherwise they are created with `bulk_create`. If
+    the database rejects the batch, its rows are created one by one.
+    Return the indexes of the rows that were not created, with their error
+    """
+    using = router.db_for_write(model)
+    if settings.IMPORT_USE_COPY and connections[using].vendor == 'postgresql':
+        instances = [model(**data, **creation_attrs) for data in items_data]
+        try:
+            with transaction.atomic(using=using):
+                created_pks = copy_instances(model, instances, using)
+                record_changes(
+                    model,
+                    (
+                        (instance.pk, get_scope_uid(instance))
+                        for instance in instances
+                        if instance.pk in created_pks
+                    ),
+                    ChangeLogEntry.OPERATION_CREATE,
+                )
+        except (DataError, IntegrityError):
+            return create_instances_one_by_one(
+                model, items_data, creation_attrs, using
+            )
+        return {
+            index: {'non_field_errors': ['Conflicts with an existing row']}
+            for index, instance in enumerate(instances)
+            if instance.pk not in created_pks
+        }
+
+    try:
+        with transaction.atomic(using=using):
+            bulk_create_instances(
+                model, [{**data, **creation_attrs} for data in items_data]
+            )
+        return {}
+    except (DataError, IntegrityError):
+        return create_instances_one_by_one(
+            model, items_data, creation_attrs, using
+        )
+
+
+def import_rows(
+    model_name,
+    rows,
+    file_format,
+    creation_attrs,
+    rejected_file=None,
+    on_progress=None,
+    batch_size=None,
+):
+    """
+    Validate and create the instances of the rows by batches of
+    `IMPORT_BATCH_SIZE`. The rejected rows are written to `rejected_file`
+    as NDJSON (`{"line": ..., "row": ..., "errors": ...}`), and
+    `on_progress(processed_count, created_count, rejected_count)` is called
+    after each batch. Return the counts
+    """
+    model = apps.get_model('concrete.{}'.format(model_name))
+    fields_types = get_importable_fields_types(model)
+    if not fields_types:
+        raise ImportFileError(
+            'Model {} has no export_fields to import'.format(model_name)
+        )
+    if batch_size is None:
+        batch_size = settings.IMPORT_BATCH_SIZE
+
+    processed_count, created_count, rejected_count = 0, 0, 0
+    rows = iter(rows)
+    while True:
+        batch = list(islice(rows, batch_size))
+        if not batch:
+            break
+        valid_rows, rejected_rows = validate_rows(
+            model_name, batch, fields_types, file_format
+        )
+        errors = create_instances(
+            model, [data for _, _, data in valid_rows], creation_attrs
+        )
+        for index, error in errors.items():
+            line_number, row, _ = valid_rows[index]
+            rejected_rows.append((line_number, row, error))
+
+        processed_count += len(batch)
+        created_count += len(valid_rows) - len(errors)
+        rejected_count += len(rejected_rows)
+        if rejected_file is not None:
+            for line_number, row, error in sorted(
+                rejected_rows, key=lambda rejected: rejected[0]
+            ):
+                rejected_file.write(
+                    json.dumps(
+                        {'line': line_number, 'row': row, 'errors': error},
+                        default=str,
+                    ).encode('utf-8')
+                    + b'\n'
+                )
+        if on_progress is not None:
+            on_progress(processed_count, created_count, rejected_count)
+    return processed_count, created_count, rejected_count
+
+
+def serialize_import_job(job):
+    return {
+        'uid': job.pk,
+        'model_name': job.model_name,
+        'status': job.status,
+        'processed_count': job.processed_count,
+        'created_count': job.created_count,
+        'rejected_count': job.rejected_count,
+        'error': job.error,
+        'creation_date': job.creation_date,
+        'processing_date': job.processing_date,
+    }
+
+
+def run_import_job(job_pk):
+    """
+    Import the file of a pending import job. The job is claimed with a
+    conditional UPDATE, so that a task delivered twice only runs once
+    """
+    claimed = ImportJob.objects.filter(
+        pk=job_pk, status=ImportJob.STATUS_PENDING
+    ).update(status=ImportJob.STATUS_RUNNING, processing_date=timezone.now())
+    if not claimed:
+        return
+    job = ImportJob.objects.get(pk=job_pk)
+
+    def on_progress(processed_count, created_count, rejected_count):
+        ImportJob.objects.filter(pk=job.pk).update(
+            processed_count=processed_count,
+            created_count=created_count,
+            rejected_count=rejected_count,
+            modification_date=timezone.now(),
+        )
+
+    model = apps.get_model('concrete.{}'.format(job.model_name))
+    try:
+        rejected_file = tempfile.TemporaryFile()
+        with job.file.open('rb') as binary_file, rejected_file:
+            rows = read_rows(
+                binary_file,
+                job.file_format,
+                get_importable_fields_types(model),
+            )
+            (
+                job.processed_count,
+                job.created_count,
+                job.rejected_count,
+            ) = import_rows(
+                job.model_name,
+                rows,
+                job.file_format,
+                get_creation_attrs(job),
+                rejected_file=rejected_file,
+                on_progress=on_progress,
+            )
+            if job.rejected_count:
+                job.rejected_file.save(
+                    'rejected_{}.ndjson'.format(job.pk),
+                    File(rejected_file),
+                    save=False,
+                )
+    except Exception as e:
+        logger.exception('Import job {} failed'.format(job.pk))
+        job.refresh_from_db()
+        job.status = ImportJob.STATUS_FAILED
+        job.error = str(e)
+        job.save(update_fields=['status', 'error', 'modification_date'])
+        return
+
+    job.status = ImportJob.STATUS_DONE
+    job.save()
@@ -0,0 +1,199 @@
+# coding: utf-8
+from functools import lru_cache
+
+from django.apps import apps
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Sum
+from django.utils import timezone
+
+from concrete_datastore.concrete.meta import meta_registered
+from concrete_datastore.concrete.models import (  # pylint:disable=E0611
+    DIVIDER_MODEL,
+    IngestionBatch,
+)
+from concrete_datastore.api.v1.bulk import bulk_create_instances
+from concrete_datastore.api.v1.fields import (
+    RELATED_INSTANCES_CACHE_KEY,
+    prefetch_related_instances,
+)
+
+
+def is_ingestion_enabled(meta_model):
+    return meta_model.get_property('m_ingestion', False) is True
+
+
+@lru_cache(maxsize=None)
+def get_ingestion_serializer_class(model_name):
+    from concrete_datastore.api.v1.serializers import make_serializer_class
+
+    return make_serializer_class(
+        meta_model=meta_registered['concrete.{}'.format(model_name)],
+        nested=False,
+    )
+
+
+@lru_cache(maxsize=None)
+def get_writable_field_names(model_name):
+    serializer = get_ingestion_serializer_class(model_name)()
+    return frozenset(
+        name
+        for name, field in serializer.fields.items()
+        if not field.read_only
+    )
+
+
+def get_unknown_fields(model_name, items):
+    """
+    Cheap validation done when the items are received: return the names of
+    the fields that can not be written. The values are validated by the
+    consumer
+    """
+    writable_field_names = get_writable_field_names(model_name)
+    return sorted(
+        {name for item in items for name in item} - writable_field_names
+    )
+
+
+def get_pending_items_count(model_name):
+    return (
+        IngestionBatch.objects.filter(
+            model_name=model_name, status=IngestionBatch.STATUS_PENDING
+        ).aggregate(count=Sum('items_count'))['count']
+        or 0
+    )
+
+
+def serialize_ingestion_batch(batch):
+    return {
+        'uid': batch.pk,
+        'model_name': batch.model_name,
+        'status': batch.status,
+        'items_count': batch.items_count,
+        'created_count': batch.created_count,
+        'errors': batch.errors,
+        'creation_date': batch.creation_date,
+        'processing_date': batch.processing_date,
+    }
+
+
+def get_creation_attrs(batch):
+    attrs = {'created_by_id': batch.created_by_id}
+    if batch.scope_uid is not None:
+        attrs['{}_id'.format(DIVIDER_MODEL.lower())] = batch.scope_uid
+    return attrs
+
+
+def validate_batch(batch, context):
+    """
+    Return the validated data of the valid items of the batch, and set the
+    errors of the others on the batch
+    """
+    serializer_class = get_ingestion_serializer_class(batch.model_name)
+    creation_attrs = get_creation_attrs(batch)
+    items_data, batch.errors = [], []
+    for index, item in enumerate(batch.items):
+        serializer = serializer_class(data=item, context=context)
+        if serializer.is_valid():
+            items_data.append({**serializer.validated_data, **creation_attrs})
+        else:
+            batch.errors.append({'index': index, 'errors': serializer.errors})
+    return items_data
+
+
+def create_batches_items(model, batches):
+    """
+    Create the valid items of all the batches with one INSERT per table. If
+    the database rejects them, the batches are created one by one so that
+    only the faulty ones fail
+    """
+    #: The related instances of all the items are fetched together
+    context = {RELATED_INSTANCES_CACHE_KEY: {}}
+    prefetch_related_instances(
+        get_ingestion_serializer_class(model.__name__)(context=context),
+        [item for batch in batches for item in batch.items],
+    )
+    items_data = {
+        batch.pk: validate_batch(batch, context) for batch in batches
+    }
+    try:
+        with transaction.atomic():
+            bulk_create_instances(
+                model,
+                [data for batch in batches for data in items_data[batch.pk]],
+            )
+    except IntegrityError:
+        if len(batches) == 1:
+            raise
+        for batch in batches:
+            try:
+                create_batches_items(model, [batch])
+            except IntegrityError as e:
+                batch.status = IngestionBatch.STATUS_FAILED
+                batch.errors = [{'index': None, 'errors': str(e)}]
+        return
+
+    for batch in batches:
+        batch.status = IngestionBatch.STATUS_DONE
+        batch.created_count = len(items_data[batch.pk])
+
+
+def process_ingestion_batches(model_name):
+    """
+    Consume the pending batches of the model, the oldest first: the items
+    of several batches (up to `INGESTION_MICRO_BATCH_MAX_ITEMS`) are
+    created together. The batches being claimed with `SKIP LOCKED`, several
+    consumers can run at once. Return the number of processed batches.
+    """
+    model = apps.get_model('concrete.{}'.format(model_name))
+    processed_count = 0
+    while True:
+        with transaction.atomic():
+            batches, items_count = [], 0
+            pending_batches = (
+                IngestionBatch.objects.select_for_update(skip_locked=True)
+                .filter(
+                    model_name=model_name,
+                    status=IngestionBatch.STATUS_PENDING,
+                )
+                .order_by('creation_date')
+            )
+            for batch in pending_batches[
+                : settings.INGESTION_MICRO_BATCH_MAX_ITEMS
+            ]:
+                if (
+                    batches
+                    and items_count + batch.items_count
+                    > settings.INGESTION_MICRO_BATCH_MAX_ITEMS
+                ):
+                    break
+                batches.append(batch)
+                items_count += batch.items_count
+            if not batches:
+                return processed_count
+
+            try:
+                create_batches_items(model, batches)
+            except IntegrityError as e:
+                batches[0].status = IngestionBatch.STATUS_FAILED
+                batches[0].errors = [{'index': None, 'errors': str(e)}]
+
+            now = timezone.now()
+            for batch in batches:
+                batch.processing_date = now
+                batch.modification_date = now
+                #: The items are only kept to retry the failed batches
+                if batch.status == IngestionBatch.STATUS_DONE:
+                    batch.items = []
+            IngestionBatch.objects.bulk_update(
+                batches,
+                fields=[
+                    'status',
+                    'created_count',
+                    'errors',
+                    'items',
+                    'processing_date',
+                    'modification_date',
+                ],
+            )
+        processed_count += len(batches)
@@ -0,0 +1,65 @@
+# coding: utf-8
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.utils import timezone
+
+from concrete_datastore.concrete.constants import EXACT_LEVEL_ATTRS
+from concrete_datastore.concrete.models import (  # pylint:disable=E0611
+    ChangeLogEntry,
+)
+from concrete_datastore.concrete.changelog import record_changes
+from concrete_datastore.concrete.user_tracked_fields import (
+    cleanup_blocked_user,
+)
+from concrete_datastore.concrete.automation.tasks import (
+    async_cleanup_blocked_user,
+)
+
+
+def schedule_blocked_users_cleanup(users_pks):
+    """
+    Clean up the permissions of the users that have just been blocked,
+    after the commit in tasks of the `users_cleanup` queue if
+    `ASYNC_USER_TRACKED_FIELDS_CLEANUP` is set
+    """
+    for user_pk in users_pks:
+        if settings.ASYNC_USER_TRACKED_FIELDS_CLEANUP is True:
+            kwargs = {'user_pk': str(user_pk)}
+            transaction.on_commit(
+                lambda kwargs=kwargs: async_cleanup_blocked_user.apply_async(
+                    queue='users_cleanup', kwargs=kwargs
+                )
+            )
+        else:
+            cleanup_blocked_user(user_pk)
+
+
+def bulk_set_level(users_queryset, level):
+    """
+    Set the level of the users with a single UPDATE, without sending the
+    `post_save` signal of each user: the change log entries are written in
+    bulk and only the users that become blocked are cleaned up.
+    Return the pks of the users whose level has changed.
+    """
+    level_attrs = EXACT_LEVEL_ATTRS[level]
+    UserModel = get_user_model()
+    with transaction.atomic():
+        changed_pks = list(
+            users_queryset.exclude(**level_attrs)
+            .select_for_update()
+            .values_list('pk', flat=True)
+        )
+        if not changed_pks:
+            return changed_pks
+        UserModel.objects.filter(pk__in=changed_pks).update(
+            modification_date=timezone.now(), **level_attrs
+        )
+        record_changes(
+            UserModel,
+            ((pk, None) for pk in changed_pks),
+            ChangeLogEntry.OPERATION_UPDATE,
+        )
+        if level == 'blocked':
+            schedule_blocked_users_cleanup(changed_pks)
+    return changed_pks
@@ -0,0 +1,48 @@
+# coding: utf-8
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from concrete_datastore.concrete.meta import get_datamodel_cache_version
+from concrete_datastore.parsers.compiled import (
+    compile_meta_models,
+    get_artifact_path,
+    get_datamodel_key,
+    write_artifact,
+)
+from concrete_datastore.parsers.loaders import loads_models_v1
+
+
+class Command(BaseCommand):
+    help = (
+        'Compile the datamodel to the artifact loaded by the processes at '
+        'startup (DATAMODEL_CACHE_DIR)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--cache-dir',
+            type=str,
+            help='directory of the artifact (DATAMODEL_CACHE_DIR)',
+        )
+
+    def handle(self, *args, **options):
+        cache_dir = options['cache_dir'] or settings.DATAMODEL_CACHE_DIR
+        if cache_dir is None:
+            raise CommandError(
+                'Set DATAMODEL_CACHE_DIR or give the --cache-dir option'
+            )
+        model_definitions = settings.META_MODEL_DEFINITIONS
+        if isinstance(model_definitions, (list, tuple)):
+            raise CommandError('Only the datamodels 1.0.0 are compiled')
+
+        artifact_path = get_artifact_path(
+            cache_dir,
+            get_datamodel_key(
+                model_definitions, get_datamodel_cache_version()
+            ),
+        )
+        write_artifact(
+            artifact_path,
+            compile_meta_models(loads_models_v1(model_definitions)),
+        )
+        self.stdout.write(f'Datamodel compiled to {artifact_path}')
@@ -0,0 +1,55 @@
+# coding: utf-8
+import uuid
+
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+
+from concrete_datastore.concrete.models import (  # pylint:disable=E0611
+    DIVIDER_MODEL,
+)
+from concrete_datastore.concrete.dump import dump_datastore
+
+
+class Command(BaseCommand):
+    help = (
+        'Dump the instances of all the models (or of a scope) to a directory '
+        'of gzipped CSV files, from a single consistent snapshot'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'directory', type=str, help='directory of the dump files'
+        )
+        parser.add_argument(
+            '--scope-uid', type=str, help='only dump the instances of a scope'
+        )
+        parser.add_argument(
+            '--jobs',
+            type=int,
+            default=1,
+            help='number of processes dumping the tables in parallel',
+        )
+
+    def handle(self, *args, **options):
+        scope_uid = options['scope_uid']
+        if scope_uid is not None:
+            try:
+                scope_uid = uuid.UUID(scope_uid)
+            except ValueError:
+                raise CommandError(f'Invalid scope uid {scope_uid}')
+            divider_model = apps.get_model('concrete.{}'.format(DIVIDER_MODEL))
+            if not divider_model.objects.filter(pk=scope_uid).exists():
+                raise CommandError(f'The scope {scope_uid} does not exist')
+        if options['jobs'] < 1:
+            raise CommandError('The number of jobs should be at least 1')
+
+        def on_table_dumped(table_name, rows_count):
+            print(f'{table_name}: {rows_count} rows dumped')
+
+        dump_datastore(
+            options['directory'],
+            scope_uid=scope_uid,
+            jobs=options['jobs'],
+            on_table_dumped=on_table_dumped,
+        )
+        print(f'Datastore dumped to {options["directory"]}')
@@ -0,0 +1,130 @@
+# coding: utf-8
+import time
+
+from django.apps import apps
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+
+from concrete_datastore.concrete.models import (  # pylint:disable=E0611
+    DIVIDER_MODEL,
+)
+from concrete_datastore.concrete.changelog import get_scope_field_name
+from concrete_datastore.concrete.imports import (
+    IMPORT_FORMATS,
+    ImportFileError,
+    get_import_format,
+    get_importable_fields_types,
+    import_rows,
+    read_rows,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Import instances of a model from a CSV or NDJSON file with the '
+        'columns of its export_fields'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('model_name', type=str, help='name of the model')
+        parser.add_argument('path', type=str, help='CSV or NDJSON file')
+        parser.add_argument(
+            '--format',
+            type=str,
+            choices=IMPORT_FORMATS,
+            help='format of the file (guessed from its extension by default)',
+        )
+        parser.add_argument(
+            '--scope-uid', type=str, help='uid of the scope of the instances'
+        )
+        parser.add_argument(
+            '--created-by', type=str, help='email of the creator'
+        )
+        parser.add_argument(
+            '--rejected-file',
+            type=str,
+            help='write the rejected rows with their errors to this file',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            help='number of rows inserted at once (IMPORT_BATCH_SIZE)',
+        )
+
+    def handle(self, *args, **options):
+        model_name = options['model_name']
+        try:
+            model = apps.get_model('concrete.{}'.format(model_name))
+        except LookupError:
+            raise CommandError(f'Unknown model {model_name}')
+        if model is get_user_model():
+            raise CommandError('The users are created with provision_users')
+
+        creation_attrs = {}
+        if options['created_by'] is not None:
+            creator = (
+                get_user_model()
+                .objects.filter(email=options['created_by'].lower())
+                .first()
+            )
+            if creator is None:
+                raise CommandError(
+                    f'The user {options["created_by"]} does not exist'
+                )
+            creation_attrs['created_by_id'] = creator.pk
+        if options['scope_uid'] is not None:
+            scope_field_name = get_scope_field_name(model)
+            if scope_field_name is None:
+                raise CommandError(f'Model {model_name} is not divided')
+            divider_model = apps.get_model('concrete.{}'.format(DIVIDER_MODEL))
+            try:
+                divider = divider_model.objects.filter(
+                    pk=options['scope_uid']
+                ).first()
+            except ValidationError:
+                divider = None
+            if divider is None:
+                raise CommandError(
+                    f'The scope {options["scope_uid"]} does not exist'
+                )
+            creation_attrs[scope_field_name] = divider.pk
+
+        start = time.monotonic()
+
+        def on_progress(processed_count, created_count, rejected_count):
+            print(
+                f'{processed_count} rows processed: {created_count} created, '
+                f'{rejected_count} rejected '
+                f'({processed_count / (time.monotonic() - start):.0f} rows/s)'
+            )
+
+        rejected_file = None
+        if options['rejected_file'] is not None:
+            rejected_file = open(options['rejected_file'], 'wb')
+        try:
+            file_format = get_import_format(options['path'], options['format'])
+            with open(options['path'], 'rb') as binary_file:
+                rows = read_rows(
+                    binary_file,
+                    file_format,
+                    get_importable_fields_types(model),
+                )
+                _, created_count, rejected_count = import_rows(
+                    model_name,
+                    rows,
+                    file_format,
+                    creation_attrs,
+                    rejected_file=rejected_file,
+                    on_progress=on_progress,
+                    batch_size=options['batch_size'],
+                )
+        except ImportFileError as e:
+            raise CommandError(f'Unable to import the file: {e}')
+        finally:
+            if rejected_file is not None:
+                rejected_file.close()
+
+        print(f'{created_count} instances created')
+        if rejected_count:
+            print(f'{rejected_count} rows rejected')
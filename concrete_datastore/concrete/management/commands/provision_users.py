@@ -0,0 +1,84 @@
+# coding: utf-8
+from django.apps import apps
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+
+from concrete_datastore.concrete.models import (  # pylint:disable=E0611
+    DIVIDER_MODEL,
+)
+from concrete_datastore.concrete.provisioning import (
+    parse_users_file,
+    provision_users,
+)
+
+
+class Command(BaseCommand):
+    help = 'Create users in bulk from a CSV or JSON file, and invite them'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'path',
+            type=str,
+            help=(
+                'CSV file with a header line (email,first_name,...) or JSON '
+                'list of users'
+            ),
+        )
+        parser.add_argument(
+            '--scope-uid', type=str, help='uid of the scope of the users'
+        )
+        parser.add_argument(
+            '--url-format',
+            type=str,
+            help=(
+                'invite the created users to set their password with this '
+                'link, containing {token} and {email}'
+            ),
+        )
+        parser.add_argument(
+            '--email-format',
+            type=str,
+            help='body of the invitation emails, containing {link}',
+        )
+
+    def handle(self, *args, **options):
+        url_format = options['url_format']
+        if url_format is not None and (
+            '{token}' not in url_format or '{email}' not in url_format
+        ):
+            raise CommandError('url_format is not a valid format_string')
+        email_format = options['email_format']
+        if email_format is not None and '{link}' not in email_format:
+            raise CommandError('email_format is not a valid format_string')
+
+        divider = None
+        if options['scope_uid'] is not None:
+            divider_model = apps.get_model('concrete.{}'.format(DIVIDER_MODEL))
+            try:
+                divider = divider_model.objects.filter(
+                    pk=options['scope_uid']
+                ).first()
+            except ValidationError:
+                divider = None
+            if divider is None:
+                raise CommandError(
+                    f'The scope {options["scope_uid"]} does not exist'
+                )
+
+        with open(options['path'], 'rb') as f:
+            try:
+                users_data = parse_users_file(f.read())
+            except ValueError as e:
+                raise CommandError(f'Unable to read the file: {e}')
+
+        result = provision_users(
+            users_data,
+            divider=divider,
+            url_format=url_format,
+            email_format=email_format,
+        )
+        print(f'{len(result["created"])} users created')
+        if result['existing']:
+            print(f'{len(result["existing"])} users already exist')
+        for error in result['errors']:
+            print(f'User #{error["index"] + 1}: {error["message"]}')
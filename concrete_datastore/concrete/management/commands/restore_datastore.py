@@ -0,0 +1,28 @@
+# coding: utf-8
+from django.core.management.base import BaseCommand, CommandError
+
+from concrete_datastore.concrete.dump import restore_datastore
+
+
+class Command(BaseCommand):
+    help = (
+        'Restore a dump of dump_datastore. The instances already present '
+        'are kept'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'directory', type=str, help='directory of the dump files'
+        )
+
+    def handle(self, *args, **options):
+        def on_table_restored(table_name, inserted_count):
+            print(f'{table_name}: {inserted_count} rows restored')
+
+        try:
+            restore_datastore(
+                options['directory'], on_table_restored=on_table_restored
+            )
+        except (OSError, ValueError) as e:
+            raise CommandError(f'Unable to restore the dump: {e}')
+        print(f'Datastore restored from {options["directory"]}')
@@ -1,7 +1,9 @@
 # coding: utf-8
 from django.conf import settings
 
+import concrete_datastore
 from concrete_datastore.parsers.loaders import loads_meta
+from concrete_datastore.concrete.constants import TYPE_EQ
 
 default_meta_models = [
     # Model Email
@@ -85,9 +87,17 @@ default_meta_models = [
 ]
 
 
-meta_models = loads_meta(settings.META_MODEL_DEFINITIONS) + loads_meta(
-    default_meta_models
-)
+def get_datamodel_cache_version():
+    return '{}:{}'.format(
+        concrete_datastore.__version__, settings.DATAMODEL_VERSION
+    )
+
+
+meta_models = loads_meta(
+    settings.META_MODEL_DEFINITIONS,
+    cache_dir=settings.DATAMODEL_CACHE_DIR,
+    cache_version=get_datamodel_cache_version(),
+) + loads_meta(default_meta_models)
 
 
 list_of_meta = list(
@@ -117,8 +127,87 @@ def make_unicode_method(meta_model):
     return __str__
 
 
+UNKNOWN_TYPE = 'Unknow type'
+
+
+class ModelMetadata:
+    """
+    Metadata of a meta model computed once at startup: the types of its
+    fields (as in `TYPE_EQ`) and its fields by kind
+    """
+
+    def __init__(self, meta_model):
+        self.meta_model = meta_model
+        self.model_name = meta_model.get_model_name()
+        self.dashed_name = meta_model.get_dashed_case_class_name()
+        self.field_names = []
+        self.fields_types = {}
+        self.file_fields = []
+        self.fk_fields = []
+        self.m2m_fields = []
+        self.relation_fields = []
+        for field_name, field in meta_model.get_fields():
+            self.field_names.append(field_name)
+            self.fields_types[field_name] = TYPE_EQ.get(
+                field.f_type, UNKNOWN_TYPE
+            )
+            if field.f_type == 'FileField':
+                self.file_fields.append(field_name)
+            if field.type == 'rel_single':
+                self.fk_fields.append(field_name)
+            elif field.type == 'rel_iterable':
+                self.m2m_fields.append(field_name)
+            if field.type in ('rel_single', 'rel_iterable'):
+                self.relation_fields.append(field_name)
+
+    def get_field_type(self, field_name):
+        return self.fields_types.get(field_name, UNKNOWN_TYPE)
+
+
+class MetaModelRegistry:
+    """
+    Meta models indexed by model name and by dashed name, with their
+    metadata
+    """
+
+    def __init__(self, meta_models):
+        self.by_name = {}
+        self.by_dashed_name = {}
+        self.metadata = {}
+        for meta_model in meta_models:
+            metadata = ModelMetadata(meta_model)
+            #: The first definition of a model name prevails
+            if metadata.model_name in self.by_name:
+                continue
+            self.by_name[metadata.model_name] = meta_model
+            self.by_dashed_name[metadata.dashed_name] = meta_model
+            self.metadata[metadata.model_name] = metadata
+
+    def get(self, model_name):
+        try:
+            return self.by_name[model_name]
+        except KeyError:
+            raise AttributeError('No model named {}'.format(model_name))
+
+    def get_by_dashed_name(self, dashed_name):
+        try:
+            return self.by_dashed_name[dashed_name]
+        except KeyError:
+            raise AttributeError('No model named {}'.format(dashed_name))
+
+    def get_metadata(self, model_name):
+        try:
+            return self.metadata[model_name]
+        except KeyError:
+            raise AttributeError('No model named {}'.format(model_name))
+
+
+registry = MetaModelRegistry(list_of_meta)
+
+
 def get_meta_definition_by_model_name(model_name):
-    for meta_definition in list_of_meta:
-        if meta_definition.get_model_name() == model_name:
-            return meta_definition
-    raise AttributeError('No model named {}'.format(model_name))
+    return registry.get(model_name)
+
+
+def get_model_metadata(model_name):
+    return registry.get_metadata(model_name)
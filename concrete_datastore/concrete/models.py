@@ -30,7 +30,7 @@ from django.contrib.gis.db import models  # it includes all default fields
 from rest_framework.authtoken.models import Token
 
 from concrete_datastore.concrete.meta import (
-    get_meta_definition_by_model_name,
+    get_model_metadata,
     meta_models,
     make_unicode_method,
 )
@@ -41,7 +41,6 @@ from concrete_datastore.concrete.constants import (
     CRUD_LEVEL,
     LIST_USER_LEVEL,
     HANDELED_MODELISATION_VERSIONS,
-    TYPE_EQ,
     MFA_OTP,
     MFA_EMAIL,
 )
@@ -52,9 +51,7 @@ from concrete_datastore.concrete.constants import (
 
 def get_fields_and_types_of_model(model):
     fields_and_types = defaultdict(lambda: 'Unknow type')
-    meta_model = get_meta_definition_by_model_name(model.__name__)
-    for field_name, field in meta_model.get_fields():
-        fields_and_types[field_name] = TYPE_EQ.get(field.f_type, 'Unknow type')
+    fields_and_types.update(get_model_metadata(model.__name__).fields_types)
     return fields_and_types
 
 
@@ -572,6 +569,17 @@ class HasPermissionAbstractUser(models.Model):
     class Meta:
         abstract = True
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super(HasPermissionAbstractUser, cls).from_db(
+            db, field_names, values
+        )
+        level_fields = ('is_superuser', 'admin', 'is_staff', 'is_active')
+        if all(name in field_names for name in level_fields):
+            #: Level in database, to detect the level changes on save
+            instance._loaded_level = instance.level
+        return instance
+
     def __setattr__(self, attrname, val):
         if attrname == 'level':
             kwargs = {'level': val, 'commit': True}
@@ -760,6 +768,307 @@ class DeletedModel(models.Model):
     creation_date = models.DateTimeField(auto_now_add=True)
 
 
+class ChangeLogEntry(models.Model):
+    """
+    Append-only log of the changes on the datastore instances.
+
+    Entries are never updated. Sequences are allocated at insert time, so
+    an entry of a long transaction can be committed after entries with a
+    greater sequence: consumers read the entries ordered by
+    `(transaction_id, sequence)`, from the transactions older than all the
+    running ones only, and keep the last pair they processed.
+    """
+
+    OPERATION_CREATE = 'create'
+    OPERATION_UPDATE = 'update'
+    OPERATION_DELETE = 'delete'
+    OPERATION_PERMISSIONS = 'permissions'
+    OPERATION_CHOICES = (
+        (OPERATION_CREATE, 'Instance created'),
+        (OPERATION_UPDATE, 'Instance updated'),
+        (OPERATION_DELETE, 'Instance deleted'),
+        (OPERATION_PERMISSIONS, 'Instance permissions updated'),
+    )
+
+    sequence = models.BigAutoField(primary_key=True)
+
+    #: Id of the transaction that wrote the entry (`txid_current()`)
+    transaction_id = models.BigIntegerField()
+
+    model_name = models.CharField(max_length=255)
+
+    uid = models.UUIDField(db_index=True)
+
+    scope_uid = models.UUIDField(null=True, blank=True, db_index=True)
+
+    operation = models.CharField(max_length=20, choices=OPERATION_CHOICES)
+
+    creation_date = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ('sequence',)
+        indexes = [
+            models.Index(
+                fields=['model_name', 'sequence'],
+                name='concrete_chlog_model_seq_idx',
+            ),
+            models.Index(
+                fields=['model_name', 'transaction_id', 'sequence'],
+                name='concrete_chlog_model_txid_idx',
+            ),
+        ]
+
+
+class WebhookEndpoint(models.Model):
+    """
+    Outbound webhook receiving the change log entries of a model in
+    batches. `(last_transaction_id, last_sequence)` is the last change log
+    entry already put in a delivery for this endpoint.
+    """
+
+    class Meta:
+        verbose_name = 'Webhook endpoint'
+
+    uid = models.UUIDField(default=uuid.uuid4, primary_key=True)
+    name = models.CharField(max_length=255)
+    url = models.URLField(max_length=1024)
+    model_name = models.CharField(max_length=255, db_index=True)
+    #: Operations of the change log to send, all of them if empty
+    operations = models.JSONField(default=list, blank=True)
+    #: If set, the body of the requests is signed with HMAC-SHA256
+    secret = models.CharField(max_length=255, blank=True, default='')
+    is_active = models.BooleanField(default=True)
+    batch_size = models.PositiveIntegerField(default=100)
+    max_concurrency = models.PositiveSmallIntegerField(default=1)
+    last_transaction_id = models.BigIntegerField(default=0)
+    last_sequence = models.BigIntegerField(default=0)
+    created_by = models.ForeignKey(
+        'concrete.User',
+        related_name="owned_%(class)ss",
+        null=True,
+        on_delete=models.PROTECT,
+    )
+    modification_date = models.DateTimeField(auto_now=True)
+    creation_date = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return str(self.name)
+
+
+class WebhookDelivery(models.Model):
+    """
+    Batch of events sent (or to send) to a webhook endpoint
+    """
+
+    STATUS_PENDING = 'pending'
+    STATUS_SENDING = 'sending'
+    STATUS_SENT = 'sent'
+    STATUS_DEAD = 'dead'
+    STATUS_CHOICES = (
+        (STATUS_PENDING, 'Waiting to be sent'),
+        (STATUS_SENDING, 'Sending'),
+        (STATUS_SENT, 'Sent'),
+        (STATUS_DEAD, 'Abandoned after too many attempts'),
+    )
+
+    class Meta:
+        verbose_name = 'Webhook delivery'
+        verbose_name_plural = 'Webhook deliveries'
+
+    uid = models.UUIDField(default=uuid.uuid4, primary_key=True)
+    endpoint = models.ForeignKey(
+        WebhookEndpoint, related_name='deliveries', on_delete=models.CASCADE
+    )
+    first_sequence = models.BigIntegerField()
+    last_sequence = models.BigIntegerField()
+    payload = models.JSONField(default=dict)
+    status = models.CharField(
+        max_length=20,
+        choices=STATUS_CHOICES,
+        default=STATUS_PENDING,
+        db_index=True,
+    )
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt_date = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True, default='')
+    modification_date = models.DateTimeField(auto_now=True)
+    creation_date = models.DateTimeField(auto_now_add=True)
+
+
+class IngestionBatch(models.Model):
+    """
+    Items sent to the ingestion endpoint of a model, acknowledged at once
+    and created later by the consumer with the items of other batches
+    """
+
+    STATUS_PENDING = 'pending'
+    STATUS_DONE = 'done'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = (
+        (STATUS_PENDING, 'Waiting to be processed'),
+        (STATUS_DONE, 'Processed'),
+        (STATUS_FAILED, 'Failed'),
+    )
+
+    class Meta:
+        verbose_name = 'Ingestion batch'
+        verbose_name_plural = 'Ingestion batches'
+        indexes = [
+            models.Index(
+                fields=['model_name', 'status'],
+                name='ingestion_model_status_idx',
+            )
+        ]
+
+    uid = models.UUIDField(default=uuid.uuid4, primary_key=True)
+    model_name = models.CharField(max_length=255)
+    items = models.JSONField(default=list)
+    items_count = models.PositiveIntegerField(default=0)
+    #: Scope given to the created instances
+    scope_uid = models.UUIDField(null=True, blank=True)
+    status = models.CharField(
+        max_length=20, choices=STATUS_CHOICES, default=STATUS_PENDING
+    )
+    created_count = models.PositiveIntegerField(default=0)
+    #: Errors of the invalid items: `[{"index": 0, "errors": {...}}]`
+    errors = models.JSONField(default=list, blank=True)
+    processing_date = models.DateTimeField(null=True, blank=True)
+    created_by = models.ForeignKey(
+        'concrete.User',
+        related_name="owned_%(class)ses",
+        null=True,
+        on_delete=models.PROTECT,
+    )
+    modification_date = models.DateTimeField(auto_now=True)
+    creation_date = models.DateTimeField(auto_now_add=True)
+
+
+def get_export_job_file_path(instance, filename):
+    """
+    The files of the export jobs are stored in a directory named after the
+    uid of the job, known by its creator only, so that they can not be
+    guessed from the name of the model and the date of the export
+    """
+    return 'exports/{}/{}'.format(instance.pk, filename)
+
+
+class ExportJob(models.Model):
+    """
+    CSV export of a model written to the storage by a background task, with
+    the filters of the request and the permissions of the user who asked it
+    """
+
+    STATUS_PENDING = 'pending'
+    STATUS_RUNNING = 'running'
+    STATUS_DONE = 'done'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = (
+        (STATUS_PENDING, 'Waiting to be processed'),
+        (STATUS_RUNNING, 'Running'),
+        (STATUS_DONE, 'Ready to be downloaded'),
+        (STATUS_FAILED, 'Failed'),
+    )
+    ACTIVE_STATUSES = (STATUS_PENDING, STATUS_RUNNING)
+
+    class Meta:
+        verbose_name = 'Export job'
+        verbose_name_plural = 'Export jobs'
+        indexes = [
+            models.Index(
+                fields=['fingerprint', 'status'],
+                name='export_job_fingerprint_idx',
+            )
+        ]
+        constraints = [
+            #: Identical requests share the job being computed
+            models.UniqueConstraint(
+                fields=['fingerprint'],
+                condition=models.Q(status__in=('pending', 'running')),
+                name='export_job_active_fingerprint',
+            )
+        ]
+
+    uid = models.UUIDField(default=uuid.uuid4, primary_key=True)
+    model_name = models.CharField(max_length=255)
+    #: Hash of the model, the user, the scope and the query params
+    fingerprint = models.CharField(max_length=64)
+    query_string = models.TextField(blank=True, default='')
+    #: Uids of the instances selected in the admin
+    admin_pks = models.JSONField(null=True, blank=True)
+    #: Query string of the admin changelist whose rows are all selected
+    admin_query_string = models.TextField(null=True, blank=True)
+    scope_uid = models.UUIDField(null=True, blank=True)
+    compress = models.CharField(max_length=20, blank=True, default='')
+    export_format = models.CharField(max_length=20, default='csv')
+    status = models.CharField(
+        max_length=20, choices=STATUS_CHOICES, default=STATUS_PENDING
+    )
+    total_count = models.PositiveIntegerField(null=True, blank=True)
+    exported_count = models.PositiveIntegerField(default=0)
+    file = models.FileField(
+        upload_to=get_export_job_file_path, null=True, blank=True
+    )
+    error = models.TextField(blank=True, default='')
+    #: The artifact is reused by identical requests until this date
+    expiry_date = models.DateTimeField(null=True, blank=True)
+    created_by = models.ForeignKey(
+        'concrete.User',
+        related_name="owned_%(class)ss",
+        on_delete=models.CASCADE,
+    )
+    modification_date = models.DateTimeField(auto_now=True)
+    creation_date = models.DateTimeField(auto_now_add=True)
+
+
+class ImportJob(models.Model):
+    """
+    File of instances of a model to import, processed by a background task
+    by batches
+    """
+
+    STATUS_PENDING = 'pending'
+    STATUS_RUNNING = 'running'
+    STATUS_DONE = 'done'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = (
+        (STATUS_PENDING, 'Waiting to be processed'),
+        (STATUS_RUNNING, 'Running'),
+        (STATUS_DONE, 'Processed'),
+        (STATUS_FAILED, 'Failed'),
+    )
+
+    class Meta:
+        verbose_name = 'Import job'
+        verbose_name_plural = 'Import jobs'
+
+    uid = models.UUIDField(default=uuid.uuid4, primary_key=True)
+    model_name = models.CharField(max_length=255)
+    file = models.FileField(upload_to='imports/')
+    file_format = models.CharField(max_length=20, default='csv')
+    #: Scope given to the created instances
+    scope_uid = models.UUIDField(null=True, blank=True)
+    status = models.CharField(
+        max_length=20, choices=STATUS_CHOICES, default=STATUS_PENDING
+    )
+    processed_count = models.PositiveIntegerField(default=0)
+    created_count = models.PositiveIntegerField(default=0)
+    rejected_count = models.PositiveIntegerField(default=0)
+    #: NDJSON file of the rejected rows with their errors
+    rejected_file = models.FileField(
+        upload_to='imports/rejected/', null=True, blank=True
+    )
+    error = models.TextField(blank=True, default='')
+    processing_date = models.DateTimeField(null=True, blank=True)
+    created_by = models.ForeignKey(
+        'concrete.User',
+        related_name="owned_%(class)ss",
+        null=True,
+        on_delete=models.PROTECT,
+    )
+    modification_date = models.DateTimeField(auto_now=True)
+    creation_date = models.DateTimeField(auto_now_add=True)
+
+
 class UserManager(BaseUserManager):
     """Define a model manager for User model with no username field."""
 
@@ -0,0 +1,242 @@
+# coding: utf-8
+import csv
+import io
+import json
+from itertools import chain
+from urllib.parse import urljoin
+
+import pendulum
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+from django.db import transaction
+
+from concrete_datastore.concrete.models import (  # pylint:disable=E0611
+    ChangeLogEntry,
+    DIVIDER_MODEL,
+    Email,
+    PasswordChangeToken,
+    UserConfirmation,
+)
+from concrete_datastore.concrete.meta import get_model_metadata
+from concrete_datastore.concrete.changelog import record_changes
+from concrete_datastore.concrete.automation.tasks import (
+    async_send_mails_batch,
+    send_mails_batch,
+)
+
+
+def parse_users_file(content):
+    """
+    Return the users described by a JSON list of objects or by a CSV file
+    with a header line (`email,first_name,last_name...`). Raise a
+    `ValueError` if the content can not be parsed
+    """
+    if isinstance(content, bytes):
+        content = content.decode('utf-8-sig')
+    if content.lstrip().startswith('['):
+        return json.loads(content)
+    try:
+        return list(csv.DictReader(io.StringIO(content)))
+    except csv.Error as e:
+        raise ValueError(str(e))
+
+
+def get_provisioned_field_names():
+    """
+    Fields of the user that can be given for each user, besides the email
+    """
+    UserModel = get_user_model()
+    return {
+        name
+        for name in get_model_metadata('User').field_names
+        if not UserModel._meta.get_field(name).is_relation
+    } - {'email', 'password'}
+
+
+def clean_users_data(users_data):
+    """
+    Return the valid users (the first occurrence of each email), and the
+    errors of the others
+    """
+    field_names = get_provisioned_field_names()
+    cleaned_users, errors, seen_emails = [], [], set()
+    for index, user_data in enumerate(users_data):
+        if not isinstance(user_data, dict):
+            errors.append({'index': index, 'message': 'Expected an object'})
+            continue
+        email = (user_data.get('email') or '').strip().lower()
+        try:
+            validate_email(email)
+        except ValidationError:
+            errors.append({'index': index, 'message': 'Invalid email'})
+            continue
+        if email in seen_emails:
+            continue
+        seen_emails.add(email)
+        cleaned_users.append(
+            {
+                'email': email,
+                **{
+                    name: value
+                    for name, value in user_data.items()
+                    if name in field_names and value not in (None, '')
+                },
+            }
+        )
+    return cleaned_users, errors
+
+
+def make_invitation_emails(users, url_format, email_format, referer):
+    """
+    Return the unsaved password change tokens, confirmations and emails
+    inviting the users to set their password
+    """
+    expiry_date = pendulum.now('utc').add(months=6)
+    tokens, confirmations, emails = [], [], []
+    for user in users:
+        token = PasswordChangeToken(user=user, expiry_date=expiry_date)
+        tokens.append(token)
+        #: To avoid template injections, we use replace instead of format
+        uri = url_format.replace('{token}', str(token.uid)).replace(
+            '{email}', user.email
+        )
+        link = urljoin(referer, uri)
+        if settings.AUTH_CONFIRM_EMAIL_ENABLE is True:
+            confirmations.append(
+                UserConfirmation(user=user, redirect_to=link, link_sent=True)
+            )
+        emails.append(
+            Email(
+                subject=settings.REGISTER_EMAIL_SUBJECT,
+                resource_status='to-send',
+                resource_message='',
+                body=email_format.replace('{link}', link).replace(
+                    '{email}', user.email
+                ),
+                receiver=user,
+                created_by=user,
+            )
+        )
+    return tokens, confirmations, emails
+
+
+def schedule_mails(emails_pks):
+    """
+    Send the emails after the commit by batches of
+    `PROVISIONING_EMAILS_BATCH_SIZE`, in tasks of the `email_senders` queue
+    if `SMTP_MAILING_USE_ASYNC` is set
+    """
+    batch_size = settings.PROVISIONING_EMAILS_BATCH_SIZE
+    for start in range(0, len(emails_pks), batch_size):
+        batch_pks = [str(pk) for pk in emails_pks[start : start + batch_size]]
+        if settings.SMTP_MAILING_USE_ASYNC is True:
+            transaction.on_commit(
+                lambda batch_pks=batch_pks: async_send_mails_batch.apply_async(
+                    queue='email_senders', kwargs={'emails_pks': batch_pks}
+                )
+            )
+        else:
+            transaction.on_commit(
+                lambda batch_pks=batch_pks: send_mails_batch(
+                    batch_pks,
+                    enable_retrying=settings.RETRY_ON_SENDING_SYNC_EMAILS,
+                )
+            )
+
+
+def provision_users(
+    users_data,
+    divider=None,
+    url_format=None,
+    email_format=None,
+    referer=None,
+):
+    """
+    Create the users that do not exist yet with one INSERT, and add all the
+    given users to the divider. If `url_format` is given, the created users
+    are invited to set their password, the emails being sent in batches
+    once the transaction is committed.
+    Return the emails of the created users, of the existing ones and the
+    errors of the invalid items
+    """
+    UserModel = get_user_model()
+    users_data, errors = clean_users_data(users_data)
+    emails = [user_data['email'] for user_data in users_data]
+
+    with transaction.atomic():
+        existing_users = dict(
+            UserModel.objects.filter(email__in=emails).values_list(
+                'email', 'pk'
+            )
+        )
+        new_users = []
+        for user_data in users_data:
+            if user_data['email'] in existing_users:
+                continue
+            user = UserModel(**user_data)
+            user.set_unusable_password()
+            new_users.append(user)
+        UserModel.objects.bulk_create(
+            new_users, batch_size=settings.API_BULK_BATCH_SIZE
+        )
+        record_changes(
+            UserModel,
+            ((user.pk, None) for user in new_users),
+            ChangeLogEntry.OPERATION_CREATE,
+        )
+
+        if divider is not None:
+            field = UserModel._meta.get_field(
+                '{}s'.format(DIVIDER_MODEL.lower())
+            )
+            through = field.remote_field.through
+            source_name = field.m2m_field_name()
+            target_name = field.m2m_reverse_field_name()
+            through.objects.bulk_create(
+                [
+                    through(
+                        **{
+                            '{}_id'.format(source_name): user_pk,
+                            '{}_id'.format(target_name): divider.pk,
+                        }
+                    )
+                    for user_pk in chain(
+                        existing_users.values(),
+                        (user.pk for user in new_users),
+                    )
+                ],
+                batch_size=settings.API_BULK_BATCH_SIZE,
+                ignore_conflicts=True,
+            )
+
+        if url_format is not None:
+            tokens, confirmations, emails_to_send = make_invitation_emails(
+                new_users,
+                url_format=url_format,
+                email_format=(
+                    email_format or settings.DEFAULT_REGISTER_EMAIL_FORMAT
+                ),
+                referer=(
+                    referer or settings.AUTH_CONFIRM_EMAIL_DEFAULT_REDIRECT_TO
+                ),
+            )
+            PasswordChangeToken.objects.bulk_create(
+                tokens, batch_size=settings.API_BULK_BATCH_SIZE
+            )
+            UserConfirmation.objects.bulk_create(
+                confirmations, batch_size=settings.API_BULK_BATCH_SIZE
+            )
+            #: The emails are created without their `pre_save` and
+            #: `post_save` signals, they are sent by `schedule_mails`
+            Email.objects.bulk_create(
+                emails_to_send, batch_size=settings.API_BULK_BATCH_SIZE
+            )
+            schedule_mails([email.pk for email in emails_to_send])
+
+    return {
+        'created': [user.email for user in new_users],
+        'existing': sorted(existing_users),
+        'errors': errors,
+    }
@@ -0,0 +1,62 @@
+# coding: utf-8
+from django.db import transaction
+from django.utils import timezone
+
+from concrete_datastore.concrete.models import (  # pylint:disable=E0611
+    ChangeLogEntry,
+    DIVIDER_MODEL,
+)
+from concrete_datastore.concrete.changelog import record_changes
+from concrete_datastore.concrete.user_tracked_fields import get_divided_models
+
+
+def reassign_scope(queryset, source_divider, target_divider):
+    """
+    Move the instances of the queryset that belong to the source scope to
+    the target scope with a single UPDATE. The move is recorded in the
+    change log of both scopes: the clients synchronising the source scope
+    see the instances leave, those of the target scope see them appear.
+    The instances still exist, so no tombstone is written. Return the
+    number of instances moved.
+    """
+    model = queryset.model
+    divider_field_name = DIVIDER_MODEL.lower()
+    with transaction.atomic():
+        moved_pks = list(
+            model.objects.filter(
+                pk__in=queryset.values('pk'),
+                **{divider_field_name: source_divider},
+            )
+            .select_for_update()
+            .values_list('pk', flat=True)
+        )
+        if not moved_pks:
+            return 0
+        model.objects.filter(pk__in=moved_pks).update(
+            modification_date=timezone.now(),
+            **{divider_field_name: target_divider},
+        )
+        for divider in (source_divider, target_divider):
+            record_changes(
+                model,
+                ((pk, divider.pk) for pk in moved_pks),
+                ChangeLogEntry.OPERATION_UPDATE,
+            )
+    return len(moved_pks)
+
+
+def reassign_scopes(source_divider, target_divider, models=None):
+    """
+    Move all the instances of the divided models (all of them by default)
+    from the source scope to the target scope, in a single transaction.
+    Return the number of instances moved per model name.
+    """
+    if models is None:
+        models = get_divided_models()
+    moved_counts = {}
+    with transaction.atomic():
+        for model in models:
+            moved_counts[model.__name__] = reassign_scope(
+                model.objects.all(), source_divider, target_divider
+            )
+    return moved_counts
@@ -0,0 +1,88 @@
+# coding: utf-8
+from django.apps import apps
+from django.contrib.auth import get_user_model
+from django.db.models import Q
+
+from concrete_datastore.concrete.meta import meta_models
+from concrete_datastore.concrete.models import (  # pylint:disable=E0611
+    ChangeLogEntry,
+    DIVIDER_MODEL,
+    UNDIVIDED_MODEL,
+)
+from concrete_datastore.concrete.changelog import record_queryset_changes
+
+#: User-tracked many-to-many fields the user is removed from when they
+#: lose access to a scope
+USER_TRACKED_FIELDS = ('can_view_users', 'can_admin_users')
+
+
+def get_divided_models():
+    divider_related_models = [
+        'EntityDividerModel',
+        'UndividedModel',
+        'DefaultDivider',
+        'User',
+        DIVIDER_MODEL,
+    ]
+    return [
+        apps.get_model('concrete.{}'.format(meta_model.get_model_name()))
+        for meta_model in meta_models
+        if meta_model.get_model_name() not in divider_related_models
+        and meta_model.get_model_name() not in UNDIVIDED_MODEL
+    ]
+
+
+def remove_user_from_tracked_fields(user_pk, removed_dividers_pks):
+    """
+    Remove the user from the user-tracked fields of the instances of the
+    removed scopes, with one DELETE per through table, whatever the number
+    of instances
+    """
+    _filter = {'{}__in'.format(DIVIDER_MODEL.lower()): removed_dividers_pks}
+    for model in get_divided_models():
+        scope_instances_pks = model.objects.filter(**_filter).values('pk')
+        links_querysets = []
+        for field_name in USER_TRACKED_FIELDS:
+            field = model._meta.get_field(field_name)
+            links_querysets.append(
+                (
+                    field.m2m_field_name(),
+                    field.remote_field.through.objects.filter(
+                        **{
+                            field.m2m_reverse_field_name(): user_pk,
+                            '{}__in'.format(
+                                field.m2m_field_name()
+                            ): scope_instances_pks,
+                        }
+                    ),
+                )
+            )
+
+        affected_instances_filter = Q()
+        for source_name, links in links_querysets:
+            affected_instances_filter |= Q(pk__in=links.values(source_name))
+        record_queryset_changes(
+            model.objects.filter(affected_instances_filter),
+            ChangeLogEntry.OPERATION_PERMISSIONS,
+        )
+        for _, links in links_querysets:
+            #: The through tables have no delete receiver: the rows are
+            #: deleted with one query, without being fetched first
+            links.delete()
+
+
+def cleanup_blocked_user(user_pk):
+    """
+    Remove a blocked user from the user-tracked fields of the instances of
+    their scopes, from their scopes and from their groups. Nothing is done
+    if the user has been unblocked meanwhile, and running it again is safe.
+    """
+    user = get_user_model().objects.filter(pk=user_pk).first()
+    if user is None or user.level != 'blocked':
+        return
+    divider_manager = getattr(user, '{}s'.format(DIVIDER_MODEL.lower()))
+    remove_user_from_tracked_fields(
+        user.pk, list(divider_manager.values_list('pk', flat=True))
+    )
+    divider_manager.clear()
+    user.concrete_groups.clear()
@@ -0,0 +1,173 @@
+# coding: utf-8
+import io
+import json
+from itertools import islice
+from typing import Iterable, Dict
+
+from django.conf import settings
+from django.db.models.query import QuerySet
+from django.http import StreamingHttpResponse
+
+from concrete_datastore.concrete.constants import TYPE_EQ
+from concrete_datastore.interfaces.csv import get_export_filename
+
+try:
+    import pyarrow
+    import pyarrow.ipc
+    import pyarrow.parquet
+except ImportError:  # skip-test-coverage
+    pyarrow = None
+
+#: Columnar formats of the exports, by value of the query param `c_format`
+COLUMNAR_FORMATS = {
+    'parquet': {'extension': 'parquet', 'content_type': 'application/parquet'},
+    'arrow': {
+        'extension': 'arrows',
+        'content_type': 'application/vnd.apache.arrow.stream',
+    },
+}
+
+
+def is_columnar_export_available():
+    return pyarrow is not None
+
+
+def get_arrow_type(field_type):
+    """
+    Arrow type of the values of a field, from its type in the datamodel
+    (`TYPE_EQ`). The relations are exported as the uid of the related
+    instance and the JSON values as text
+    """
+    return {
+        'bool': pyarrow.bool_(),
+        'int': pyarrow.int64(),
+        'float': pyarrow.float64(),
+        'datetime': pyarrow.timestamp('us', tz='UTC'),
+        'date': pyarrow.date32(),
+    }.get(field_type, pyarrow.string())
+
+
+def get_converter(field_type):
+    if field_type == 'float':
+        return float
+    if field_type == 'json':
+        return json.dumps
+    if get_arrow_type(field_type) == pyarrow.string():
+        return str
+    return None
+
+
+def get_fields_types(model, fields):
+    return {
+        name: TYPE_EQ.get(model._meta.get_field(name).get_internal_type())
+        for name in fields
+    }
+
+
+class ChunksSink(io.RawIOBase):
+    """
+    Write-only file keeping the written bytes until they are popped. The
+    position keeps growing, as the Parquet footer refers to the offsets of
+    the row groups
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.chunks = []
+        self.position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        data = bytes(data)
+        self.chunks.append(data)
+        self.position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.position
+
+    def pop(self):
+        content = b''.join(self.chunks)
+        self.chunks = []
+        return content
+
+
+def record_batches_generator(
+    rows: Iterable[Dict], fields, fields_types, chunk_size: int = None
+):
+    """
+    Group the rows in typed record batches of `chunk_size` rows
+    """
+    if chunk_size is None:
+        chunk_size = settings.EXPORT_ROWS_CHUNK_SIZE
+    types = [get_arrow_type(fields_types[name]) for name in fields]
+    converters = [get_converter(fields_types[name]) for name in fields]
+    rows = iter(rows)
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            return
+        arrays = []
+        for name, arrow_type, converter in zip(fields, types, converters):
+            values = [row.get(name) for row in chunk]
+            if converter is not None:
+                values = [
+                    None if value is None else converter(value)
+                    for value in values
+                ]
+            arrays.append(pyarrow.array(values, type=arrow_type))
+        yield pyarrow.RecordBatch.from_arrays(arrays, names=list(fields))
+
+
+def columnar_data_generator(
+    rows: Iterable[Dict], fields, fields_types, export_format
+):
+    """
+    Generator producing a Parquet file (one row group per record batch) or
+    an Arrow IPC stream, in chunks of one record batch
+    """
+    schema = pyarrow.schema(
+        [(name, get_arrow_type(fields_types[name])) for name in fields]
+    )
+    sink = ChunksSink()
+    if export_format == 'parquet':
+        writer = pyarrow.parquet.ParquetWriter(
+            sink, schema, compression=settings.EXPORT_PARQUET_COMPRESSION
+        )
+    else:
+        writer = pyarrow.ipc.new_stream(sink, schema)
+
+    for record_batch in record_batches_generator(rows, fields, fields_types):
+        if export_format == 'parquet':
+            writer.write_table(pyarrow.Table.from_batches([record_batch]))
+        else:
+            writer.write_batch(record_batch)
+        yield sink.pop()
+    writer.close()
+    yield sink.pop()
+
+
+def columnar_content_generator(queryset, fields, export_format):
+    fields_types = get_fields_types(queryset.model, fields)
+    rows = queryset
+    if isinstance(rows, QuerySet):
+        rows = rows.iterator(chunk_size=settings.EXPORT_ROWS_CHUNK_SIZE)
+    return columnar_data_generator(rows, fields, fields_types, export_format)
+
+
+def columnar_streaming_response(
+    request, queryset, fields: Iterable[str], export_format: str
+):
+    response = StreamingHttpResponse(
+        columnar_content_generator(queryset, fields, export_format),
+        content_type=COLUMNAR_FORMATS[export_format]['content_type'],
+    )
+    response['Content-Disposition'] = 'attachment; filename="{}"'.format(
+        get_export_filename(
+            queryset.model.__name__,
+            extension=COLUMNAR_FORMATS[export_format]['extension'],
+        )
+    )
+    return response
@@ -1,38 +1,97 @@
 # coding: utf-8
+import csv
+import io
+import zlib
 from typing import Iterable, Dict
+from django.conf import settings
+from django.db.models.query import QuerySet
 from django.utils import timezone
 from django.http import StreamingHttpResponse
 
+#: Compressions of the exports, by value of the query param `c_compress`
+COMPRESSIONS = ('gzip',)
 
-def csv_data_generator(iterable: Iterable[Dict], fields: Iterable[str]):
+
+def csv_data_generator(
+    iterable: Iterable[Dict], fields: Iterable[str], chunk_size: int = None
+):
     """
-    Generator producing UTF-8 - quoted and semicolon separated CSV
+    Generator producing UTF-8 - quoted and semicolon separated CSV, in
+    chunks of about `chunk_size` bytes
     """
+    if chunk_size is None:
+        chunk_size = settings.EXPORT_CSV_CHUNK_SIZE
+    buffer = io.StringIO()
+    writer = csv.writer(
+        buffer, delimiter=';', quoting=csv.QUOTE_ALL, lineterminator='\n'
+    )
 
-    # Yields headers
-    yield '{}\n'.format(
-        ';'.join('"{}"'.format(field) for field in fields)
-    ).encode('utf-8')
-
-    # Yields rows
+    writer.writerow(fields)
     for item in iterable:
-        value = '{}\n'.format(
-            ';'.join(['"{}"'.format(item.get(field, '')) for field in fields])
-        ).encode('utf-8')
-        yield value
+        writer.writerow([item.get(field, '') for field in fields])
+        if buffer.tell() >= chunk_size:
+            yield buffer.getvalue().encode('utf-8')
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue().encode('utf-8')
+
+
+def gzip_generator(chunks: Iterable[bytes]):
+    """
+    Compress the chunks on the fly into a gzip file
+    """
+    compressor = zlib.compressobj(wbits=16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        compressed_chunk = compressor.compress(chunk)
+        if compressed_chunk:
+            yield compressed_chunk
+    yield compressor.flush()
+
+
+def get_export_filename(
+    model_name: str, compress: str = None, extension: str = 'csv'
+):
+    now = timezone.now()
+    filename = 'export_{}_{}.{}'.format(
+        model_name, now.strftime("%Y-%m-%d_%H-%M"), extension
+    )
+    if compress == 'gzip':
+        filename = '{}.gz'.format(filename)
+    return filename
+
+
+def csv_content_generator(
+    rows: Iterable[Dict], fields: Iterable[str], compress: str = None
+):
+    """
+    Chunks of the CSV file of the rows, compressed if requested. The rows of
+    a queryset are fetched by chunks from a server-side cursor instead of
+    loading the whole result at once
+    """
+    if isinstance(rows, QuerySet):
+        rows = rows.iterator(chunk_size=settings.EXPORT_ROWS_CHUNK_SIZE)
+    content = csv_data_generator(rows, fields)
+    if compress == 'gzip':
+        content = gzip_generator(content)
+    return content
 
 
 def csv_streaming_response(
-    request, queryset, fields: Iterable[str], filename: str = None
+    request,
+    queryset,
+    fields: Iterable[str],
+    filename: str = None,
+    compress: str = None,
 ):
     if filename is None:
-        now = timezone.now()
-        filename = 'export_{}_{}.csv'.format(
-            queryset.model.__name__, now.strftime("%Y-%m-%d_%H-%M")
-        )
+        filename = get_export_filename(queryset.model.__name__, compress)
+    elif compress == 'gzip':
+        filename = '{}.gz'.format(filename)
 
+    content_type = "application/gzip" if compress == 'gzip' else "text/csv"
     response = StreamingHttpResponse(
-        csv_data_generator(queryset, fields), content_type="text/csv"
+        csv_content_generator(queryset, fields, compress=compress),
+        content_type=content_type,
     )
     response['Content-Disposition'] = 'attachment; filename="{}"'.format(
         filename
@@ -0,0 +1,136 @@
+# coding: utf-8
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import uuid
+from collections import namedtuple
+from functools import lru_cache
+
+from concrete_datastore.parsers.fields import field_descriptors
+from concrete_datastore.parsers.models import Model_V1
+
+logger = logging.getLogger(__name__)
+
+#: Incremented when the structure of the compiled datamodel changes
+COMPILED_DATAMODEL_FORMAT = 1
+
+
+def get_datamodel_key(model_definitions, version=''):
+    """
+    Key of the compiled datamodel: a hash of the definitions, of the format
+    of the artifact and of `version`
+    """
+    content = json.dumps(model_definitions, sort_keys=True, default=str)
+    return hashlib.sha256(
+        '\n'.join((str(COMPILED_DATAMODEL_FORMAT), version, content)).encode(
+            'utf-8'
+        )
+    ).hexdigest()
+
+
+def get_artifact_path(cache_dir, key):
+    return os.path.join(cache_dir, 'datamodel-{}.json'.format(key))
+
+
+def compile_meta_models(meta_models):
+    """
+    Return the validated specifications of the meta models (datamodel
+    version 1.0.0) as plain data, written to the artifact as JSON
+    """
+    return [
+        {
+            **meta_model._specifier._asdict(),
+            'fields_spec': [
+                field_spec._asdict()
+                for field_spec in meta_model._specifier.fields_spec
+            ],
+        }
+        for meta_model in meta_models
+    ]
+
+
+@lru_cache(maxsize=None)
+def get_specifier_struct(keys):
+    #: The specifications with the same keys share their structure, as
+    #: creating a namedtuple class is the slowest part of the loading
+    return namedtuple('Specifier', keys)
+
+
+def make_specified_cls(spec, base):
+    def __init__(self, *args, **kwargs):
+        self._uid = uuid.uuid4()
+        super(self.__class__, self).__init__(*args, **kwargs)
+
+    def __hash__(self):
+        return self._uid.int
+
+    struct = get_specifier_struct(tuple(spec.keys()))
+    return type(
+        spec['name'],
+        (base,),
+        {
+            '_specifier': struct(**spec),
+            '__init__': __init__,
+            '__hash__': __hash__,
+        },
+    )
+
+
+def load_compiled_meta_models(compiled_meta_models):
+    """
+    Build the meta models from their compiled specifications, without
+    validating them again
+    """
+    meta_models = []
+    for model_spec in compiled_meta_models:
+        fields = []
+        for field_spec in model_spec['fields_spec']:
+            field_cls = make_specified_cls(
+                field_spec, base=field_descriptors[field_spec['type']]
+            )
+            fields.append(field_cls(name=field_spec['name']))
+        model_cls = make_specified_cls(
+            {
+                **model_spec,
+                'fields_spec': [field._specifier for field in fields],
+            },
+            base=Model_V1,
+        )
+        for field in fields:
+            setattr(model_cls, field.name, field)
+        meta_models.append(model_cls)
+    return meta_models
+
+
+def read_artifact(path):
+    """
+    Return the compiled meta models of the artifact, or None if it does
+    not exist or cannot be read
+    """
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+    except Exception:
+        logger.warning('Unable to read the compiled datamodel {}'.format(path))
+        return None
+
+
+def write_artifact(path, compiled_meta_models):
+    """
+    Write the artifact atomically, so that the processes starting at the
+    same time never read a partial file
+    """
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w') as f:
+            json.dump(compiled_meta_models, f)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
@@ -1,10 +1,22 @@
 # coding: utf-8
+import logging
+
 from concrete_datastore.parsers.models import Model_V1
+from concrete_datastore.parsers.compiled import (
+    compile_meta_models,
+    get_artifact_path,
+    get_datamodel_key,
+    load_compiled_meta_models,
+    read_artifact,
+    write_artifact,
+)
 from concrete_datastore.parsers.meta import (
     make_model_cls,
     make_modelisation_cls,
 )
 
+logger = logging.getLogger(__name__)
+
 
 def loads_models_v0(model_definitions):
     meta_models = []
@@ -15,20 +27,45 @@ def loads_models_v0(model_definitions):
     return meta_models
 
 
-def loads_models_v1(model_definitions):
+def loads_models_v1(model_definitions, cache_dir=None, cache_version=''):
+    """
+    Validate the datamodel and build its meta models. With a `cache_dir`,
+    the validated datamodel is compiled to an artifact keyed by the hash of
+    the definitions and `cache_version`, loaded by the next processes
+    without validating it again
+    """
+    if cache_dir is not None:
+        artifact_path = get_artifact_path(
+            cache_dir, get_datamodel_key(model_definitions, cache_version)
+        )
+        compiled_meta_models = read_artifact(artifact_path)
+        if compiled_meta_models is not None:
+            return load_compiled_meta_models(compiled_meta_models)
+
     try:
         modelisation = make_modelisation_cls(
             model_definitions, version='1.0.0', base=Model_V1
         )()
     except KeyError:
         raise KeyError('Invalid meta model definition')
-    return modelisation.get_meta_models()  # pylint: disable=no-member
+    meta_models = modelisation.get_meta_models()  # pylint: disable=no-member
+
+    if cache_dir is not None:
+        try:
+            write_artifact(artifact_path, compile_meta_models(meta_models))
+        except OSError:
+            logger.warning(
+                'Unable to write the compiled datamodel {}'.format(
+                    artifact_path
+                )
+            )
+    return meta_models
 
 
 data_models_version = {"0.0.0": loads_models_v0, "1.0.0": loads_models_v1}
 
 
-def loads_meta(model_definitions):
+def loads_meta(model_definitions, cache_dir=None, cache_version=''):
     if isinstance(model_definitions, (list, tuple)):
         return data_models_version["0.0.0"](model_definitions)
     try:
@@ -37,4 +74,10 @@ def loads_meta(model_definitions):
         raise KeyError('Invalid meta model definition')
 
     load_func = data_models_version[version]
+    if version == '1.0.0':
+        return load_func(
+            model_definitions,
+            cache_dir=cache_dir,
+            cache_version=cache_version,
+        )
     return load_func(model_definitions)
@@ -114,6 +114,16 @@ def make_model_cls(spec, base=Model):
     return model_cls
 
 
+def index_elements(elements, get_key):
+    """
+    Group the elements of the datamodel by key, keeping their order
+    """
+    index = defaultdict(list)
+    for element in elements:
+        index[get_key(element)].append(element)
+    return index
+
+
 def make_modelisation_cls(modelisation_spec, version, base=Model):
     spec = deepcopy(modelisation_spec)
 
@@ -130,6 +140,27 @@ def make_modelisation_cls(modelisation_spec, version, base=Model):
     relations = {"m2m": many_to_many_relations, "fk": one_to_many_relations}
     attrs = VERSIONS_ATTRIBUTES[version]
 
+    #:  The relations and the parameters are indexed once, instead of being
+    #:  searched in the whole datamodel for each field and each model
+    element_id = attrs['element_id']
+    relations_index = {
+        f_type: index_elements(
+            elements,
+            lambda x: (
+                x['source_field'],
+                x['source_model'][element_id],
+                x['target_model'][element_id],
+            ),
+        )
+        for f_type, elements in relations.items()
+    }
+    parameters_index = {
+        'permissions': index_elements(permissions, lambda x: x['model_uid']),
+        'ressource_queries': index_elements(
+            resource_queries, lambda x: x['model_uid']
+        ),
+    }
+
     def get_permissions(permission_dict, version):
         if version != '1.0.0':
             raise UnknownDatamodelVersionError()
@@ -172,13 +203,8 @@ def make_modelisation_cls(modelisation_spec, version, base=Model):
             rel_type = 'one_to_many_relations'
         elif f_type == 'm2m':
             rel_type = 'many_to_many_relations'
-        relation_elements = list(
-            filter(
-                lambda x: x['source_field'] == src_field
-                and x['source_model'][self.element_id] == src_model_uid
-                and x['target_model'][self.element_id] == target_model_uid,
-                relations[f_type],
-            )
+        relation_elements = relations_index[f_type].get(
+            (src_field, src_model_uid, target_model_uid), []
         )
         if len(relation_elements) == 0:
             raise MissingRelationForModel(
@@ -424,16 +450,21 @@ def make_modelisation_cls(modelisation_spec, version, base=Model):
             spec.update(
                 {'m_is_default_public': spec.get('is_default_public', False)}
             )
+            spec.update({'m_ingestion': spec.get('ingestion', False)})
 
     def get_parameter_for_model(
         self, model_spec, param_type, parameter_dict, default=None
     ):
-        model_parameter = list(
-            filter(
-                lambda x: x['model_uid'] == model_spec[self.element_id],
-                parameter_dict,
+        if param_type in parameters_index:
+            model_parameter = parameters_index[param_type].get(
+                model_spec[self.element_id], []
             )
-        )
+        else:
+            model_parameter = [
+                x
+                for x in parameter_dict
+                if x['model_uid'] == model_spec[self.element_id]
+            ]
         if len(model_parameter) == 0:
             if default is not None:
                 return default
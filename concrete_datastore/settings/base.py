@@ -56,6 +56,9 @@ AUTH_PASSWORD_VALIDATORS = [
     },
 ]
 DATAMODEL_VERSION = '0.0.0'
+# Directory of the compiled datamodel loaded by the processes at startup
+# (disabled if None)
+DATAMODEL_CACHE_DIR = os.environ.get('DATAMODEL_CACHE_DIR') or None
 
 ALLOW_MULTIPLE_AUTH_TOKEN_SESSION = True
 
@@ -340,6 +343,59 @@ API_MAX_PAGINATION_SIZE = 250
 API_MAX_PAGINATION_SIZE_NESTED = 125
 DEFAULT_PAGE_SIZE = 250
 
+#: Nodes of the digest tree (`<model>/digest/`) holding at most this number
+#: of instances return the instances instead of the 16 sub-buckets
+API_DIGEST_MAX_LEAF_SIZE = 256
+
+#: Log every create/update/delete and permission change of the datamodel
+#: instances in the append-only `ChangeLogEntry` table (one more INSERT per
+#: write), read by `<model>/changes/` and by the webhooks
+ENABLE_CHANGE_LOG = True
+#: The entries older than this number of days are deleted by the periodic
+#: task `cleanup_expired_change_log_entries` (0 to keep them forever)
+CHANGE_LOG_RETENTION_DAYS = 30
+#: Number of entries deleted per query by the purge of the change log
+CHANGE_LOG_PURGE_BATCH_SIZE = 10000
+#: Maximum number of change log entries read by `<model>/changes/`
+API_CHANGE_LOG_PAGE_SIZE = 1000
+
+#: Maximum number of creations, updates and deletions sent at once to
+#: `<model>/bulk/`
+API_BULK_MAX_ITEMS = 1000
+#: Number of rows written per query by the bulk operations
+API_BULK_BATCH_SIZE = 500
+
+#: CSV exports: number of rows fetched per query from the server-side
+#: cursor, and size in bytes of the chunks sent to the client
+EXPORT_ROWS_CHUNK_SIZE = 2000
+EXPORT_CSV_CHUNK_SIZE = 64 * 1024
+#: Compression of the Parquet exports `c_format=parquet` (requires the
+#: `columnar` extra): `snappy`, `gzip`, `zstd` or `none`
+EXPORT_PARQUET_COMPRESSION = 'snappy'
+#: Background exports `<model>/export/?c_async=true`: the files of the
+#: identical requests are reused during this delay, then removed
+EXPORT_JOBS_TTL_SECONDS = 3600
+
+#: Ingestion endpoint `<model>/ingest/` of the models flagged `ingestion`
+#: in the datamodel: maximum number of items created per query by the
+#: consumer, gathered from several pending batches
+INGESTION_MICRO_BATCH_MAX_ITEMS = 5000
+#: Above this number of pending items for a model, the ingestion endpoint
+#: answers `429` with a `Retry-After` header
+INGESTION_MAX_PENDING_ITEMS = 100000
+INGESTION_RETRY_AFTER_SECONDS = 5
+
+#: Imports `<model>/import/` and command `import_instances`: number of
+#: rows validated and inserted at once. With PostgreSQL, the rows are
+#: loaded with `COPY` into a staging table unless `IMPORT_USE_COPY` is
+#: disabled, otherwise they are created with `bulk_create`
+IMPORT_BATCH_SIZE = 5000
+IMPORT_USE_COPY = True
+
+#: Lock the row of the instance updated or deleted through the API
+#: (`SELECT ... FOR UPDATE`) until the end of the request
+API_LOCK_OBJECTS_ON_WRITE = False
+
 # DRF
 REST_FRAMEWORK = {
     'DEFAULT_SCHEMA_CLASS': 'concrete_datastore.interfaces.openapi_schema_generator.AutoSchema',
@@ -526,6 +582,10 @@ EMAIL_REPLY_TO = ''
 
 # Limit of different values before deactivating filter
 LIMIT_DEACTIVATE_FILTER_IN_ADMIN = 50
+# Duration of the cache of the filters shown in the admin
+ADMIN_LIST_FILTER_CACHE_SECONDS = 60 * 60
+# Number of rows above which the admin shows estimated counts
+ADMIN_LARGE_TABLE_ROWS_COUNT = 100000
 
 BROKER_URL = os.environ.get('BROKER_URL', 'redis://localhost:6379/0')
 PLUGIN_TASK_TIMEDELTA_SEC = int(
@@ -546,9 +606,76 @@ CELERYBEAT_SCHEDULE = {
         'task': 'concrete_datastore.concrete.automation.tasks.async_run_plugin_tasks',
         'schedule': timedelta(seconds=PLUGIN_TASK_TIMEDELTA_SEC),
         'options': {'queue': 'periodic'},
-    }
+    },
+    'dispatch_webhooks': {
+        'task': 'concrete_datastore.concrete.automation.tasks.dispatch_webhooks',
+        'schedule': timedelta(
+            seconds=int(os.environ.get('WEBHOOKS_DISPATCH_INTERVAL_SEC', 10))
+        ),
+        'options': {'queue': 'periodic'},
+    },
+    'process_pending_ingestion_batches': {
+        'task': 'concrete_datastore.concrete.automation.tasks.process_pending_ingestion_batches',
+        'schedule': timedelta(
+            seconds=int(os.environ.get('INGESTION_CHECK_INTERVAL_SEC', 60))
+        ),
+        'options': {'queue': 'periodic'},
+    },
+    'cleanup_expired_change_log_entries': {
+        'task': 'concrete_datastore.concrete.automation.tasks.cleanup_expired_change_log_entries',
+        'schedule': timedelta(
+            seconds=int(
+                os.environ.get('CHANGE_LOG_CLEANUP_INTERVAL_SEC', 3600)
+            )
+        ),
+        'options': {'queue': 'periodic'},
+    },
+    'cleanup_expired_export_jobs': {
+        'task': 'concrete_datastore.concrete.automation.tasks.cleanup_expired_export_jobs',
+        'schedule': timedelta(
+            seconds=int(
+                os.environ.get('EXPORT_JOBS_CLEANUP_INTERVAL_SEC', 600)
+            )
+        ),
+        'options': {'queue': 'periodic'},
+    },
 }
 
+#: Outbound webhooks: the deliveries are sent by the workers of the
+#: `webhooks` queue
+#: Maximum number of deliveries created for an endpoint at each dispatch
+WEBHOOKS_MAX_DELIVERIES_PER_COLLECT = 10
+WEBHOOKS_TIMEOUT_SECONDS = 10
+#: A failed delivery is retried after 1, 2, 4, 8… times this delay
+WEBHOOKS_RETRY_BASE_DELAY_SECONDS = 30
+#: After this number of attempts, a delivery is marked as `dead`
+WEBHOOKS_MAX_ATTEMPTS = 8
+#: A delivery `sending` for longer than this is considered lost and retried
+WEBHOOKS_SENDING_TIMEOUT_SECONDS = 300
+
+#: Remove the users from the user-tracked fields of the instances of the
+#: scopes they lose, and clean up the permissions of the blocked users, in
+#: tasks of the `users_cleanup` queue instead of within the request
+ASYNC_USER_TRACKED_FIELDS_CLEANUP = False
+
+#: Remove the files of the deleted instances in a task of the
+#: `files_cleanup` queue instead of within the request
+ASYNC_FILES_REMOVAL = False
+
+#: Create the items of the ingestion batches in tasks of the `ingestion`
+#: queue scheduled by the requests, instead of in the periodic task
+#: `process_pending_ingestion_batches`
+ASYNC_INGESTION = False
+
+#: Enable the background exports `<model>/export/?c_async=true`, whose
+#: files are written in tasks of the `exports` queue: requires Celery
+#: workers on this queue
+ASYNC_EXPORTS = False
+
+#: Enable the imports `<model>/import/`, whose files are imported in tasks
+#: of the `imports` queue: requires Celery workers on this queue
+ASYNC_IMPORTS = False
+
 USE_CONCRETE_ROLES = False
 USE_CORE_AUTOMATION = False
 # Example:
@@ -622,6 +749,12 @@ IGNORED_MODELS_ON_DELETE = [
     "AuthToken",
     "TemporaryToken",
     "SecureConnectToken",
+    "ChangeLogEntry",
+    "WebhookEndpoint",
+    "WebhookDelivery",
+    "IngestionBatch",
+    "ExportJob",
+    "ImportJob",
 ]
 ADMIN_URL_ENABLED = True
 ADMIN_ROOT_URI = "concrete-datastore-admin"
@@ -634,6 +767,12 @@ SMTP_MAILING_USE_ASYNC = False
 
 RETRY_ON_SENDING_SYNC_EMAILS = False
 
+#: Users provisioning (`users-provisioning/` and the `provision_users`
+#: command): maximum number of users per request, and number of invitation
+#: emails sent per task
+PROVISIONING_MAX_USERS = 10000
+PROVISIONING_EMAILS_BATCH_SIZE = 100
+
 ENABLE_SWAGGER_UI = True
 
 ENABLE_SERVE_DATAMODEL = True
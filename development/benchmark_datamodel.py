@@ -0,0 +1,95 @@
+# coding: utf-8
+"""
+Benchmark of the loading of a synthetic datamodel and of the lookups of
+its meta models, kept out of the test suite. From the root of the
+repository:
+
+    python -m development.benchmark_datamodel --models 180
+"""
+import argparse
+import os
+import tempfile
+import time
+
+#: The meta models registry reads the settings when it is imported
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'tests.unittest_settings')
+
+from concrete_datastore.concrete.meta import MetaModelRegistry  # noqa: E402
+from concrete_datastore.parsers.loaders import loads_meta  # noqa: E402
+from tests.datamodel_factory import make_datamodel  # noqa: E402
+
+
+def benchmark_startup(datamodel):
+    """
+    Time the validation of the datamodel, then its loading from the
+    compiled artifact written by the validation
+    """
+    with tempfile.TemporaryDirectory() as cache_dir:
+        start = time.perf_counter()
+        loads_meta(datamodel, cache_dir=cache_dir, cache_version='1')
+        validation_duration = time.perf_counter() - start
+
+        start = time.perf_counter()
+        loads_meta(datamodel, cache_dir=cache_dir, cache_version='1')
+        compiled_duration = time.perf_counter() - start
+
+    print(
+        'Validated in {:.3f}s, loaded from the artifact in {:.3f}s'.format(
+            validation_duration, compiled_duration
+        )
+    )
+
+
+def benchmark_lookups(datamodel):
+    """
+    Time the lookups of all the meta models by name, by scanning the list
+    of the meta models and with the index of the registry
+    """
+    meta_models = loads_meta(datamodel)
+    start = time.perf_counter()
+    models_registry = MetaModelRegistry(meta_models)
+    registry_duration = time.perf_counter() - start
+
+    model_names = [meta_model.get_model_name() for meta_model in meta_models]
+    start = time.perf_counter()
+    for model_name in model_names:
+        next(
+            meta_model
+            for meta_model in meta_models
+            if meta_model.get_model_name() == model_name
+        )
+    scan_duration = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for model_name in model_names:
+        models_registry.get(model_name)
+    indexed_duration = time.perf_counter() - start
+
+    print(
+        'Indexed in {:.3f}s, {} lookups in {:.4f}s (scan) / {:.4f}s '
+        '(index)'.format(
+            registry_duration,
+            len(model_names),
+            scan_duration,
+            indexed_duration,
+        )
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('.')[0])
+    parser.add_argument(
+        '--models',
+        type=int,
+        default=180,
+        help='Number of models of the synthetic datamodel',
+    )
+    args = parser.parse_args()
+
+    print('Datamodel of {} models'.format(args.models))
+    benchmark_startup(make_datamodel(args.models))
+    benchmark_lookups(make_datamodel(args.models))
+
+
+if __name__ == '__main__':
+    main()
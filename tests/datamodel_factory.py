@@ -0,0 +1,62 @@
+# coding: utf-8
+import uuid
+
+
+def make_datamodel(models_count):
+    """
+    Datamodel of `models_count` models, each one with a foreign key to the
+    previous one
+    """
+    models, relations, permissions = [], [], []
+    previous = None
+    for index in range(models_count):
+        model = {'name': 'Model{}'.format(index), 'uid': str(uuid.uuid4())}
+        fields = [
+            {
+                'name': 'name',
+                'datatype': 'char',
+                'attributes': {'max_length': 255},
+            }
+        ]
+        if previous is not None:
+            fields.append(
+                {
+                    'name': 'parent',
+                    'datatype': 'fk',
+                    'attributes': {'to': dict(previous)},
+                }
+            )
+            relations.append(
+                {
+                    'source_model': dict(model),
+                    'source_field': 'parent',
+                    'target_model': dict(previous),
+                }
+            )
+        permissions.append(
+            {
+                'model_uid': model['uid'],
+                'model_name': model['name'],
+                'minimum_levels': {
+                    'create': 'authenticated',
+                    'retrieve': 'authenticated',
+                    'update': 'authenticated',
+                    'delete': 'authenticated',
+                },
+                'lookups': [],
+            }
+        )
+        models.append({**model, 'fields': fields})
+        previous = model
+    return {
+        'manifest': {
+            'version': '1.0.0',
+            'data_modeling': {
+                'models': models,
+                'many_to_many_relations': [],
+                'one_to_many_relations': relations,
+                'permissions': permissions,
+                'resource_queries': [],
+            },
+        }
+    }
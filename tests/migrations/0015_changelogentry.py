@@ -0,0 +1,31 @@
+# Generated by Django 3.2.25 on 2026-10-19 09:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('concrete', '0014_auto_20230802_1517'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChangeLogEntry',
+            fields=[
+                ('sequence', models.BigAutoField(primary_key=True, serialize=False)),
+                ('model_name', models.CharField(max_length=255)),
+                ('uid', models.UUIDField(db_index=True)),
+                ('scope_uid', models.UUIDField(blank=True, db_index=True, null=True)),
+                ('operation', models.CharField(choices=[('create', 'Instance created'), ('update', 'Instance updated'), ('delete', 'Instance deleted'), ('permissions', 'Instance permissions updated')], max_length=20)),
+                ('creation_date', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'ordering': ('sequence',),
+            },
+        ),
+        migrations.AddIndex(
+            model_name='changelogentry',
+            index=models.Index(fields=['model_name', 'sequence'], name='concrete_chlog_model_seq_idx'),
+        ),
+    ]
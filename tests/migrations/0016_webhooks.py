@@ -0,0 +1,58 @@
+# Generated by Django 3.2.25 on 2026-10-19 10:05
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('concrete', '0015_changelogentry'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WebhookEndpoint',
+            fields=[
+                ('uid', models.UUIDField(default=uuid.uuid4, primary_key=True, serialize=False)),
+                ('name', models.CharField(max_length=255)),
+                ('url', models.URLField(max_length=1024)),
+                ('model_name', models.CharField(db_index=True, max_length=255)),
+                ('operations', models.JSONField(blank=True, default=list)),
+                ('secret', models.CharField(blank=True, default='', max_length=255)),
+                ('is_active', models.BooleanField(default=True)),
+                ('batch_size', models.PositiveIntegerField(default=100)),
+                ('max_concurrency', models.PositiveSmallIntegerField(default=1)),
+                ('last_sequence', models.BigIntegerField(default=0)),
+                ('modification_date', models.DateTimeField(auto_now=True)),
+                ('creation_date', models.DateTimeField(auto_now_add=True)),
+                ('created_by', models.ForeignKey(null=True, on_delete=django.db.models.deletion.PROTECT, related_name='owned_webhookendpoints', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Webhook endpoint',
+            },
+        ),
+        migrations.CreateModel(
+            name='WebhookDelivery',
+            fields=[
+                ('uid', models.UUIDField(default=uuid.uuid4, primary_key=True, serialize=False)),
+                ('first_sequence', models.BigIntegerField()),
+                ('last_sequence', models.BigIntegerField()),
+                ('payload', models.JSONField(default=dict)),
+                ('status', models.CharField(choices=[('pending', 'Waiting to be sent'), ('sending', 'Sending'), ('sent', 'Sent'), ('dead', 'Abandoned after too many attempts')], db_index=True, default='pending', max_length=20)),
+                ('attempts', models.PositiveIntegerField(default=0)),
+                ('next_attempt_date', models.DateTimeField(default=django.utils.timezone.now)),
+                ('last_error', models.TextField(blank=True, default='')),
+                ('modification_date', models.DateTimeField(auto_now=True)),
+                ('creation_date', models.DateTimeField(auto_now_add=True)),
+                ('endpoint', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='deliveries', to='concrete.webhookendpoint')),
+            ],
+            options={
+                'verbose_name': 'Webhook delivery',
+                'verbose_name_plural': 'Webhook deliveries',
+            },
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 3.2.25 on 2026-10-19 12:40
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('concrete', '0016_webhooks'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IngestionBatch',
+            fields=[
+                ('uid', models.UUIDField(default=uuid.uuid4, primary_key=True, serialize=False)),
+                ('model_name', models.CharField(max_length=255)),
+                ('items', models.JSONField(default=list)),
+                ('items_count', models.PositiveIntegerField(default=0)),
+                ('scope_uid', models.UUIDField(blank=True, null=True)),
+                ('status', models.CharField(choices=[('pending', 'Waiting to be processed'), ('done', 'Processed'), ('failed', 'Failed')], default='pending', max_length=20)),
+                ('created_count', models.PositiveIntegerField(default=0)),
+                ('errors', models.JSONField(blank=True, default=list)),
+                ('processing_date', models.DateTimeField(blank=True, null=True)),
+                ('modification_date', models.DateTimeField(auto_now=True)),
+                ('creation_date', models.DateTimeField(auto_now_add=True)),
+                ('created_by', models.ForeignKey(null=True, on_delete=django.db.models.deletion.PROTECT, related_name='owned_ingestionbatches', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Ingestion batch',
+                'verbose_name_plural': 'Ingestion batches',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='ingestionbatch',
+            index=models.Index(fields=['model_name', 'status'], name='ingestion_model_status_idx'),
+        ),
+    ]
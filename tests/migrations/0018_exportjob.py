@@ -0,0 +1,48 @@
+# Generated by Django 3.2.25 on 2026-10-19 14:05
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('concrete', '0017_ingestionbatch'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExportJob',
+            fields=[
+                ('uid', models.UUIDField(default=uuid.uuid4, primary_key=True, serialize=False)),
+                ('model_name', models.CharField(max_length=255)),
+                ('fingerprint', models.CharField(max_length=64)),
+                ('query_string', models.TextField(blank=True, default='')),
+                ('scope_uid', models.UUIDField(blank=True, null=True)),
+                ('compress', models.CharField(blank=True, default='', max_length=20)),
+                ('status', models.CharField(choices=[('pending', 'Waiting to be processed'), ('running', 'Running'), ('done', 'Ready to be downloaded'), ('failed', 'Failed')], default='pending', max_length=20)),
+                ('total_count', models.PositiveIntegerField(blank=True, null=True)),
+                ('exported_count', models.PositiveIntegerField(default=0)),
+                ('file', models.FileField(blank=True, null=True, upload_to='exports/')),
+                ('error', models.TextField(blank=True, default='')),
+                ('expiry_date', models.DateTimeField(blank=True, null=True)),
+                ('modification_date', models.DateTimeField(auto_now=True)),
+                ('creation_date', models.DateTimeField(auto_now_add=True)),
+                ('created_by', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='owned_exportjobs', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Export job',
+                'verbose_name_plural': 'Export jobs',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='exportjob',
+            index=models.Index(fields=['fingerprint', 'status'], name='export_job_fingerprint_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='exportjob',
+            constraint=models.UniqueConstraint(condition=models.Q(('status__in', ('pending', 'running'))), fields=('fingerprint',), name='export_job_active_fingerprint'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 3.2.25 on 2026-10-19 15:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('concrete', '0018_exportjob'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='exportjob',
+            name='export_format',
+            field=models.CharField(default='csv', max_length=20),
+        ),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 3.2.25 on 2026-10-19 16:10
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('concrete', '0019_exportjob_export_format'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImportJob',
+            fields=[
+                ('uid', models.UUIDField(default=uuid.uuid4, primary_key=True, serialize=False)),
+                ('model_name', models.CharField(max_length=255)),
+                ('file', models.FileField(upload_to='imports/')),
+                ('file_format', models.CharField(default='csv', max_length=20)),
+                ('scope_uid', models.UUIDField(blank=True, null=True)),
+                ('status', models.CharField(choices=[('pending', 'Waiting to be processed'), ('running', 'Running'), ('done', 'Processed'), ('failed', 'Failed')], default='pending', max_length=20)),
+                ('processed_count', models.PositiveIntegerField(default=0)),
+                ('created_count', models.PositiveIntegerField(default=0)),
+                ('rejected_count', models.PositiveIntegerField(default=0)),
+                ('rejected_file', models.FileField(blank=True, null=True, upload_to='imports/rejected/')),
+                ('error', models.TextField(blank=True, default='')),
+                ('processing_date', models.DateTimeField(blank=True, null=True)),
+                ('modification_date', models.DateTimeField(auto_now=True)),
+                ('creation_date', models.DateTimeField(auto_now_add=True)),
+                ('created_by', models.ForeignKey(null=True, on_delete=django.db.models.deletion.PROTECT, related_name='owned_importjobs', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Import job',
+                'verbose_name_plural': 'Import jobs',
+            },
+        ),
+    ]
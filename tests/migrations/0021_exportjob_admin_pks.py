@@ -0,0 +1,17 @@
+# Generated by Django 3.2.25 on 2026-10-19 18:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ('concrete', '0020_importjob'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='exportjob',
+            name='admin_pks',
+            field=models.JSONField(blank=True, null=True),
+        ),
+    ]
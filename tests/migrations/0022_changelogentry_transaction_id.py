@@ -0,0 +1,25 @@
+# Generated by Django 3.2.25 on 2026-10-19 20:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ('concrete', '0021_exportjob_admin_pks'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='changelogentry',
+            name='transaction_id',
+            field=models.BigIntegerField(default=0),
+            preserve_default=False,
+        ),
+        migrations.AddIndex(
+            model_name='changelogentry',
+            index=models.Index(
+                fields=['model_name', 'transaction_id', 'sequence'],
+                name='concrete_chlog_model_txid_idx',
+            ),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 3.2.25 on 2026-10-19 20:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ('concrete', '0022_changelogentry_transaction_id'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='webhookendpoint',
+            name='last_transaction_id',
+            field=models.BigIntegerField(default=0),
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 3.2.25 on 2026-10-19 21:10
+
+import concrete_datastore.concrete.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ('concrete', '0023_webhookendpoint_last_transaction_id'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='exportjob',
+            name='file',
+            field=models.FileField(
+                blank=True,
+                null=True,
+                upload_to=concrete_datastore.concrete.models.get_export_job_file_path,
+            ),
+        ),
+    ]
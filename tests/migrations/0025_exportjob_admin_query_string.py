@@ -0,0 +1,17 @@
+# Generated by Django 3.2.25 on 2026-10-19 21:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ('concrete', '0024_alter_exportjob_file'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='exportjob',
+            name='admin_query_string',
+            field=models.TextField(blank=True, null=True),
+        ),
+    ]
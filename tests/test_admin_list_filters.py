@@ -0,0 +1,34 @@
+# coding: utf-8
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from concrete_datastore.admin.list_filters import get_filterable_fields
+from concrete_datastore.concrete.models import UniqueTogetherModel
+
+
+@override_settings(
+    LIMIT_DEACTIVATE_FILTER_IN_ADMIN=2, ADMIN_LIST_FILTER_CACHE_SECONDS=60
+)
+class AdminListFiltersTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        for name in ('A', 'B', 'C'):
+            UniqueTogetherModel.objects.create(name=name, field1='1')
+
+    def tearDown(self):
+        cache.clear()
+
+    def test_filterable_fields(self):
+        self.assertEqual(
+            get_filterable_fields(UniqueTogetherModel, ['field1', 'name']),
+            ['field1'],
+        )
+
+    def test_filterable_fields_cached(self):
+        get_filterable_fields(UniqueTogetherModel, ['field1', 'name'])
+        UniqueTogetherModel.objects.create(name='D', field1='2')
+        with self.assertNumQueries(0):
+            self.assertEqual(
+                get_filterable_fields(UniqueTogetherModel, ['field1', 'name']),
+                ['field1'],
+            )
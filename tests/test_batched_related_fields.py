@@ -0,0 +1,77 @@
+# coding: utf-8
+import uuid
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from concrete_datastore.concrete.models import User
+from concrete_datastore.concrete.meta import get_meta_definition_by_model_name
+from concrete_datastore.api.v1.serializers import make_serializer_class
+from concrete_datastore.api.v1.fields import (
+    RELATED_INSTANCES_CACHE_KEY,
+    prefetch_related_instances,
+)
+
+
+class BatchedRelatedFieldTestCase(TestCase):
+    def setUp(self):
+        self.serializer_class = make_serializer_class(
+            meta_model=get_meta_definition_by_model_name('Project'),
+            nested=False,
+        )
+        self.users = [
+            User.objects.create_user('user{}@netsach.org'.format(i))
+            for i in range(20)
+        ]
+
+    def count_user_queries(self, queries):
+        return len(
+            [
+                query
+                for query in queries
+                if 'FROM "concrete_user"' in query['sql']
+            ]
+        )
+
+    def test_many_uids_resolved_with_one_query(self):
+        serializer = self.serializer_class(
+            data={
+                'name': 'project',
+                'members_uid': [str(user.uid) for user in self.users],
+            }
+        )
+        with CaptureQueriesContext(connection) as context:
+            self.assertTrue(serializer.is_valid(), serializer.errors)
+        self.assertEqual(self.count_user_queries(context.captured_queries), 1)
+        self.assertEqual(serializer.validated_data['members'], self.users)
+
+    def test_missing_uids_reported_together(self):
+        missing_uids = [str(uuid.uuid4()), str(uuid.uuid4())]
+        serializer = self.serializer_class(
+            data={
+                'name': 'project',
+                'members_uid': [str(self.users[0].uid)]
+                + missing_uids
+                + ['wrong'],
+            }
+        )
+        self.assertFalse(serializer.is_valid())
+        self.assertEqual(len(serializer.errors['members_uid']), 3)
+
+    def test_cache_shared_between_serializers(self):
+        context = {RELATED_INSTANCES_CACHE_KEY: {}}
+        items = [
+            {'name': 'project 1', 'members_uid': [str(self.users[0].uid)]},
+            {'name': 'project 2', 'members_uid': [str(self.users[1].uid)]},
+        ]
+        with CaptureQueriesContext(connection) as context_queries:
+            prefetch_related_instances(
+                self.serializer_class(context=context), items
+            )
+            for item in items:
+                serializer = self.serializer_class(data=item, context=context)
+                self.assertTrue(serializer.is_valid(), serializer.errors)
+        self.assertEqual(
+            self.count_user_queries(context_queries.captured_queries), 1
+        )
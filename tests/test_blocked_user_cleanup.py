@@ -0,0 +1,78 @@
+# coding: utf-8
+from mock import patch
+from django.test import TestCase, override_settings
+
+from concrete_datastore.concrete.models import (
+    User,
+    DefaultDivider,
+    Category,
+    Group,
+)
+from concrete_datastore.concrete.user_tracked_fields import (
+    cleanup_blocked_user,
+)
+
+
+class BlockedUserCleanupTestCase(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('simpleuser@netsach.org')
+        self.user.set_level('simpleuser', commit=True)
+        self.divider = DefaultDivider.objects.create(name='Divider1')
+        self.user.defaultdividers.add(self.divider)
+        self.category = Category.objects.create(
+            name='Category1', defaultdivider=self.divider
+        )
+        self.category.can_view_users.add(self.user)
+        self.group = Group.objects.create(name='G1')
+        self.group.members.add(self.user)
+
+    def test_cleanup_on_blocking(self):
+        user = User.objects.get(pk=self.user.pk)
+        user.set_level('blocked', commit=True)
+
+        self.assertFalse(User.objects.get(pk=self.user.pk).is_active)
+        self.assertEqual(user.defaultdividers.count(), 0)
+        self.assertEqual(user.viewable_categorys.count(), 0)
+        self.assertEqual(user.concrete_groups.count(), 0)
+
+    def test_cleanup_only_on_transition(self):
+        with patch(
+            'concrete_datastore.concrete.levels.cleanup_blocked_user'
+        ) as cleanup_mock:
+            user = User.objects.get(pk=self.user.pk)
+            user.first_name = 'John'
+            user.save()
+            cleanup_mock.assert_not_called()
+
+            user.set_level('blocked', commit=True)
+            user.last_name = 'Doe'
+            user.save()
+            User.objects.get(pk=self.user.pk).save()
+            cleanup_mock.assert_called_once_with(self.user.pk)
+
+    @override_settings(ASYNC_USER_TRACKED_FIELDS_CLEANUP=True)
+    def test_async_cleanup(self):
+        with patch(
+            'concrete_datastore.concrete.levels.async_cleanup_blocked_user'
+        ) as task_mock:
+            with self.captureOnCommitCallbacks(execute=True):
+                user = User.objects.get(pk=self.user.pk)
+                user.set_level('blocked', commit=True)
+                #: Access is cut before the cleanup
+                self.assertFalse(User.objects.get(pk=self.user.pk).is_active)
+                task_mock.apply_async.assert_not_called()
+            task_mock.apply_async.assert_called_once_with(
+                queue='users_cleanup', kwargs={'user_pk': str(self.user.pk)}
+            )
+        self.assertEqual(self.user.concrete_groups.count(), 1)
+
+        #: The task is idempotent, and does nothing for unblocked users
+        cleanup_blocked_user(self.user.pk)
+        cleanup_blocked_user(self.user.pk)
+        self.assertEqual(self.user.concrete_groups.count(), 0)
+        self.assertEqual(self.user.defaultdividers.count(), 0)
+
+        self.group.members.add(self.user)
+        User.objects.get(pk=self.user.pk).set_level('simpleuser', commit=True)
+        cleanup_blocked_user(self.user.pk)
+        self.assertEqual(self.user.concrete_groups.count(), 1)
@@ -0,0 +1,99 @@
+# coding: utf-8
+import io
+import uuid
+import unittest
+from decimal import Decimal
+
+from django.test import TestCase, SimpleTestCase, override_settings
+
+from concrete_datastore.concrete.models import User, UserConfirmation
+from concrete_datastore.interfaces.columnar import (
+    columnar_data_generator,
+    is_columnar_export_available,
+    pyarrow,
+)
+
+FIELDS_TYPES = {'name': 'char', 'count': 'int', 'price': 'float', 'fk': 'fk'}
+
+
+@unittest.skipUnless(is_columnar_export_available(), 'pyarrow is required')
+class ColumnarDataGeneratorTestCase(SimpleTestCase):
+    def setUp(self):
+        self.fk = uuid.uuid4()
+        self.rows = [
+            {'name': 'A', 'count': 1, 'price': Decimal('1.5'), 'fk': self.fk},
+            {'name': None, 'count': None, 'price': None, 'fk': None},
+            {'name': 'C', 'count': 3, 'price': 2.0, 'fk': None},
+        ]
+
+    @override_settings(EXPORT_ROWS_CHUNK_SIZE=2)
+    def test_parquet(self):
+        import pyarrow.parquet
+
+        content = b''.join(
+            columnar_data_generator(
+                self.rows, list(FIELDS_TYPES), FIELDS_TYPES, 'parquet'
+            )
+        )
+        parquet_file = pyarrow.parquet.ParquetFile(io.BytesIO(content))
+        #: One row group per chunk of rows
+        self.assertEqual(parquet_file.num_row_groups, 2)
+        table = parquet_file.read()
+        self.assertEqual(table.schema.field('count').type, pyarrow.int64())
+        self.assertEqual(table.schema.field('price').type, pyarrow.float64())
+        self.assertEqual(
+            table.to_pylist()[0],
+            {'name': 'A', 'count': 1, 'price': 1.5, 'fk': str(self.fk)},
+        )
+        self.assertIsNone(table.to_pylist()[1]['count'])
+
+    def test_arrow(self):
+        content = b''.join(
+            columnar_data_generator(
+                self.rows, list(FIELDS_TYPES), FIELDS_TYPES, 'arrow'
+            )
+        )
+        table = pyarrow.ipc.open_stream(content).read_all()
+        self.assertEqual(table.num_rows, 3)
+        self.assertEqual(table.column('name').to_pylist(), ['A', None, 'C'])
+
+
+@override_settings(DEBUG=True)
+class ColumnarExportTestCase(TestCase):
+    def setUp(self):
+        user = User.objects.create_user('admin@netsach.org')
+        user.set_password('plop')
+        user.set_level('superuser', commit=True)
+        UserConfirmation.objects.create(user=user, confirmed=True)
+        resp = self.client.post(
+            '/api/v1.1/auth/login/',
+            {"email": "admin@netsach.org", "password": "plop"},
+        )
+        self.token = resp.data['token']
+
+    def get(self, url):
+        return self.client.get(
+            url, HTTP_AUTHORIZATION='Token {}'.format(self.token)
+        )
+
+    @unittest.skipUnless(is_columnar_export_available(), 'pyarrow required')
+    def test_parquet_export(self):
+        import pyarrow.parquet
+
+        resp = self.get('/api/v1.1/user/export/?c_format=parquet')
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp['Content-Type'], 'application/parquet')
+        table = pyarrow.parquet.read_table(
+            io.BytesIO(b''.join(resp.streaming_content))
+        )
+        self.assertEqual(
+            table.column('email').to_pylist(), ['admin@netsach.org']
+        )
+
+    def test_invalid_format(self):
+        resp = self.get('/api/v1.1/user/export/?c_format=xlsx')
+        self.assertEqual(resp.status_code, 400)
+        resp = self.get(
+            '/api/v1.1/user/export/?c_format=arrow&c_compress=gzip'
+        )
+        self.assertEqual(resp.status_code, 400)
@@ -0,0 +1,83 @@
+# coding: utf-8
+import tempfile
+
+from django.test import SimpleTestCase
+from mock import patch
+
+from concrete_datastore.api.v1.views import UniqueTogetherModelModelViewSet
+from concrete_datastore.parsers.compiled import get_datamodel_key
+from concrete_datastore.parsers.loaders import loads_meta
+from concrete_datastore.settings.utils import load_datamodel
+from tests.datamodel_factory import make_datamodel
+
+
+class CompiledDatamodelTestCase(SimpleTestCase):
+    def setUp(self):
+        self.cache_dir = tempfile.TemporaryDirectory()
+        self.datamodel = load_datamodel(
+            'tests/datamodel/unittest-datamodel.yaml'
+        )
+
+    def tearDown(self):
+        self.cache_dir.cleanup()
+
+    def test_load_compiled_datamodel(self):
+        meta_models = loads_meta(
+            self.datamodel, cache_dir=self.cache_dir.name, cache_version='1'
+        )
+        with patch(
+            'concrete_datastore.parsers.loaders.make_modelisation_cls'
+        ) as mocked_make_modelisation_cls:
+            compiled_meta_models = loads_meta(
+                self.datamodel,
+                cache_dir=self.cache_dir.name,
+                cache_version='1',
+            )
+        mocked_make_modelisation_cls.assert_not_called()
+        self.assertEqual(
+            [meta_model._specifier for meta_model in meta_models],
+            [meta_model._specifier for meta_model in compiled_meta_models],
+        )
+        for meta_model, compiled_meta_model in zip(
+            meta_models, compiled_meta_models
+        ):
+            self.assertEqual(
+                [name for name, _ in meta_model.get_fields()],
+                [name for name, _ in compiled_meta_model.get_fields()],
+            )
+            self.assertEqual(
+                meta_model.get_property('m_filter_fields'),
+                compiled_meta_model.get_property('m_filter_fields'),
+            )
+
+    def test_datamodel_key(self):
+        self.assertNotEqual(
+            get_datamodel_key(self.datamodel, '1'),
+            get_datamodel_key(self.datamodel, '2'),
+        )
+
+    def test_load_compiled_synthetic_datamodel(self):
+        datamodel = make_datamodel(50)
+        meta_models = loads_meta(
+            datamodel, cache_dir=self.cache_dir.name, cache_version='1'
+        )
+        with patch(
+            'concrete_datastore.parsers.loaders.make_modelisation_cls'
+        ) as mocked_make_modelisation_cls:
+            compiled_meta_models = loads_meta(
+                datamodel, cache_dir=self.cache_dir.name, cache_version='1'
+            )
+        mocked_make_modelisation_cls.assert_not_called()
+        self.assertEqual(
+            [meta_model._specifier for meta_model in meta_models],
+            [meta_model._specifier for meta_model in compiled_meta_models],
+        )
+
+    def test_lazy_serializer_class(self):
+        serializer_class = UniqueTogetherModelModelViewSet.serializer_class
+        self.assertIs(
+            UniqueTogetherModelModelViewSet.serializer_class, serializer_class
+        )
+        self.assertEqual(
+            serializer_class.Meta.model.__name__, 'UniqueTogetherModel'
+        )
@@ -0,0 +1,78 @@
+# coding: utf-8
+import csv
+import gzip
+import io
+
+from django.test import TestCase, SimpleTestCase, override_settings
+
+from concrete_datastore.concrete.models import User, UserConfirmation
+from concrete_datastore.interfaces.csv import (
+    csv_data_generator,
+    gzip_generator,
+)
+
+
+class CsvDataGeneratorTestCase(SimpleTestCase):
+    def test_escaping(self):
+        rows = [
+            {'name': 'He said "hi"; then left', 'code': 'a\nb'},
+            {'name': None},
+        ]
+        content = b''.join(csv_data_generator(rows, ['name', 'code']))
+        self.assertTrue(content.startswith(b'"name";"code"\n'))
+        self.assertEqual(
+            list(
+                csv.reader(io.StringIO(content.decode('utf-8')), delimiter=';')
+            ),
+            [
+                ['name', 'code'],
+                ['He said "hi"; then left', 'a\nb'],
+                ['', ''],
+            ],
+        )
+
+    def test_chunks(self):
+        rows = [{'name': 'x' * 10} for _ in range(100)]
+        chunks = list(csv_data_generator(rows, ['name'], chunk_size=100))
+        #: The rows are gathered in chunks instead of one bytes per row
+        self.assertLess(len(chunks), 30)
+        self.assertTrue(all(len(chunk) < 120 for chunk in chunks))
+        self.assertEqual(b''.join(chunks).count(b'\n'), 101)
+
+    def test_gzip(self):
+        rows = [{'name': 'Name{}'.format(i)} for i in range(1000)]
+        content = b''.join(csv_data_generator(rows, ['name']))
+        compressed = b''.join(
+            gzip_generator(csv_data_generator(rows, ['name']))
+        )
+        self.assertEqual(gzip.decompress(compressed), content)
+
+
+@override_settings(DEBUG=True)
+class CsvExportTestCase(TestCase):
+    def setUp(self):
+        user = User.objects.create_user('admin@netsach.org')
+        user.set_password('plop')
+        user.set_level('superuser', commit=True)
+        UserConfirmation.objects.create(user=user, confirmed=True)
+        resp = self.client.post(
+            '/api/v1.1/auth/login/',
+            {"email": "admin@netsach.org", "password": "plop"},
+        )
+        self.token = resp.data['token']
+
+    def test_gzip_export(self):
+        resp = self.client.get(
+            '/api/v1.1/user/export/?c_compress=gzip',
+            HTTP_AUTHORIZATION='Token {}'.format(self.token),
+        )
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp['Content-Type'], 'application/gzip')
+        content = gzip.decompress(b''.join(resp.streaming_content))
+        self.assertIn(b'"admin@netsach.org"', content)
+
+        resp = self.client.get(
+            '/api/v1.1/user/export/?c_compress=zip',
+            HTTP_AUTHORIZATION='Token {}'.format(self.token),
+        )
+        self.assertEqual(resp.status_code, 400)
@@ -0,0 +1,84 @@
+# coding: utf-8
+import copy
+
+from django.test import SimpleTestCase
+from mock import patch
+
+from concrete_datastore.concrete.meta import (
+    get_meta_definition_by_model_name,
+    get_model_metadata,
+    registry,
+)
+from concrete_datastore.parsers.loaders import loads_meta
+from concrete_datastore.settings.utils import load_datamodel
+from tests.datamodel_factory import make_datamodel
+
+
+class ScanIndex:
+    """
+    Lookups of the parser without index: the matching elements are searched
+    in the whole datamodel
+    """
+
+    def __init__(self, elements, get_key):
+        self.elements = elements
+        self.get_key = get_key
+
+    def get(self, key, default=None):
+        matching_elements = [
+            element
+            for element in self.elements
+            if self.get_key(element) == key
+        ]
+        return matching_elements or default
+
+
+class MetaModelRegistryTestCase(SimpleTestCase):
+    def test_lookups(self):
+        meta_model = get_meta_definition_by_model_name('ExpectedSkill')
+        self.assertEqual(meta_model.get_model_name(), 'ExpectedSkill')
+        self.assertIs(
+            registry.get_by_dashed_name('expected-skill'), meta_model
+        )
+        with self.assertRaises(AttributeError):
+            get_meta_definition_by_model_name('UnknownModel')
+        with self.assertRaises(AttributeError):
+            get_model_metadata('UnknownModel')
+
+    def test_model_metadata(self):
+        metadata = get_model_metadata('Project')
+        self.assertEqual(metadata.dashed_name, 'project')
+        self.assertEqual(metadata.file_fields, ['picture'])
+        self.assertEqual(metadata.fk_fields, [])
+        self.assertEqual(metadata.m2m_fields, ['members', 'expected_skills'])
+        self.assertEqual(metadata.get_field_type('archived'), 'bool')
+        self.assertEqual(metadata.get_field_type('picture'), 'file')
+        self.assertEqual(metadata.get_field_type('unknown'), 'Unknow type')
+
+        metadata = get_model_metadata('Skill')
+        self.assertEqual(metadata.fk_fields, ['category', 'user'])
+        self.assertEqual(metadata.relation_fields, ['category', 'user'])
+        self.assertEqual(
+            metadata.field_names,
+            ['name', 'category', 'score', 'description', 'user'],
+        )
+
+    def test_indexed_parser(self):
+        """
+        The datamodel parsed with the indexes of the relations and of the
+        parameters gives the same specifiers as with a scan of the whole
+        datamodel for each lookup
+        """
+        for datamodel in (
+            load_datamodel('tests/datamodel/unittest-datamodel.yaml'),
+            make_datamodel(50),
+        ):
+            meta_models = loads_meta(copy.deepcopy(datamodel))
+            with patch(
+                'concrete_datastore.parsers.meta.index_elements', ScanIndex
+            ):
+                scanned_meta_models = loads_meta(copy.deepcopy(datamodel))
+            self.assertEqual(
+                [meta_model._specifier for meta_model in meta_models],
+                [meta_model._specifier for meta_model in scanned_meta_models],
+            )
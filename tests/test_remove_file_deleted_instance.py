@@ -4,6 +4,7 @@ import os
 from mock import patch
 from django.test import TestCase
 from concrete_datastore.concrete.models import Project, DeletedModel
+from concrete_datastore.concrete.deletion import collect_deletions
 from django.test import override_settings
 
 
@@ -17,7 +18,10 @@ class FileFieldDeleteTestCase(TestCase):
         project_picture_path = project.picture.path
         self.assertTrue(os.path.exists(project_picture_path))
         self.assertEqual(DeletedModel.objects.count(), 0)
-        project.delete()
+        with self.captureOnCommitCallbacks(execute=True):
+            project.delete()
+            #: The file is removed once the transaction is committed
+            self.assertTrue(os.path.exists(project_picture_path))
         self.assertFalse(os.path.exists(project_picture_path))
         self.assertEqual(DeletedModel.objects.count(), 1)
 
@@ -35,7 +39,8 @@ class FileFieldDeleteTestCase(TestCase):
         project_picture_path = project.picture.path
         os.remove(project_picture_path)
         self.assertEqual(DeletedModel.objects.count(), 0)
-        project.delete()
+        with self.captureOnCommitCallbacks(execute=True):
+            project.delete()
         self.assertEqual(DeletedModel.objects.count(), 1)
 
     def test_file_removed_file_delete_error(self):
@@ -43,7 +48,7 @@ class FileFieldDeleteTestCase(TestCase):
             raise ValueError
 
         patch(
-            'concrete_datastore.concrete.automation.signal_processor.os.remove',
+            'concrete_datastore.concrete.automation.tasks.os.remove',
             new=fake_remove,
         ).start()
         project_picture = io.BytesIO()
@@ -51,6 +56,25 @@ class FileFieldDeleteTestCase(TestCase):
         project = Project.objects.create(name='project test')
         project.picture.save('picture.jpg', project_picture)
         self.assertEqual(DeletedModel.objects.count(), 0)
-        project.delete()
+        with self.captureOnCommitCallbacks(execute=True):
+            project.delete()
         self.assertEqual(DeletedModel.objects.count(), 1)
         patch.stopall()
+
+    @override_settings(ASYNC_FILES_REMOVAL=True)
+    def test_files_removed_async_with_cascades(self):
+        project_picture = io.BytesIO()
+        project_picture.write(b'fake image data')
+        project = Project.objects.create(name='project test')
+        project.picture.save('picture.jpg', project_picture)
+        with patch(
+            'concrete_datastore.concrete.deletion.async_remove_files'
+        ) as task_mock:
+            with self.captureOnCommitCallbacks(execute=True):
+                with collect_deletions():
+                    Project.objects.filter(pk=project.pk).delete()
+            task_mock.apply_async.assert_called_once_with(
+                queue='files_cleanup',
+                kwargs={'paths': [project.picture.path]},
+            )
+        self.assertEqual(DeletedModel.objects.count(), 1)
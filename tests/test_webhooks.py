@@ -0,0 +1,135 @@
+# coding: utf-8
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+from django.test import TestCase, override_settings
+
+from concrete_datastore.concrete.models import (
+    Project,
+    WebhookEndpoint,
+    WebhookDelivery,
+)
+from concrete_datastore.concrete.automation.webhooks import (
+    claim_deliveries,
+    collect_endpoint_events,
+    send_delivery,
+)
+
+
+class WebhookStandIn:
+    """
+    Local HTTP server recording the requests it receives and answering
+    with `status_code`
+    """
+
+    def __init__(self):
+        self.requests = []
+        self.status_code = 200
+        stand_in = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                length = int(self.headers['Content-Length'])
+                stand_in.requests.append(
+                    (dict(self.headers), json.loads(self.rfile.read(length)))
+                )
+                self.send_response(stand_in.status_code)
+                self.end_headers()
+
+            def log_message(self, *args):
+                pass
+
+        self.server = HTTPServer(('127.0.0.1', 0), Handler)
+        self.url = 'http://127.0.0.1:{}/hook'.format(self.server.server_port)
+        self.thread = threading.Thread(target=self.server.serve_forever)
+        self.thread.daemon = True
+        self.thread.start()
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@override_settings(
+    WEBHOOKS_MAX_ATTEMPTS=2, WEBHOOKS_RETRY_BASE_DELAY_SECONDS=0
+)
+class TestWebhooks(TestCase):
+    def setUp(self):
+        self.stand_in = WebhookStandIn()
+        self.endpoint = WebhookEndpoint.objects.create(
+            name='erp',
+            url=self.stand_in.url,
+            model_name='Project',
+            operations=['create', 'update'],
+            secret='secret',
+            batch_size=2,
+            max_concurrency=1,
+        )
+
+    def tearDown(self):
+        self.stand_in.stop()
+
+    def send_all(self):
+        for delivery_pk in claim_deliveries(self.endpoint):
+            send_delivery(WebhookDelivery.objects.get(pk=delivery_pk))
+
+    def test_events_are_batched_and_sent(self):
+        project_1 = Project.objects.create(name='project 1')
+        project_1.name = 'project 1 updated'
+        project_1.save()
+        project_2 = Project.objects.create(name='project 2')
+        project_2.delete()
+
+        #: 3 matching entries (the delete is filtered out): 2 deliveries
+        self.assertEqual(collect_endpoint_events(self.endpoint.pk), 2)
+        self.assertEqual(collect_endpoint_events(self.endpoint.pk), 0)
+        first_delivery = WebhookDelivery.objects.order_by(
+            'creation_date'
+        ).first()
+        #: The two changes of project 1 are coalesced
+        self.assertEqual(
+            first_delivery.payload['events'],
+            [
+                {
+                    'sequence': first_delivery.last_sequence,
+                    'uid': str(project_1.uid),
+                    'scope_uid': None,
+                    'operation': 'update',
+                }
+            ],
+        )
+
+        #: Only one delivery at a time for this endpoint
+        self.send_all()
+        self.assertEqual(len(self.stand_in.requests), 1)
+        self.send_all()
+        self.assertEqual(len(self.stand_in.requests), 2)
+        self.assertEqual(
+            WebhookDelivery.objects.filter(status='sent').count(), 2
+        )
+
+        headers, body = self.stand_in.requests[1]
+        self.assertIn('X-Concrete-Signature', headers)
+        self.assertEqual(body['model_name'], 'Project')
+        self.assertEqual(body['events'][0]['uid'], str(project_2.uid))
+
+    def test_failed_delivery_is_retried_then_dead(self):
+        Project.objects.create(name='project 1')
+        collect_endpoint_events(self.endpoint.pk)
+        self.stand_in.status_code = 500
+
+        self.send_all()
+        delivery = WebhookDelivery.objects.get()
+        self.assertEqual(delivery.status, 'pending')
+        self.assertEqual(delivery.attempts, 1)
+
+        self.send_all()
+        delivery.refresh_from_db()
+        self.assertEqual(delivery.status, 'dead')
+        self.assertEqual(delivery.attempts, 2)
+        self.assertEqual(len(self.stand_in.requests), 2)
+
+        #: Dead deliveries are not sent anymore
+        self.send_all()
+        self.assertEqual(len(self.stand_in.requests), 2)
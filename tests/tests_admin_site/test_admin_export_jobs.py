@@ -0,0 +1,127 @@
+# coding: utf-8
+import gzip
+import shutil
+import tempfile
+
+from django.test import TestCase, override_settings
+from mock import patch
+
+from concrete_datastore.concrete.exports import run_export_job
+from concrete_datastore.concrete.models import (
+    ExportJob,
+    UniqueTogetherModel,
+    User,
+)
+
+
+class AdminExportJobTestCase(TestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        self.settings_override.enable()
+        self.user = User.objects.create_superuser('admin@netsach.org', 'plop')
+        self.client.force_login(self.user)
+        self.instances = [
+            UniqueTogetherModel.objects.create(name=name, field1='1')
+            for name in ('A', 'B', 'C')
+        ]
+        self.url = '/concrete-datastore-admin/concrete/uniquetogethermodel/'
+
+    def tearDown(self):
+        self.settings_override.disable()
+        shutil.rmtree(self.media_root, ignore_errors=True)
+
+    @override_settings(ASYNC_EXPORTS=True)
+    @patch('concrete_datastore.api.v1.views.async_run_export_job.apply_async')
+    def test_export_csv_action(self, mock_apply_async):
+        with self.captureOnCommitCallbacks(execute=True):
+            resp = self.client.post(
+                self.url,
+                {
+                    'action': 'export_csv',
+                    '_selected_action': [
+                        str(instance.pk) for instance in self.instances[:2]
+                    ],
+                },
+            )
+        job = ExportJob.objects.get()
+        self.assertRedirects(
+            resp,
+            '{}export-job/{}/'.format(self.url, job.pk),
+            fetch_redirect_response=False,
+        )
+        mock_apply_async.assert_called_once_with(
+            queue='exports', kwargs={'job_pk': str(job.pk)}
+        )
+        self.assertEqual(
+            job.admin_pks,
+            sorted(str(instance.pk) for instance in self.instances[:2]),
+        )
+        self.assertIsNone(job.admin_query_string)
+        self.assertEqual(job.status, ExportJob.STATUS_PENDING)
+
+        run_export_job(job.pk)
+        job.refresh_from_db()
+        self.assertEqual(job.status, ExportJob.STATUS_DONE)
+        self.assertEqual(job.total_count, 2)
+        self.assertEqual(job.compress, 'gzip')
+
+        resp = self.client.get('{}export-job/{}/'.format(self.url, job.pk))
+        self.assertEqual(resp.status_code, 200)
+        self.assertContains(resp, '?c_download=true')
+
+        resp = self.client.get(
+            '{}export-job/{}/?c_download=true'.format(self.url, job.pk)
+        )
+        self.assertEqual(resp.status_code, 200)
+        content = gzip.decompress(b''.join(resp.streaming_content))
+        lines = content.decode('utf-8').splitlines()
+        self.assertEqual(len(lines), 3)
+        self.assertIn('"name"', lines[0])
+
+    @override_settings(ASYNC_EXPORTS=True)
+    @patch('concrete_datastore.api.v1.views.async_run_export_job.apply_async')
+    def test_export_csv_action_select_across(self, mock_apply_async):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(
+                '{}?name__exact=A'.format(self.url),
+                {
+                    'action': 'export_csv',
+                    'select_across': '1',
+                    '_selected_action': [str(self.instances[0].pk)],
+                },
+            )
+        job = ExportJob.objects.get()
+        self.assertIsNone(job.admin_pks)
+        self.assertEqual(job.admin_query_string, 'name__exact=A')
+
+        #: The rows are those of the changelist when the job runs
+        UniqueTogetherModel.objects.create(name='A', field1='2')
+        run_export_job(job.pk)
+        job.refresh_from_db()
+        self.assertEqual(job.status, ExportJob.STATUS_DONE)
+        self.assertEqual(job.total_count, 2)
+
+    def test_export_csv_action_without_async_exports(self):
+        resp = self.client.post(
+            self.url,
+            {
+                'action': 'export_csv',
+                '_selected_action': [str(self.instances[0].pk)],
+            },
+        )
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp['Content-Type'], 'application/gzip')
+        content = gzip.decompress(b''.join(resp.streaming_content))
+        lines = content.decode('utf-8').splitlines()
+        self.assertEqual(len(lines), 2)
+        self.assertFalse(ExportJob.objects.exists())
+
+    def test_export_job_of_another_user(self):
+        job = ExportJob.objects.create(
+            model_name='UniqueTogetherModel',
+            fingerprint='fingerprint',
+            created_by=User.objects.create_user('johndoe@netsach.org'),
+        )
+        resp = self.client.get('{}export-job/{}/'.format(self.url, job.pk))
+        self.assertEqual(resp.status_code, 404)
@@ -0,0 +1,64 @@
+# coding: utf-8
+from django.db import connection
+from django.test import TestCase, override_settings
+
+from concrete_datastore.admin.admin import (
+    admin_site,
+    get_list_select_related,
+)
+from concrete_datastore.admin.paginator import EstimatedCountPaginator
+from concrete_datastore.concrete.models import (
+    DefaultDivider,
+    UniqueTogetherModel,
+)
+
+
+class AdminLargeTablesTestCase(TestCase):
+    def setUp(self):
+        self.divider = DefaultDivider.objects.create(name='Divider1')
+        for name in ('A', 'B', 'C'):
+            UniqueTogetherModel.objects.create(
+                name=name, field1='1', defaultdivider=self.divider
+            )
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'ANALYZE {}'.format(UniqueTogetherModel._meta.db_table)
+            )
+
+    def test_list_select_related(self):
+        self.assertEqual(
+            get_list_select_related(
+                UniqueTogetherModel, ['uid', 'name', 'defaultdivider']
+            ),
+            ['defaultdivider'],
+        )
+
+    def test_relations_autocomplete(self):
+        model_admin = admin_site._registry[UniqueTogetherModel]
+        self.assertIn('can_view_users', model_admin.autocomplete_fields)
+        self.assertIn('defaultdivider', model_admin.autocomplete_fields)
+        self.assertEqual(model_admin.filter_horizontal, ())
+
+    @override_settings(ADMIN_LARGE_TABLE_ROWS_COUNT=1)
+    def test_estimated_count_above_threshold(self):
+        UniqueTogetherModel.objects.create(name='D', field1='1')
+        paginator = EstimatedCountPaginator(
+            UniqueTogetherModel.objects.all(), 10
+        )
+        #: The row created after the statistics is not counted
+        self.assertEqual(paginator.count, 3)
+        paginator = EstimatedCountPaginator(
+            UniqueTogetherModel.objects.filter(field1='1'), 10
+        )
+        self.assertEqual(paginator.count, 4)
+        model_admin = admin_site._registry[UniqueTogetherModel]
+        self.assertFalse(model_admin.show_full_result_count)
+
+    def test_exact_count_below_threshold(self):
+        UniqueTogetherModel.objects.create(name='D', field1='1')
+        paginator = EstimatedCountPaginator(
+            UniqueTogetherModel.objects.all(), 10
+        )
+        self.assertEqual(paginator.count, 4)
+        model_admin = admin_site._registry[UniqueTogetherModel]
+        self.assertTrue(model_admin.show_full_result_count)
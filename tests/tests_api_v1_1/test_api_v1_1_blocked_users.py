@@ -135,3 +135,70 @@ class AuthTestCase(APITestCase):
             HTTP_AUTHORIZATION=f'Token {self.token_manager}',
         )
         self.assertEqual(resp.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_unblock_user_is_active(self):
+        blocked_user = User.objects.create(
+            email='blocked@netsach.org', is_active=False
+        )
+        resp = self.client.post(
+            '/api/v1.1/unblock-users',
+            data={'user_uids': [str(blocked_user.uid)]},
+            HTTP_AUTHORIZATION=f'Token {self.token_admin}',
+        )
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        blocked_user.refresh_from_db()
+        self.assertEqual(blocked_user.level, 'simpleuser')
+
+    def test_set_users_level(self):
+        users_level_url = '/api/v1.1/users-level'
+        simple_user = User.objects.create(email='simple@netsach.org')
+        blocked_user = User.objects.create(
+            email='blocked@netsach.org', is_active=False
+        )
+        missing_uid = str(uuid.uuid4())
+        resp = self.client.post(
+            users_level_url,
+            data={
+                'user_uids': [
+                    str(simple_user.uid),
+                    str(blocked_user.uid),
+                    str(self.manager.uid),
+                    str(self.admin.uid),
+                    missing_uid,
+                ],
+                'level': 'manager',
+            },
+            HTTP_AUTHORIZATION=f'Token {self.token_admin}',
+        )
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            resp.json(),
+            {
+                str(simple_user.uid): 'Level successfully changed',
+                str(blocked_user.uid): 'Level successfully changed',
+                str(self.manager.uid): 'User already has this level',
+                str(self.admin.uid): 'Permission denied',
+                missing_uid: 'User not found',
+            },
+        )
+        simple_user.refresh_from_db()
+        blocked_user.refresh_from_db()
+        self.assertEqual(simple_user.level, 'manager')
+        self.assertEqual(blocked_user.level, 'manager')
+
+        #: An admin cannot promote users to admin
+        resp = self.client.post(
+            users_level_url,
+            data={'user_uids': [str(simple_user.uid)], 'level': 'admin'},
+            HTTP_AUTHORIZATION=f'Token {self.token_admin}',
+        )
+        self.assertEqual(
+            resp.json(), {str(simple_user.uid): 'Permission denied'}
+        )
+
+        resp = self.client.post(
+            users_level_url,
+            data={'user_uids': [str(simple_user.uid)], 'level': 'blocked'},
+            HTTP_AUTHORIZATION=f'Token {self.token_manager}',
+        )
+        self.assertEqual(resp.status_code, status.HTTP_403_FORBIDDEN)
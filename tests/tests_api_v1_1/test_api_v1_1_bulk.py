@@ -0,0 +1,131 @@
+# coding: utf-8
+from rest_framework.test import APITestCase
+from rest_framework import status
+
+from concrete_datastore.concrete.models import (
+    User,
+    UserConfirmation,
+    Project,
+    Skill,
+    Category,
+    DeletedModel,
+    ChangeLogEntry,
+)
+from django.test import override_settings
+
+
+@override_settings(DEBUG=True)
+class TestBulkOperations(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('johndoe@netsach.org')
+        self.user.set_password('plop')
+        self.user.set_level('simpleuser', commit=True)
+        UserConfirmation.objects.create(user=self.user, confirmed=True).save()
+        resp = self.client.post(
+            '/api/v1.1/auth/login/',
+            {"email": "johndoe@netsach.org", "password": "plop"},
+        )
+        self.token = resp.data['token']
+        self.url = '/api/v1.1/project/bulk/'
+
+    def post_bulk(self, data):
+        return self.client.post(
+            self.url,
+            data,
+            format='json',
+            HTTP_AUTHORIZATION='Token {}'.format(self.token),
+        )
+
+    def test_bulk_create_update_delete(self):
+        owned_1 = Project.objects.create(name='owned 1', created_by=self.user)
+        owned_2 = Project.objects.create(name='owned 2', created_by=self.user)
+
+        resp = self.post_bulk(
+            {
+                'create': [
+                    {'name': 'new 1', 'members_uid': [str(self.user.uid)]},
+                    {'name': 'new 2'},
+                ],
+                'update': [{'uid': str(owned_1.uid), 'name': 'renamed'}],
+                'delete': [str(owned_2.uid)],
+            }
+        )
+        self.assertEqual(resp.status_code, status.HTTP_200_OK, resp.data)
+        self.assertEqual(len(resp.data['created']), 2)
+        self.assertEqual(resp.data['updated'], [owned_1.uid])
+        self.assertEqual(resp.data['deleted'], [owned_2.uid])
+
+        new_1 = Project.objects.get(name='new 1')
+        self.assertEqual(new_1.created_by, self.user)
+        self.assertEqual(list(new_1.members.all()), [self.user])
+        owned_1.refresh_from_db()
+        self.assertEqual(owned_1.name, 'renamed')
+        self.assertFalse(Project.objects.filter(pk=owned_2.pk).exists())
+        self.assertTrue(
+            DeletedModel.objects.filter(
+                uid=owned_2.uid, model_name='Project'
+            ).exists()
+        )
+        self.assertEqual(
+            ChangeLogEntry.objects.filter(
+                model_name='Project', operation='create'
+            ).count(),
+            4,
+        )
+
+    def test_bulk_reports_all_errors_and_saves_nothing(self):
+        not_owned = Project.objects.create(name='not owned', public=True)
+        owned = Project.objects.create(name='owned', created_by=self.user)
+
+        resp = self.post_bulk(
+            {
+                'create': [{'name': 'new'}, {'members_uid': ['wrong']}],
+                'update': [
+                    {'uid': str(not_owned.uid), 'name': 'renamed'},
+                    {'uid': 'not an uid'},
+                ],
+                'delete': [str(owned.uid)],
+            }
+        )
+        self.assertEqual(resp.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(
+            [
+                (e['operation'], e['index'], e['_errors'])
+                for e in resp.data['errors']
+            ],
+            [
+                ('create', 1, ['INVALID_DATA']),
+                ('update', 0, ['PERMISSION_DENIED']),
+                ('update', 1, ['INVALID_DATA']),
+            ],
+        )
+        self.assertFalse(Project.objects.filter(name='new').exists())
+        self.assertTrue(Project.objects.filter(pk=owned.pk).exists())
+        not_owned.refresh_from_db()
+        self.assertEqual(not_owned.name, 'not owned')
+
+    def test_bulk_delete_protected(self):
+        category = Category.objects.create(
+            name='category', created_by=self.user
+        )
+        Skill.objects.create(name='skill', category=category)
+        resp = self.client.post(
+            '/api/v1.1/category/bulk/',
+            {'delete': [str(category.uid)]},
+            format='json',
+            HTTP_AUTHORIZATION='Token {}'.format(self.token),
+        )
+        self.assertEqual(
+            resp.status_code, status.HTTP_412_PRECONDITION_FAILED
+        )
+        self.assertEqual(resp.data['_errors'], ['PROTECTED_RELATION'])
+        self.assertTrue(Category.objects.filter(pk=category.pk).exists())
+
+    def test_bulk_not_allowed_on_users(self):
+        resp = self.client.post(
+            '/api/v1.1/user/bulk/',
+            {'create': []},
+            format='json',
+            HTTP_AUTHORIZATION='Token {}'.format(self.token),
+        )
+        self.assertEqual(resp.status_code, status.HTTP_400_BAD_REQUEST)
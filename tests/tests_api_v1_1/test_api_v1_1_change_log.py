@@ -0,0 +1,226 @@
+# coding: utf-8
+import threading
+from datetime import timedelta
+
+from django.db import connection, transaction
+from rest_framework.test import APITestCase, APITransactionTestCase
+from rest_framework import status
+
+from concrete_datastore.concrete.models import (
+    User,
+    UserConfirmation,
+    Project,
+    ChangeLogEntry,
+    DefaultDivider,
+)
+from concrete_datastore.concrete.changelog import (
+    remove_expired_change_log_entries,
+)
+from django.test import override_settings
+from django.utils import timezone
+
+
+@override_settings(DEBUG=True)
+class TestChangeLog(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('johndoe@netsach.org')
+        self.user.set_password('plop')
+        self.user.set_level('superuser', commit=True)
+        UserConfirmation.objects.create(user=self.user, confirmed=True).save()
+        resp = self.client.post(
+            '/api/v1.1/auth/login/',
+            {"email": "johndoe@netsach.org", "password": "plop"},
+        )
+        self.token = resp.data['token']
+        self.divider = DefaultDivider.objects.create(name='divider')
+
+    def get_operations(self, uid):
+        return list(
+            ChangeLogEntry.objects.filter(uid=uid).values_list(
+                'operation', flat=True
+            )
+        )
+
+    def test_entries_are_recorded(self):
+        project = Project.objects.create(
+            name='project', defaultdivider=self.divider
+        )
+        project.name = 'updated'
+        project.save()
+        project.can_view_users.add(self.user)
+        self.user.viewable_projects.remove(project)
+        project_uid = project.uid
+        project.delete()
+
+        self.assertEqual(
+            self.get_operations(project_uid),
+            ['create', 'update', 'permissions', 'permissions', 'delete'],
+        )
+        self.assertEqual(
+            set(
+                ChangeLogEntry.objects.filter(uid=project_uid).values_list(
+                    'scope_uid', flat=True
+                )
+            ),
+            {self.divider.uid},
+        )
+        sequences = list(
+            ChangeLogEntry.objects.filter(uid=project_uid).values_list(
+                'sequence', flat=True
+            )
+        )
+        self.assertEqual(sequences, sorted(sequences))
+
+    def test_changes_endpoint(self):
+        project_1 = Project.objects.create(name='project 1')
+        project_2 = Project.objects.create(name='project 2')
+        project_2_uid = project_2.uid
+        project_2.delete()
+        project_1.name = 'updated'
+        project_1.save()
+
+        resp = self.client.get(
+            '/api/v1.1/project/changes/',
+            HTTP_AUTHORIZATION='Token {}'.format(self.token),
+        )
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertFalse(resp.data['has_more'])
+        self.assertEqual(
+            [
+                (change['uid'], change['operation'])
+                for change in resp.data['changes']
+            ],
+            [(project_2_uid, 'delete'), (project_1.uid, 'update')],
+        )
+
+        last_cursor = resp.data['last_cursor']
+        resp = self.client.get(
+            '/api/v1.1/project/changes/?c_since_cursor={}'.format(last_cursor),
+            HTTP_AUTHORIZATION='Token {}'.format(self.token),
+        )
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertEqual(resp.data['changes'], [])
+        self.assertEqual(resp.data['last_cursor'], last_cursor)
+
+    def test_deletions_of_other_scopes_are_not_disclosed(self):
+        simple_user = User.objects.create_user('simple@netsach.org')
+        simple_user.set_password('plop')
+        simple_user.set_level('simpleuser', commit=True)
+        UserConfirmation.objects.create(
+            user=simple_user, confirmed=True
+        ).save()
+        simple_user.defaultdividers.add(self.divider)
+        resp = self.client.post(
+            '/api/v1.1/auth/login/',
+            {"email": "simple@netsach.org", "password": "plop"},
+        )
+        simple_token = resp.data['token']
+
+        other_divider = DefaultDivider.objects.create(name='other')
+        project = Project.objects.create(
+            name='project', defaultdivider=self.divider
+        )
+        other_project = Project.objects.create(
+            name='other project', defaultdivider=other_divider
+        )
+        project_uid = project.uid
+        project.delete()
+        other_project.delete()
+
+        resp = self.client.get(
+            '/api/v1.1/project/changes/',
+            HTTP_AUTHORIZATION='Token {}'.format(simple_token),
+        )
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [
+                (change['uid'], change['operation'])
+                for change in resp.data['changes']
+            ],
+            [(project_uid, 'delete')],
+        )
+
+    @override_settings(
+        CHANGE_LOG_RETENTION_DAYS=30, CHANGE_LOG_PURGE_BATCH_SIZE=1
+    )
+    def test_expired_entries_are_removed(self):
+        Project.objects.create(name='expired', defaultdivider=self.divider)
+        Project.objects.create(name='expired', defaultdivider=self.divider)
+        expired_count = ChangeLogEntry.objects.update(
+            creation_date=timezone.now() - timedelta(days=31)
+        )
+        project = Project.objects.create(
+            name='recent', defaultdivider=self.divider
+        )
+        self.assertGreaterEqual(expired_count, 2)
+        self.assertEqual(remove_expired_change_log_entries(), expired_count)
+        self.assertEqual(
+            list(ChangeLogEntry.objects.values_list('uid', flat=True)),
+            [project.pk],
+        )
+
+    def test_changes_endpoint_wrong_cursor(self):
+        resp = self.client.get(
+            '/api/v1.1/project/changes/?c_since_cursor=abc',
+            HTTP_AUTHORIZATION='Token {}'.format(self.token),
+        )
+        self.assertEqual(resp.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(resp.data['_errors'], ['INVALID_QUERY'])
+
+
+@override_settings(DEBUG=True)
+class TestChangeLogCursor(APITransactionTestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('johndoe@netsach.org')
+        self.user.set_password('plop')
+        self.user.set_level('superuser', commit=True)
+        UserConfirmation.objects.create(user=self.user, confirmed=True).save()
+        resp = self.client.post(
+            '/api/v1.1/auth/login/',
+            {"email": "johndoe@netsach.org", "password": "plop"},
+        )
+        self.token = resp.data['token']
+
+    def get_changes(self, cursor=''):
+        resp = self.client.get(
+            '/api/v1.1/project/changes/?c_since_cursor={}'.format(cursor),
+            HTTP_AUTHORIZATION='Token {}'.format(self.token),
+        )
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        return resp.data
+
+    def test_interleaved_transactions(self):
+        created = threading.Event()
+        commit = threading.Event()
+        slow_project_uids = []
+
+        def create_in_long_transaction():
+            try:
+                with transaction.atomic():
+                    slow_project_uids.append(
+                        Project.objects.create(name='slow').uid
+                    )
+                    created.set()
+                    commit.wait(10)
+            finally:
+                connection.close()
+
+        thread = threading.Thread(target=create_in_long_transaction)
+        thread.start()
+        self.assertTrue(created.wait(10))
+        #: Committed while the slow transaction, whose entry has a lower
+        #: sequence, is still running
+        fast_project = Project.objects.create(name='fast')
+
+        data = self.get_changes()
+        self.assertEqual(data['changes'], [])
+        cursor = data['last_cursor']
+
+        commit.set()
+        thread.join()
+        data = self.get_changes(cursor)
+        self.assertEqual(
+            [change['uid'] for change in data['changes']],
+            [slow_project_uids[0], fast_project.uid],
+        )
+        self.assertEqual(self.get_changes(data['last_cursor'])['changes'], [])
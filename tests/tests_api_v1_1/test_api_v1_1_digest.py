@@ -0,0 +1,112 @@
+# coding: utf-8
+import hashlib
+
+from rest_framework.test import APITestCase
+from rest_framework import status
+
+from concrete_datastore.concrete.models import User, UserConfirmation, Project
+from concrete_datastore.api.v1.digest import get_entry_line
+from django.test import override_settings
+
+
+@override_settings(DEBUG=True)
+class TestDigestViews(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('johndoe@netsach.org')
+        self.user.set_password('plop')
+        self.user.set_level('superuser', commit=True)
+        UserConfirmation.objects.create(user=self.user, confirmed=True).save()
+        resp = self.client.post(
+            '/api/v1.1/auth/login/',
+            {"email": "johndoe@netsach.org", "password": "plop"},
+        )
+        self.token = resp.data['token']
+
+        self.simple_user = User.objects.create_user('simple@netsach.org')
+        self.simple_user.set_password('plop')
+        self.simple_user.set_level('simpleuser', commit=True)
+        UserConfirmation.objects.create(
+            user=self.simple_user, confirmed=True
+        ).save()
+        resp = self.client.post(
+            '/api/v1.1/auth/login/',
+            {"email": "simple@netsach.org", "password": "plop"},
+        )
+        self.simple_token = resp.data['token']
+
+        for i in range(40):
+            Project.objects.create(name="project_name_{}".format(i))
+        self.url = '/api/v1.1/project/digest/'
+
+    def get_expected_digest(self, queryset):
+        expected = hashlib.md5()
+        for project in queryset.order_by('uid'):
+            expected.update(
+                get_entry_line(project.uid, project.modification_date).encode(
+                    'utf-8'
+                )
+            )
+        return expected.hexdigest()
+
+    @override_settings(API_DIGEST_MAX_LEAF_SIZE=10)
+    def test_digest_buckets(self):
+        resp = self.client.get(
+            self.url, HTTP_AUTHORIZATION='Token {}'.format(self.token)
+        )
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertEqual(resp.data['model_name'], 'Project')
+        self.assertEqual(resp.data['objects_count'], 40)
+        self.assertEqual(
+            resp.data['digest'],
+            self.get_expected_digest(Project.objects.all()),
+        )
+        self.assertNotIn('objects', resp.data)
+        self.assertEqual(
+            sum(b['objects_count'] for b in resp.data['buckets'].values()),
+            40,
+        )
+
+        #: The digest of a bucket is the digest of the sub-tree
+        prefix, bucket = next(iter(resp.data['buckets'].items()))
+        resp = self.client.get(
+            '{}?c_digest_prefix={}'.format(self.url, prefix),
+            HTTP_AUTHORIZATION='Token {}'.format(self.token),
+        )
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertEqual(resp.data['prefix'], prefix)
+        self.assertEqual(resp.data['digest'], bucket['digest'])
+        self.assertEqual(resp.data['objects_count'], bucket['objects_count'])
+
+    def test_digest_changes_on_update(self):
+        resp = self.client.get(
+            self.url, HTTP_AUTHORIZATION='Token {}'.format(self.token)
+        )
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(resp.data['objects']), 40)
+        digest = resp.data['digest']
+
+        project = Project.objects.first()
+        project.name = 'updated'
+        project.save()
+        resp = self.client.get(
+            self.url, HTTP_AUTHORIZATION='Token {}'.format(self.token)
+        )
+        self.assertNotEqual(resp.data['digest'], digest)
+
+    def test_digest_respects_permissions(self):
+        project = Project.objects.first()
+        project.can_view_users.add(self.simple_user)
+        resp = self.client.get(
+            self.url, HTTP_AUTHORIZATION='Token {}'.format(self.simple_token)
+        )
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertEqual(resp.data['objects_count'], 1)
+        self.assertEqual(list(resp.data['objects']), [str(project.uid)])
+
+    def test_digest_wrong_prefix(self):
+        resp = self.client.get(
+            '{}?c_digest_prefix=xyz'.format(self.url),
+            HTTP_AUTHORIZATION='Token {}'.format(self.token),
+        )
+        self.assertEqual(resp.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(resp.data['_errors'], ['INVALID_QUERY'])
@@ -0,0 +1,119 @@
+# coding: utf-8
+import shutil
+import tempfile
+from datetime import timedelta
+from mock import patch
+from rest_framework.test import APITestCase
+from rest_framework import status
+from concrete_datastore.concrete.models import (
+    User,
+    UserConfirmation,
+    ExportJob,
+)
+from concrete_datastore.concrete.exports import (
+    remove_expired_export_jobs,
+    run_export_job,
+)
+from django.test import override_settings
+from django.utils import timezone
+
+
+@override_settings(DEBUG=True)
+class ExportJobTestCase(APITestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        self.settings_override.enable()
+        self.user = User.objects.create_user('admin@netsach.org')
+        self.user.set_password('plop')
+        self.user.set_level('superuser', commit=True)
+        UserConfirmation.objects.create(user=self.user, confirmed=True)
+        resp = self.client.post(
+            '/api/v1.1/auth/login/',
+            {"email": "admin@netsach.org", "password": "plop"},
+        )
+        self.token = resp.data['token']
+        self.url = (
+            '/api/v1.1/user/export/?c_async=true&email=admin@netsach.org'
+        )
+
+    def tearDown(self):
+        self.settings_override.disable()
+        shutil.rmtree(self.media_root, ignore_errors=True)
+
+    def get(self, url):
+        return self.client.get(
+            url, HTTP_AUTHORIZATION='Token {}'.format(self.token)
+        )
+
+    @override_settings(ASYNC_EXPORTS=True)
+    @patch('concrete_datastore.api.v1.views.async_run_export_job.apply_async')
+    def test_export_job(self, mock_apply_async):
+        with self.captureOnCommitCallbacks(execute=True):
+            resp = self.get(self.url)
+        self.assertEqual(resp.status_code, status.HTTP_202_ACCEPTED)
+        job_uid = resp.data['uid']
+        #: The file is never written within the request
+        mock_apply_async.assert_called_once_with(
+            queue='exports', kwargs={'job_pk': str(job_uid)}
+        )
+        job = ExportJob.objects.get(pk=job_uid)
+        self.assertEqual(job.status, ExportJob.STATUS_PENDING)
+
+        run_export_job(job_uid)
+        job.refresh_from_db()
+        #: The name of the file can not be guessed
+        self.assertTrue(
+            job.file.name.startswith('exports/{}/'.format(job_uid))
+        )
+        self.assertEqual(job.status, ExportJob.STATUS_DONE)
+        self.assertEqual(job.total_count, 1)
+
+        #: An identical request reuses the file
+        resp = self.get(self.url)
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertEqual(resp.data['uid'], job.pk)
+        self.assertIn('download_url', resp.data)
+
+        resp = self.get(
+            '/api/v1.1/user/export-job/?uid={}&c_download=true'.format(job_uid)
+        )
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        content = b''.join(resp.streaming_content)
+        self.assertEqual(
+            content,
+            b'"email";"first_name";"last_name"\n'
+            b'"admin@netsach.org";"";""\n',
+        )
+
+        #: Once expired, the file is no longer served nor reused
+        ExportJob.objects.filter(pk=job_uid).update(
+            expiry_date=timezone.now() - timedelta(seconds=1)
+        )
+        resp = self.get('/api/v1.1/user/export-job/?uid={}'.format(job_uid))
+        self.assertEqual(resp.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(remove_expired_export_jobs(), 1)
+        self.assertFalse(ExportJob.objects.filter(pk=job_uid).exists())
+
+    @override_settings(ASYNC_EXPORTS=True)
+    @patch('concrete_datastore.api.v1.views.async_run_export_job.apply_async')
+    def test_identical_requests_share_the_job(self, mock_apply_async):
+        with self.captureOnCommitCallbacks(execute=True):
+            resp_1 = self.get(self.url)
+            resp_2 = self.get(self.url)
+        self.assertEqual(resp_1.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(resp_1.data['uid'], resp_2.data['uid'])
+        self.assertEqual(resp_2.data['status'], ExportJob.STATUS_PENDING)
+        self.assertEqual(mock_apply_async.call_count, 1)
+
+        #: Other filters make another job
+        with self.captureOnCommitCallbacks(execute=True):
+            resp = self.get(self.url + '&c_compress=gzip')
+        self.assertNotEqual(resp.data['uid'], resp_1.data['uid'])
+        self.assertEqual(ExportJob.objects.count(), 2)
+
+    def test_background_exports_disabled(self):
+        resp = self.get(self.url)
+        self.assertEqual(resp.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertEqual(resp.data['_errors'], ['ASYNC_EXPORTS_DISABLED'])
+        self.assertFalse(ExportJob.objects.exists())
@@ -0,0 +1,137 @@
+# coding: utf-8
+import json
+import shutil
+import tempfile
+from django.core.files.uploadedfile import SimpleUploadedFile
+from mock import patch
+from rest_framework.test import APITestCase
+from rest_framework import status
+from concrete_datastore.concrete.models import (
+    User,
+    UserConfirmation,
+    UniqueTogetherModel,
+    ImportJob,
+    DefaultDivider,
+)
+from concrete_datastore.concrete.imports import (
+    create_instances,
+    run_import_job,
+)
+from django.test import override_settings
+
+
+@override_settings(DEBUG=True, ASYNC_IMPORTS=True)
+class ImportTestCase(APITestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        self.settings_override.enable()
+        self.task_patch = patch(
+            'concrete_datastore.api.v1.views.async_run_import_job.apply_async',
+            side_effect=lambda queue, kwargs: run_import_job(**kwargs),
+        )
+        self.apply_async_mock = self.task_patch.start()
+        self.admin = User.objects.create_user('admin@netsach.org')
+        self.admin.set_password('plop')
+        self.admin.set_level('admin', commit=True)
+        UserConfirmation.objects.create(user=self.admin, confirmed=True)
+        resp = self.client.post(
+            '/api/v1.1/auth/login/',
+            {"email": "admin@netsach.org", "password": "plop"},
+        )
+        self.token = resp.data['token']
+        self.divider = DefaultDivider.objects.create(name='Divider')
+        self.url = '/api/v1.1/unique-together-model/import/'
+
+    def tearDown(self):
+        self.task_patch.stop()
+        self.settings_override.disable()
+        shutil.rmtree(self.media_root, ignore_errors=True)
+
+    def post_file(self, name, content, **extra):
+        return self.client.post(
+            self.url,
+            {'file': SimpleUploadedFile(name, content)},
+            format='multipart',
+            HTTP_AUTHORIZATION='Token {}'.format(self.token),
+            **extra,
+        )
+
+    def test_import_csv(self):
+        UniqueTogetherModel.objects.create(name='A', field1='1')
+        content = (
+            b'"name";"field1";"public"\n'
+            b'"A";"1";"True"\n'
+            b'"B";"1";"True"\n'
+            b'"' + b'C' * 300 + b'";"1";""\n'
+            b'"D";"1";""\n'
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            resp = self.post_file(
+                'instances.csv',
+                content,
+                HTTP_X_ENTITY_UID=str(self.divider.pk),
+            )
+        self.assertEqual(resp.status_code, status.HTTP_202_ACCEPTED)
+        self.apply_async_mock.assert_called_once_with(
+            queue='imports', kwargs={'job_pk': str(resp.data['uid'])}
+        )
+
+        job = ImportJob.objects.get(pk=resp.data['uid'])
+        self.assertEqual(job.status, ImportJob.STATUS_DONE, job.error)
+        self.assertEqual(job.processed_count, 4)
+        self.assertEqual(job.created_count, 2)
+        self.assertEqual(job.rejected_count, 2)
+        self.assertTrue(UniqueTogetherModel.objects.get(name='B').public)
+        self.assertEqual(
+            UniqueTogetherModel.objects.filter(
+                defaultdivider=self.divider
+            ).count(),
+            2,
+        )
+
+        resp = self.client.get(
+            self.url + '?uid={}&c_download=true'.format(job.pk),
+            HTTP_AUTHORIZATION='Token {}'.format(self.token),
+        )
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        rejected = [
+            json.loads(line)
+            for line in b''.join(resp.streaming_content).splitlines()
+        ]
+        self.assertEqual([row['line'] for row in rejected], [2, 4])
+        self.assertIn('name', rejected[1]['errors'])
+
+    def test_rows_rejected_by_copy(self):
+        #: The NOT NULL violation makes the COPY of the batch fail
+        errors = create_instances(
+            UniqueTogetherModel,
+            [{'name': 'A', 'field1': '1'}, {'name': None, 'field1': '1'}],
+            {},
+        )
+        self.assertEqual(list(errors), [1])
+        self.assertEqual(
+            list(UniqueTogetherModel.objects.values_list('name', flat=True)),
+            ['A'],
+        )
+
+    def test_import_unknown_columns(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            resp = self.post_file(
+                'instances.csv', b'"name";"unknown"\n"A";"B"\n'
+            )
+        job = ImportJob.objects.get(pk=resp.data['uid'])
+        self.assertEqual(job.status, ImportJob.STATUS_FAILED)
+        self.assertIn('unknown', job.error)
+
+    def test_import_requires_admin(self):
+        self.admin.set_level('simpleuser', commit=True)
+        resp = self.post_file('instances.ndjson', b'{"name": "A"}\n')
+        self.assertEqual(resp.status_code, status.HTTP_403_FORBIDDEN)
+
+    @override_settings(ASYNC_IMPORTS=False)
+    def test_imports_disabled(self):
+        resp = self.post_file('instances.ndjson', b'{"name": "A"}\n')
+        self.assertEqual(resp.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertEqual(resp.data['_errors'], ['ASYNC_IMPORTS_DISABLED'])
+        self.assertFalse(ImportJob.objects.exists())
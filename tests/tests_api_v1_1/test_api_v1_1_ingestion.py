@@ -0,0 +1,111 @@
+# coding: utf-8
+from mock import patch
+from rest_framework.test import APITestCase
+from rest_framework import status
+from concrete_datastore.concrete.models import (
+    User,
+    UserConfirmation,
+    Village,
+    IngestionBatch,
+)
+from concrete_datastore.concrete.ingestion import process_ingestion_batches
+from concrete_datastore.concrete.automation.tasks import (
+    process_pending_ingestion_batches,
+)
+from django.test import override_settings
+
+
+@override_settings(DEBUG=True)
+class IngestionTestCase(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('usera@netsach.org')
+        self.user.set_password('plop')
+        self.user.save()
+        UserConfirmation.objects.create(user=self.user, confirmed=True).save()
+        resp = self.client.post(
+            '/api/v1.1/auth/login/',
+            {"email": "usera@netsach.org", "password": "plop"},
+        )
+        self.token = resp.data['token']
+        self.url = '/api/v1.1/village/ingest/'
+
+    def post_items(self, items):
+        return self.client.post(
+            self.url,
+            items,
+            format='json',
+            HTTP_AUTHORIZATION='Token {}'.format(self.token),
+        )
+
+    def test_ingestion(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            resp = self.post_items([{'name': 'V1'}, {'name': 'V2' * 200}])
+        self.assertEqual(resp.status_code, status.HTTP_202_ACCEPTED)
+        batch_uid = resp.data['uid']
+        #: Without ingestion workers, the batches are left to the periodic
+        #: task
+        self.assertEqual(Village.objects.count(), 0)
+
+        process_pending_ingestion_batches()
+        self.assertEqual(Village.objects.get().name, 'V1')
+        self.assertEqual(Village.objects.get().created_by, self.user)
+
+        resp = self.client.get(
+            self.url,
+            {'uid': batch_uid},
+            HTTP_AUTHORIZATION='Token {}'.format(self.token),
+        )
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertEqual(resp.data['status'], IngestionBatch.STATUS_DONE)
+        self.assertEqual(resp.data['created_count'], 1)
+        self.assertEqual(resp.data['errors'][0]['index'], 1)
+
+        resp = self.client.get(self.url, {'uid': batch_uid})
+        self.assertEqual(resp.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    @override_settings(ASYNC_INGESTION=True)
+    def test_micro_batches(self):
+        with patch(
+            'concrete_datastore.api.v1.views.async_process_ingestion_batches'
+        ) as task_mock:
+            with self.captureOnCommitCallbacks(execute=True):
+                for i in range(3):
+                    resp = self.post_items({'name': 'V{}'.format(i)})
+                    self.assertEqual(
+                        resp.status_code, status.HTTP_202_ACCEPTED
+                    )
+            self.assertEqual(task_mock.apply_async.call_count, 3)
+        self.assertEqual(Village.objects.count(), 0)
+
+        with override_settings(INGESTION_MICRO_BATCH_MAX_ITEMS=2):
+            self.assertEqual(process_ingestion_batches('Village'), 3)
+        self.assertEqual(Village.objects.count(), 3)
+        self.assertFalse(
+            IngestionBatch.objects.exclude(
+                status=IngestionBatch.STATUS_DONE
+            ).exists()
+        )
+
+    def test_validation_and_backpressure(self):
+        resp = self.post_items([{'unknown': 'V1'}])
+        self.assertEqual(resp.status_code, status.HTTP_400_BAD_REQUEST)
+
+        with override_settings(INGESTION_MAX_PENDING_ITEMS=2):
+            with override_settings(ASYNC_INGESTION=True), patch(
+                'concrete_datastore.api.v1.views.async_process_ingestion_batches'
+            ):
+                resp = self.post_items([{'name': 'V1'}, {'name': 'V2'}])
+                self.assertEqual(resp.status_code, status.HTTP_202_ACCEPTED)
+            resp = self.post_items([{'name': 'V3'}])
+            self.assertEqual(
+                resp.status_code, status.HTTP_429_TOO_MANY_REQUESTS
+            )
+            self.assertIn('Retry-After', resp)
+
+        resp = self.client.post(
+            '/api/v1.1/project/ingest/',
+            [{'name': 'P1'}],
+            format='json',
+            HTTP_AUTHORIZATION='Token {}'.format(self.token),
+        )
+        self.assertEqual(resp.status_code, status.HTTP_400_BAD_REQUEST)
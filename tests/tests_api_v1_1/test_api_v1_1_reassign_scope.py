@@ -0,0 +1,130 @@
+# coding: utf-8
+from rest_framework.test import APITestCase
+from rest_framework import status
+
+from concrete_datastore.concrete.models import (
+    User,
+    UserConfirmation,
+    DefaultDivider,
+    Category,
+    ChangeLogEntry,
+    DeletedModel,
+)
+from django.test import override_settings
+
+
+@override_settings(DEBUG=True)
+class TestReassignScope(APITestCase):
+    def setUp(self):
+        self.token = self.login('admin@netsach.org', 'admin')
+        self.divider_1 = DefaultDivider.objects.create(name='Divider1')
+        self.divider_2 = DefaultDivider.objects.create(name='Divider2')
+        self.category_1 = Category.objects.create(
+            name='moved', defaultdivider=self.divider_1
+        )
+        self.category_2 = Category.objects.create(
+            name='kept', defaultdivider=self.divider_1
+        )
+
+    def login(self, email, level):
+        user = User.objects.create_user(email)
+        user.set_password('plop')
+        user.set_level(level, commit=True)
+        UserConfirmation.objects.create(user=user, confirmed=True).save()
+        resp = self.client.post(
+            '/api/v1.1/auth/login/', {"email": email, "password": "plop"}
+        )
+        return resp.data['token']
+
+    def get_data(self):
+        return {
+            'source_scope_uid': str(self.divider_1.uid),
+            'target_scope_uid': str(self.divider_2.uid),
+        }
+
+    def test_reassign_filtered_instances(self):
+        ChangeLogEntry.objects.all().delete()
+        resp = self.client.post(
+            '/api/v1.1/category/reassign-scope/?name=moved',
+            self.get_data(),
+            format='json',
+            HTTP_AUTHORIZATION='Token {}'.format(self.token),
+        )
+        self.assertEqual(resp.status_code, status.HTTP_200_OK, resp.data)
+        self.assertEqual(resp.data['objects_count'], 1)
+        self.category_1.refresh_from_db()
+        self.category_2.refresh_from_db()
+        self.assertEqual(self.category_1.defaultdivider, self.divider_2)
+        self.assertEqual(self.category_2.defaultdivider, self.divider_1)
+
+        self.assertFalse(
+            DeletedModel.objects.filter(uid=self.category_1.uid).exists()
+        )
+        self.assertEqual(
+            set(
+                ChangeLogEntry.objects.filter(
+                    uid=self.category_1.uid
+                ).values_list('scope_uid', flat=True)
+            ),
+            {self.divider_1.uid, self.divider_2.uid},
+        )
+
+    def test_move_is_a_deletion_for_the_source_scope(self):
+        resp = self.client.post(
+            '/api/v1.1/category/reassign-scope/?name=moved',
+            self.get_data(),
+            format='json',
+            HTTP_AUTHORIZATION='Token {}'.format(self.token),
+        )
+        self.assertEqual(resp.status_code, status.HTTP_200_OK, resp.data)
+
+        resp = self.client.get(
+            '/api/v1.1/category/changes/',
+            HTTP_AUTHORIZATION='Token {}'.format(self.token),
+            HTTP_X_ENTITY_UID=str(self.divider_1.uid),
+        )
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            {
+                change['uid']: change['operation']
+                for change in resp.data['changes']
+            },
+            {self.category_1.uid: 'delete', self.category_2.uid: 'create'},
+        )
+
+    def test_reassign_all_models(self):
+        resp = self.client.post(
+            '/api/v1.1/reassign-scope/',
+            {**self.get_data(), 'models': ['Category']},
+            format='json',
+            HTTP_AUTHORIZATION='Token {}'.format(self.token),
+        )
+        self.assertEqual(resp.status_code, status.HTTP_200_OK, resp.data)
+        self.assertEqual(resp.data['objects_count'], {'Category': 2})
+        self.assertEqual(
+            Category.objects.filter(defaultdivider=self.divider_2).count(), 2
+        )
+
+        resp = self.client.post(
+            '/api/v1.1/reassign-scope/',
+            {**self.get_data(), 'models': ['Unknown']},
+            format='json',
+            HTTP_AUTHORIZATION='Token {}'.format(self.token),
+        )
+        self.assertEqual(resp.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_reassign_restricted_to_admins(self):
+        token = self.login('manager@netsach.org', 'manager')
+        for url in (
+            '/api/v1.1/category/reassign-scope/',
+            '/api/v1.1/reassign-scope/',
+        ):
+            resp = self.client.post(
+                url,
+                self.get_data(),
+                format='json',
+                HTTP_AUTHORIZATION='Token {}'.format(token),
+            )
+            self.assertEqual(resp.status_code, status.HTTP_403_FORBIDDEN)
+        self.category_1.refresh_from_db()
+        self.assertEqual(self.category_1.defaultdivider, self.divider_1)
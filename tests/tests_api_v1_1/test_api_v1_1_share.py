@@ -0,0 +1,108 @@
+# coding: utf-8
+from rest_framework.test import APITestCase
+from rest_framework import status
+
+from concrete_datastore.concrete.models import (
+    User,
+    UserConfirmation,
+    Project,
+    Group,
+    ChangeLogEntry,
+)
+from django.test import override_settings
+
+
+@override_settings(DEBUG=True)
+class TestShareInstances(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('johndoe@netsach.org')
+        self.user.set_password('plop')
+        self.user.set_level('simpleuser', commit=True)
+        UserConfirmation.objects.create(user=self.user, confirmed=True).save()
+        resp = self.client.post(
+            '/api/v1.1/auth/login/',
+            {"email": "johndoe@netsach.org", "password": "plop"},
+        )
+        self.token = resp.data['token']
+        self.other_user = User.objects.create_user('other@netsach.org')
+        self.group = Group.objects.create(name='G1')
+        self.projects = [
+            Project.objects.create(
+                name='folder {}'.format(i), created_by=self.user
+            )
+            for i in range(5)
+        ]
+        self.unshared_project = Project.objects.create(
+            name='other', created_by=self.user
+        )
+
+    def post_share(self, data, query=''):
+        return self.client.post(
+            '/api/v1.1/project/share/{}'.format(query),
+            data,
+            format='json',
+            HTTP_AUTHORIZATION='Token {}'.format(self.token),
+        )
+
+    def test_share_and_unshare_filtered_instances(self):
+        ChangeLogEntry.objects.all().delete()
+        resp = self.post_share(
+            {
+                'operation': 'add',
+                'can_view_groups': [str(self.group.uid)],
+                'can_admin_users': [str(self.other_user.uid)],
+            },
+            query='?name__contains=folder',
+        )
+        self.assertEqual(resp.status_code, status.HTTP_200_OK, resp.data)
+        self.assertEqual(resp.data['objects_count'], 5)
+        for project in self.projects:
+            self.assertEqual(list(project.can_view_groups.all()), [self.group])
+            self.assertEqual(
+                list(project.can_admin_users.all()), [self.other_user]
+            )
+        self.assertEqual(self.unshared_project.can_view_groups.count(), 0)
+        self.assertEqual(
+            ChangeLogEntry.objects.filter(
+                operation=ChangeLogEntry.OPERATION_PERMISSIONS
+            ).count(),
+            5,
+        )
+
+        #: Sharing again is a no-op
+        resp = self.post_share(
+            {'operation': 'add', 'can_view_groups': [str(self.group.uid)]},
+            query='?name__contains=folder',
+        )
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertEqual(self.projects[0].can_view_groups.count(), 1)
+
+        resp = self.post_share(
+            {'operation': 'remove', 'can_view_groups': [str(self.group.uid)]}
+        )
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertEqual(resp.data['objects_count'], 6)
+        self.assertEqual(self.projects[0].can_view_groups.count(), 0)
+        self.assertEqual(self.projects[0].can_admin_users.count(), 1)
+
+    def test_share_denied_on_not_administrable_instances(self):
+        Project.objects.create(name='not owned', public=True)
+        resp = self.post_share(
+            {'operation': 'add', 'can_view_groups': [str(self.group.uid)]}
+        )
+        self.assertEqual(resp.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertEqual(resp.data['_errors'], ['PERMISSION_DENIED'])
+        self.assertEqual(self.projects[0].can_view_groups.count(), 0)
+
+    def test_share_unknown_principal(self):
+        resp = self.post_share(
+            {
+                'operation': 'add',
+                'can_view_users': [
+                    str(self.other_user.uid),
+                    str(self.group.uid),
+                ],
+            }
+        )
+        self.assertEqual(resp.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.projects[0].can_view_users.count(), 0)
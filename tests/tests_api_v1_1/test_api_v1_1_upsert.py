@@ -0,0 +1,120 @@
+# coding: utf-8
+from rest_framework.test import APITestCase
+from rest_framework import status
+from concrete_datastore.concrete.models import (
+    User,
+    UserConfirmation,
+    UniqueTogetherModel,
+)
+from django.test import override_settings
+
+
+@override_settings(DEBUG=True)
+class UpsertTestCase(APITestCase):
+    def setUp(self):
+        self.token_a = self.login('usera@netsach.org')
+        self.token_b = self.login('userb@netsach.org')
+        self.url = '/api/v1.1/unique-together-model/upsert/'
+
+    def login(self, email):
+        user = User.objects.create_user(email)
+        user.set_password('plop')
+        user.save()
+        UserConfirmation.objects.create(user=user, confirmed=True).save()
+        resp = self.client.post(
+            '/api/v1.1/auth/login/', {"email": email, "password": "plop"}
+        )
+        return resp.data['token']
+
+    def test_upsert_single_instance(self):
+        resp = self.client.post(
+            self.url,
+            {"name": "TOTO", "field1": "TATA"},
+            format='json',
+            HTTP_AUTHORIZATION='Token {}'.format(self.token_a),
+        )
+        self.assertEqual(resp.status_code, status.HTTP_201_CREATED)
+        uid = resp.data['uid']
+
+        resp = self.client.post(
+            self.url,
+            {"name": "TOTO", "field1": "TATA", "public": True},
+            format='json',
+            HTTP_AUTHORIZATION='Token {}'.format(self.token_a),
+        )
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertEqual(resp.data['uid'], uid)
+        self.assertEqual(UniqueTogetherModel.objects.count(), 1)
+        self.assertTrue(UniqueTogetherModel.objects.get(pk=uid).public)
+
+    def test_upsert_list_of_instances(self):
+        instance = UniqueTogetherModel.objects.create(
+            name='TOTO',
+            field1='TATA',
+            created_by=User.objects.get(email='usera@netsach.org'),
+        )
+        resp = self.client.post(
+            self.url,
+            [
+                {"name": "TOTO", "field1": "TATA", "public": True},
+                {"name": "TOTO", "field1": "TUTU"},
+            ],
+            format='json',
+            HTTP_AUTHORIZATION='Token {}'.format(self.token_a),
+        )
+        self.assertEqual(resp.status_code, status.HTTP_200_OK, resp.data)
+        self.assertEqual(resp.data['updated'], [instance.pk])
+        self.assertEqual(len(resp.data['created']), 1)
+        self.assertEqual(UniqueTogetherModel.objects.count(), 2)
+
+        #: The same key can not be given twice
+        resp = self.client.post(
+            self.url,
+            [
+                {"name": "TOTO", "field1": "TITI"},
+                {"name": "TOTO", "field1": "TITI"},
+            ],
+            format='json',
+            HTTP_AUTHORIZATION='Token {}'.format(self.token_a),
+        )
+        self.assertEqual(resp.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(resp.data['errors'][0]['index'], 1)
+        self.assertEqual(UniqueTogetherModel.objects.count(), 2)
+
+    def test_upsert_permission_denied(self):
+        UniqueTogetherModel.objects.create(
+            name='TOTO',
+            field1='TATA',
+            created_by=User.objects.get(email='usera@netsach.org'),
+        )
+        resp = self.client.post(
+            self.url,
+            [
+                {"name": "TOTO", "field1": "TATA", "public": True},
+                {"name": "TOTO", "field1": "TUTU"},
+            ],
+            format='json',
+            HTTP_AUTHORIZATION='Token {}'.format(self.token_b),
+        )
+        self.assertEqual(resp.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(
+            resp.data['errors'][0]['_errors'], ['PERMISSION_DENIED']
+        )
+        self.assertEqual(UniqueTogetherModel.objects.count(), 1)
+
+    def test_upsert_requires_key(self):
+        resp = self.client.post(
+            self.url,
+            {"name": "TOTO"},
+            format='json',
+            HTTP_AUTHORIZATION='Token {}'.format(self.token_a),
+        )
+        self.assertEqual(resp.status_code, status.HTTP_400_BAD_REQUEST)
+
+        resp = self.client.post(
+            self.url + '?key=name',
+            {"name": "TOTO", "field1": "TATA"},
+            format='json',
+            HTTP_AUTHORIZATION='Token {}'.format(self.token_a),
+        )
+        self.assertEqual(resp.status_code, status.HTTP_400_BAD_REQUEST)
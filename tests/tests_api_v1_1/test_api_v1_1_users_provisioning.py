@@ -0,0 +1,104 @@
+# coding: utf-8
+from mock import patch
+from rest_framework.test import APITestCase
+from rest_framework import status
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import override_settings
+
+from concrete_datastore.concrete.models import (
+    User,
+    UserConfirmation,
+    DefaultDivider,
+    Email,
+    PasswordChangeToken,
+)
+
+
+@override_settings(DEBUG=True)
+class UsersProvisioningTestCase(APITestCase):
+    def setUp(self):
+        self.admin = User.objects.create_user('admin@netsach.org')
+        self.admin.set_password('plop')
+        self.admin.set_level('admin', commit=True)
+        UserConfirmation.objects.create(user=self.admin, confirmed=True)
+        resp = self.client.post(
+            '/api/v1.1/auth/login/',
+            {"email": "admin@netsach.org", "password": "plop"},
+        )
+        self.token = resp.data['token']
+        self.divider = DefaultDivider.objects.create(name='Divider1')
+        self.existing_user = User.objects.create_user('existing@netsach.org')
+        self.url = '/api/v1.1/users-provisioning/'
+
+    def test_provision_users(self):
+        with patch(
+            'concrete_datastore.concrete.provisioning.send_mails_batch'
+        ) as send_mock, override_settings(PROVISIONING_EMAILS_BATCH_SIZE=2):
+            with self.captureOnCommitCallbacks(execute=True):
+                resp = self.client.post(
+                    self.url,
+                    {
+                        'users': [
+                            {'email': 'User1@netsach.org', 'first_name': 'A'},
+                            {'email': 'user2@netsach.org'},
+                            {'email': 'user3@netsach.org'},
+                            {'email': 'user1@netsach.org'},
+                            {'email': 'EXISTING@netsach.org'},
+                            {'email': 'not an email'},
+                        ],
+                        'scope_uid': str(self.divider.pk),
+                        'url_format': '/set-password/{token}/{email}',
+                    },
+                    format='json',
+                    HTTP_AUTHORIZATION='Token {}'.format(self.token),
+                )
+            self.assertEqual(send_mock.call_count, 2)
+        self.assertEqual(resp.status_code, status.HTTP_200_OK, resp.data)
+        self.assertEqual(
+            resp.data['created'],
+            ['user1@netsach.org', 'user2@netsach.org', 'user3@netsach.org'],
+        )
+        self.assertEqual(resp.data['existing'], ['existing@netsach.org'])
+        self.assertEqual(resp.data['errors'][0]['index'], 5)
+
+        user = User.objects.get(email='user1@netsach.org')
+        self.assertEqual(user.first_name, 'A')
+        self.assertFalse(user.has_usable_password())
+        self.assertEqual(
+            User.objects.filter(defaultdividers=self.divider).count(), 4
+        )
+        token = PasswordChangeToken.objects.get(user=user)
+        email = Email.objects.get(receiver=user)
+        self.assertEqual(email.resource_status, 'to-send')
+        self.assertIn(str(token.uid), email.body)
+
+    def test_provision_users_from_csv(self):
+        users_file = SimpleUploadedFile(
+            'users.csv',
+            b'email,first_name,last_name\n'
+            b'user1@netsach.org,"Doe, John",Doe\n',
+            content_type='text/csv',
+        )
+        resp = self.client.post(
+            self.url,
+            {'file': users_file},
+            format='multipart',
+            HTTP_AUTHORIZATION='Token {}'.format(self.token),
+        )
+        self.assertEqual(resp.status_code, status.HTTP_200_OK, resp.data)
+        self.assertEqual(
+            User.objects.get(email='user1@netsach.org').first_name,
+            'Doe, John',
+        )
+        self.assertEqual(Email.objects.count(), 0)
+
+    def test_provision_users_restricted_to_admins(self):
+        self.admin.set_level('manager', commit=True)
+        resp = self.client.post(
+            self.url,
+            {'users': [{'email': 'user1@netsach.org'}]},
+            format='json',
+            HTTP_AUTHORIZATION='Token {}'.format(self.token),
+        )
+        self.assertEqual(resp.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertFalse(User.objects.filter(email='user1@netsach.org'))
@@ -0,0 +1,71 @@
+# coding: utf-8
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APITestCase
+from rest_framework import status
+
+from concrete_datastore.concrete.models import User, UserConfirmation, Project
+
+
+@override_settings(DEBUG=True)
+class TestWritePath(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('johndoe@netsach.org')
+        self.user.set_password('plop')
+        self.user.set_level('simpleuser', commit=True)
+        UserConfirmation.objects.create(user=self.user, confirmed=True).save()
+        resp = self.client.post(
+            '/api/v1.1/auth/login/',
+            {"email": "johndoe@netsach.org", "password": "plop"},
+        )
+        self.token = resp.data['token']
+        self.project = Project.objects.create(name='project', public=True)
+
+    def get_url(self):
+        return '/api/v1.1/project/{}/'.format(self.project.uid)
+
+    def test_patch_requires_write_permission(self):
+        resp = self.client.patch(
+            self.get_url(),
+            {'name': 'renamed'},
+            HTTP_AUTHORIZATION='Token {}'.format(self.token),
+        )
+        self.assertEqual(resp.status_code, status.HTTP_403_FORBIDDEN)
+
+        self.project.can_admin_users.add(self.user)
+        resp = self.client.patch(
+            self.get_url(),
+            {'name': 'renamed'},
+            HTTP_AUTHORIZATION='Token {}'.format(self.token),
+        )
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.project.refresh_from_db()
+        self.assertEqual(self.project.name, 'renamed')
+
+    def test_patch_saves_only_the_given_fields(self):
+        self.project.can_admin_users.add(self.user)
+        with CaptureQueriesContext(connection) as context:
+            resp = self.client.patch(
+                self.get_url(),
+                {'name': 'renamed'},
+                HTTP_AUTHORIZATION='Token {}'.format(self.token),
+            )
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        project_updates = [
+            query['sql']
+            for query in context.captured_queries
+            if query['sql'].startswith('UPDATE "concrete_project"')
+        ]
+        self.assertEqual(len(project_updates), 1)
+        self.assertIn('"name"', project_updates[0])
+        self.assertNotIn('"public"', project_updates[0])
+
+    @override_settings(API_LOCK_OBJECTS_ON_WRITE=True)
+    def test_locked_delete(self):
+        self.project.can_admin_users.add(self.user)
+        resp = self.client.delete(
+            self.get_url(), HTTP_AUTHORIZATION='Token {}'.format(self.token)
+        )
+        self.assertEqual(resp.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertFalse(Project.objects.filter(pk=self.project.pk).exists())
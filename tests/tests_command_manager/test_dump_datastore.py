@@ -0,0 +1,163 @@
+# coding: utf-8
+import json
+import os
+import tempfile
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.test import TestCase
+
+from concrete_datastore.concrete.models import (
+    DefaultDivider,
+    Email,
+    UniqueTogetherModel,
+    User,
+)
+
+
+class DumpDatastoreCommandManagementTests(TestCase):
+    def setUp(self):
+        self.divider = DefaultDivider.objects.create(name='Divider1')
+        self.other_divider = DefaultDivider.objects.create(name='Divider2')
+        self.user = User.objects.create_user(email='johndoe@netsach.org')
+        self.user.defaultdividers.add(self.divider)
+        UniqueTogetherModel.objects.create(
+            name='A', field1='1', defaultdivider=self.divider
+        )
+        UniqueTogetherModel.objects.create(
+            name='B', field1='1', defaultdivider=self.other_divider
+        )
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def read_manifest(self):
+        with open(os.path.join(self.directory.name, 'manifest.json')) as f:
+            return json.load(f)
+
+    def test_dump_and_restore_scope(self):
+        call_command(
+            'dump_datastore',
+            self.directory.name,
+            scope_uid=str(self.divider.pk),
+        )
+        tables = {
+            table['model']: table for table in self.read_manifest()['tables']
+        }
+        self.assertEqual(tables['UniqueTogetherModel']['rows_count'], 1)
+        self.assertEqual(tables['DefaultDivider']['rows_count'], 1)
+        self.assertEqual(tables['User']['rows_count'], 1)
+        models = list(tables)
+        self.assertLess(
+            models.index('DefaultDivider'), models.index('UniqueTogetherModel')
+        )
+
+        UniqueTogetherModel.objects.filter(
+            defaultdivider=self.divider
+        ).delete()
+        self.user.defaultdividers.clear()
+        call_command('restore_datastore', self.directory.name)
+        self.assertEqual(
+            UniqueTogetherModel.objects.get(defaultdivider=self.divider).name,
+            'A',
+        )
+        self.assertEqual(UniqueTogetherModel.objects.count(), 2)
+        self.assertTrue(
+            self.user.defaultdividers.filter(pk=self.divider.pk).exists()
+        )
+
+    def test_restore_scope_without_the_other_scopes(self):
+        other_user = User.objects.create_user(email='janedoe@netsach.org')
+        other_user.defaultdividers.add(self.other_divider)
+        instance = UniqueTogetherModel.objects.create(
+            name='C',
+            field1='1',
+            defaultdivider=self.divider,
+            created_by=other_user,
+        )
+        instance.can_view_users.add(self.user, other_user)
+        call_command(
+            'dump_datastore',
+            self.directory.name,
+            scope_uid=str(self.divider.pk),
+        )
+
+        UniqueTogetherModel.objects.all().delete()
+        User.objects.all().delete()
+        DefaultDivider.objects.all().delete()
+        call_command('restore_datastore', self.directory.name)
+        #: The deferred foreign keys are checked at once
+        connection.check_constraints()
+
+        self.assertEqual(
+            list(DefaultDivider.objects.values_list('pk', flat=True)),
+            [self.divider.pk],
+        )
+        user = User.objects.get()
+        self.assertEqual(user.pk, self.user.pk)
+        self.assertEqual(
+            list(user.defaultdividers.values_list('pk', flat=True)),
+            [self.divider.pk],
+        )
+        instance = UniqueTogetherModel.objects.get(name='C')
+        self.assertIsNone(instance.created_by)
+        self.assertEqual(
+            list(instance.can_view_users.values_list('pk', flat=True)),
+            [self.user.pk],
+        )
+
+    def test_dump_scope_skips_emails_to_other_scopes(self):
+        other_user = User.objects.create_user(email='janedoe@netsach.org')
+        other_user.defaultdividers.add(self.other_divider)
+        Email.objects.create(
+            subject='In scope',
+            body='Body',
+            receiver=self.user,
+            resource_status='sent',
+        )
+        Email.objects.create(
+            subject='Out of scope',
+            body='Body',
+            receiver=other_user,
+            created_by=self.user,
+            resource_status='sent',
+        )
+        call_command(
+            'dump_datastore',
+            self.directory.name,
+            scope_uid=str(self.divider.pk),
+        )
+        tables = {
+            table['model']: table for table in self.read_manifest()['tables']
+        }
+        self.assertEqual(tables['Email']['rows_count'], 1)
+
+        Email.objects.all().delete()
+        UniqueTogetherModel.objects.all().delete()
+        User.objects.all().delete()
+        call_command('restore_datastore', self.directory.name)
+        connection.check_constraints()
+        email = Email.objects.get()
+        self.assertEqual(email.subject, 'In scope')
+        self.assertEqual(email.receiver_id, self.user.pk)
+
+    def test_restore_unknown_columns(self):
+        call_command('dump_datastore', self.directory.name)
+        manifest = self.read_manifest()
+        manifest['tables'][0]['columns'].append('unknown_column')
+        with open(
+            os.path.join(self.directory.name, 'manifest.json'), 'w'
+        ) as f:
+            json.dump(manifest, f)
+        with self.assertRaises(CommandError):
+            call_command('restore_datastore', self.directory.name)
+
+    def test_dump_unknown_scope(self):
+        with self.assertRaises(CommandError):
+            call_command(
+                'dump_datastore',
+                self.directory.name,
+                scope_uid='9b6a1e4a-0e4e-4d52-9b1f-8f4c1f5b8e2a',
+            )
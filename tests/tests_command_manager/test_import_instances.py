@@ -0,0 +1,65 @@
+import json
+import tempfile
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase, override_settings
+
+from concrete_datastore.concrete.models import (
+    DefaultDivider,
+    UniqueTogetherModel,
+)
+
+
+class ImportInstancesCommandManagementTests(TestCase):
+    def setUp(self):
+        self.divider = DefaultDivider.objects.create(name='Divider1')
+        self.instances_file = tempfile.NamedTemporaryFile(
+            mode='w', suffix='.ndjson'
+        )
+        for item in (
+            {'name': 'A', 'field1': '1'},
+            {'name': 'B', 'field1': '1', 'public': True},
+            {'name': 'B', 'field1': '1'},
+            'not an object',
+        ):
+            self.instances_file.write(json.dumps(item) + '\n')
+        self.instances_file.flush()
+
+    def tearDown(self):
+        self.instances_file.close()
+
+    def import_instances(self, **options):
+        with tempfile.NamedTemporaryFile(suffix='.ndjson') as rejected_file:
+            call_command(
+                'import_instances',
+                'UniqueTogetherModel',
+                self.instances_file.name,
+                scope_uid=str(self.divider.pk),
+                rejected_file=rejected_file.name,
+                batch_size=2,
+                **options
+            )
+            return [json.loads(line) for line in rejected_file]
+
+    def test_import_instances(self):
+        rejected = self.import_instances()
+        self.assertEqual(
+            UniqueTogetherModel.objects.filter(
+                defaultdivider=self.divider
+            ).count(),
+            2,
+        )
+        self.assertEqual([row['line'] for row in rejected], [3, 4])
+
+    @override_settings(IMPORT_USE_COPY=False)
+    def test_import_instances_with_bulk_create(self):
+        rejected = self.import_instances()
+        self.assertEqual(UniqueTogetherModel.objects.count(), 2)
+        self.assertEqual([row['line'] for row in rejected], [3, 4])
+
+    def test_import_instances_unknown_model(self):
+        with self.assertRaises(CommandError):
+            call_command(
+                'import_instances', 'UnknownModel', self.instances_file.name
+            )
@@ -0,0 +1,41 @@
+import json
+import tempfile
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+
+from concrete_datastore.concrete.models import User, DefaultDivider
+
+
+class ProvisionUsersCommandManagementTests(TestCase):
+    def setUp(self):
+        self.divider = DefaultDivider.objects.create(name='Divider1')
+        self.users_file = tempfile.NamedTemporaryFile(mode='w', suffix='.json')
+        json.dump(
+            [{'email': 'user1@netsach.org'}, {'email': 'user2@netsach.org'}],
+            self.users_file,
+        )
+        self.users_file.flush()
+
+    def tearDown(self):
+        self.users_file.close()
+
+    def test_provision_users(self):
+        call_command(
+            'provision_users',
+            self.users_file.name,
+            scope_uid=str(self.divider.pk),
+        )
+        self.assertEqual(
+            User.objects.filter(defaultdividers=self.divider).count(), 2
+        )
+
+    def test_provision_users_unknown_scope(self):
+        with self.assertRaises(CommandError):
+            call_command(
+                'provision_users',
+                self.users_file.name,
+                scope_uid='1a2b3c4d-0000-0000-0000-000000000000',
+            )
+        self.assertEqual(User.objects.count(), 0)
@@ -0,0 +1,69 @@
+# coding: utf-8
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from concrete_datastore.concrete.models import (
+    User,
+    DefaultDivider,
+    Category,
+    ChangeLogEntry,
+)
+from concrete_datastore.api.v1.views import (
+    remove_instances_user_tracked_fields,
+)
+
+
+class TestRemoveUserTrackedFieldsQueries(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('simpleuser@netsach.org')
+        self.divider = DefaultDivider.objects.create(name='Divider1')
+        self.other_divider = DefaultDivider.objects.create(name='Divider2')
+
+    def create_categories(self, count, divider):
+        categories = [
+            Category.objects.create(
+                name='Category{}'.format(i), defaultdivider=divider
+            )
+            for i in range(count)
+        ]
+        for category in categories:
+            category.can_view_users.add(self.user)
+            category.can_admin_users.add(self.user)
+        return categories
+
+    def count_queries(self):
+        with CaptureQueriesContext(connection) as context:
+            remove_instances_user_tracked_fields(self.user, [self.divider.pk])
+        return len(context.captured_queries)
+
+    def test_constant_query_count(self):
+        self.create_categories(2, self.divider)
+        queries_count_small_scope = self.count_queries()
+
+        self.create_categories(50, self.divider)
+        queries_count_large_scope = self.count_queries()
+
+        self.assertEqual(queries_count_small_scope, queries_count_large_scope)
+
+    def test_only_removed_scopes_are_cleaned(self):
+        removed_categories = self.create_categories(3, self.divider)
+        kept_categories = self.create_categories(2, self.other_divider)
+        ChangeLogEntry.objects.all().delete()
+
+        remove_instances_user_tracked_fields(self.user, [self.divider.pk])
+
+        self.assertEqual(self.user.viewable_categorys.count(), 2)
+        self.assertEqual(self.user.administrable_categorys.count(), 2)
+        self.assertEqual(
+            set(
+                ChangeLogEntry.objects.filter(
+                    operation=ChangeLogEntry.OPERATION_PERMISSIONS
+                ).values_list('uid', flat=True)
+            ),
+            {category.uid for category in removed_categories},
+        )
+        self.assertNotIn(
+            kept_categories[0].uid,
+            ChangeLogEntry.objects.values_list('uid', flat=True),
+        )